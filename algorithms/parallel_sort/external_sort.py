@@ -0,0 +1,270 @@
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from cluster_simulator.node import Node
+from cluster_simulator.cluster import Cluster
+from algorithms.parallel_sort.sort_merge import generate_time_based_data, merge_sorted_runs
+
+Row = Tuple[datetime, datetime, str, int]
+Record = Tuple[int, bytes]  # (timestamp in microseconds, encoded row)
+
+DEFAULT_MEMORY_FRACTION = 0.25  # Share of Node.memory a sort may use for its buffers
+DEFAULT_READ_BUFFER_SIZE = 64 * 1024  # Bytes decoded per run per refill during a merge
+
+# Fixed-size header of an encoded row: timestamp and delivery time as
+# microseconds since the epoch, the node index, and the byte length of the
+# UTF-8 label that follows the header.
+ROW_HEADER = struct.Struct("<qqqI")
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Memory a buffered record takes beyond its encoded bytes: the (key, bytes)
+# tuple, the integer key, the bytes object's header, and its slot in the
+# buffer list. The budget is charged for these too, since for short rows
+# they outweigh the payload several times over.
+RECORD_OVERHEAD = sys.getsizeof((0, b"")) + sys.getsizeof(1 << 60) + sys.getsizeof(b"") + struct.calcsize("P")
+
+def encode_row(row: Row) -> bytes:
+    """
+    Encode a ``(timestamp, delivery_time, label, node)`` row in the compact
+    binary run format. Datetimes must be naive, as produced by
+    ``generate_time_based_data``.
+
+    Args:
+        row (Row): The row to encode.
+
+    Returns:
+        bytes: The header followed by the UTF-8 label.
+    """
+    timestamp, delivery_time, label, node = row
+    label_bytes = label.encode()
+    header = ROW_HEADER.pack((timestamp - EPOCH) // MICROSECOND, (delivery_time - EPOCH) // MICROSECOND,
+                             node, len(label_bytes))
+    return header + label_bytes
+
+def decode_row(record: bytes) -> Row:
+    """
+    Decode a row produced by ``encode_row``.
+
+    Args:
+        record (bytes): One encoded row.
+
+    Returns:
+        Row: The decoded row.
+    """
+    timestamp, delivery_time, node, _ = ROW_HEADER.unpack_from(record)
+    return (EPOCH + timestamp * MICROSECOND, EPOCH + delivery_time * MICROSECOND,
+            record[ROW_HEADER.size:].decode(), node)
+
+def iter_run(path: str, read_buffer_size: int = DEFAULT_READ_BUFFER_SIZE) -> Iterator[Record]:
+    """
+    Read a spilled run through a read-only memory map, one buffer at a time.
+
+    Records are sliced out of the mapping ``read_buffer_size`` bytes at a time,
+    so at most one buffer's worth of decoded records is held per run. The
+    file is removed once it has been read to the end.
+
+    Args:
+        path (str): The run file.
+        read_buffer_size (int): Bytes of records to decode per refill.
+
+    Returns:
+        Iterator[Record]: The ``(timestamp, encoded row)`` records in file order.
+    """
+    try:
+        with open(path, "rb") as run_file, mmap.mmap(run_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            offset = 0
+            end = len(mapped)
+            while offset < end:
+                buffer = []
+                buffer_end = min(offset + read_buffer_size, end)
+                while offset < buffer_end:
+                    timestamp, _, _, label_length = ROW_HEADER.unpack_from(mapped, offset)
+                    record_end = offset + ROW_HEADER.size + label_length
+                    buffer.append((timestamp, mapped[offset:record_end]))
+                    offset = record_end
+                yield from buffer
+    finally:
+        os.remove(path)
+
+@dataclass
+class ExternalSortStats:
+    bytes_spilled: Dict[str, int] = field(default_factory=dict)
+    runs_created: Dict[str, int] = field(default_factory=dict)
+    merge_passes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_bytes_spilled(self) -> int:
+        return sum(self.bytes_spilled.values())
+
+    @property
+    def max_merge_passes(self) -> int:
+        # Nodes merge in parallel, so the deepest node sets the merge time
+        return max(self.merge_passes.values(), default=0)
+
+class NodeExternalSorter:
+    def __init__(self, node: Node, scratch_dir: str, memory_budget: int,
+                 read_buffer_size: int = DEFAULT_READ_BUFFER_SIZE):
+        """
+        Sort the rows assigned to one node within a fixed memory budget.
+
+        Args:
+            node (Node): The node doing the sort.
+            scratch_dir (str): Directory where this node spills its runs.
+            memory_budget (int): Bytes the buffered rows may occupy in memory,
+                their Python object overhead (``RECORD_OVERHEAD``) included.
+            read_buffer_size (int): Bytes read per run per refill while merging.
+        """
+        self.node = node
+        self.scratch_dir = scratch_dir
+        self.memory_budget = memory_budget
+        self.read_buffer_size = read_buffer_size
+        # One buffer per input run plus one for the output of the merge
+        self.fan_in = max(2, memory_budget // read_buffer_size - 1)
+        self.buffer: List[Record] = []
+        self.buffered_bytes = 0
+        self.runs: List[str] = []
+        self.bytes_spilled = 0
+        self.runs_created = 0
+        self.merge_passes = 0
+
+    def add(self, row: Row) -> None:
+        record = encode_row(row)
+        self.buffer.append(((row[0] - EPOCH) // MICROSECOND, record))
+        self.buffered_bytes += len(record) + RECORD_OVERHEAD
+        if self.buffered_bytes >= self.memory_budget:
+            self.spill()
+
+    def spill(self) -> None:
+        """Sort the buffered rows and write them out as a new run."""
+        self.buffer.sort(key=itemgetter(0))
+        self.runs.append(self.write_run(record for _, record in self.buffer))
+        self.buffer = []
+        self.buffered_bytes = 0
+
+    def write_run(self, records: Iterable[bytes]) -> str:
+        path = os.path.join(self.scratch_dir, f"run_{self.runs_created}.bin")
+        with open(path, "wb", buffering=self.read_buffer_size) as run_file:
+            for record in records:
+                run_file.write(record)
+        self.bytes_spilled += os.path.getsize(path)
+        self.runs_created += 1
+        return path
+
+    def finish(self) -> Iterator[Record]:
+        """
+        Merge the spilled runs down to at most ``fan_in`` and return the final
+        merge as a stream. Intermediate passes are written back to disk.
+
+        Returns:
+            Iterator[Record]: This node's records in timestamp order.
+        """
+        if not self.runs:
+            # Everything fit in memory: no run was spilled, nothing to merge
+            self.buffer.sort(key=itemgetter(0))
+            records, self.buffer = self.buffer, []
+            return iter(records)
+
+        if self.buffer:
+            self.spill()
+
+        while len(self.runs) > self.fan_in:
+            self.merge_passes += 1
+            groups = [self.runs[i:i + self.fan_in] for i in range(0, len(self.runs), self.fan_in)]
+            self.runs = [self.write_run(record for _, record in self.merge(group)) for group in groups]
+
+        self.merge_passes += 1
+        return self.merge(self.runs)
+
+    def merge(self, runs: List[str]) -> Iterator[Record]:
+        return merge_sorted_runs([iter_run(path, self.read_buffer_size) for path in runs], key=itemgetter(0))
+
+def node_memory_budget(node: Node, memory_fraction: float = DEFAULT_MEMORY_FRACTION) -> int:
+    """
+    Bytes of sort buffer a node may use, derived from ``Node.memory`` (MB).
+
+    Args:
+        node (Node): The node doing the sort.
+        memory_fraction (float): The share of the node's memory given to the sort.
+
+    Returns:
+        int: The memory budget in bytes.
+    """
+    return max(1, int(node.memory * 1024 * 1024 * memory_fraction))
+
+def external_sort_merge(cluster: Cluster, relation: Iterable[Row], memory_fraction: float = DEFAULT_MEMORY_FRACTION,
+                        scratch_dir: Optional[str] = None,
+                        read_buffer_size: int = DEFAULT_READ_BUFFER_SIZE) -> Tuple[Iterator[Row], ExternalSortStats]:
+    """
+    Parallel external sort-merge that never holds more than each node's
+    memory budget of rows.
+
+    Rows are routed to the node named by their last field, exactly as in
+    ``parallel_external_sort_merge``. Each node buffers rows until its budget
+    is used, spills them as a sorted run into its own scratch directory, and
+    merges its runs with bounded fan-in. The per-node streams are merged into
+    the global order lazily, so ``relation`` may itself be a one-shot stream.
+
+    Args:
+        cluster (Cluster): The cluster whose nodes hold the partitions.
+        relation (Iterable[Row]): Rows as produced by ``generate_time_based_data``.
+        memory_fraction (float): The share of ``Node.memory`` each node may use.
+        scratch_dir (Optional[str]): Parent directory for the per-node scratch
+            directories. A temporary directory is used when omitted.
+        read_buffer_size (int): Bytes read per run per refill while merging.
+
+    Returns:
+        Tuple[Iterator[Row], ExternalSortStats]: The sorted rows, and the spill
+        and merge statistics. Scratch space is removed once the stream is consumed.
+    """
+    scratch_root = tempfile.mkdtemp(prefix=f"{cluster.name}_sort_", dir=scratch_dir)
+    nodes = list(cluster.nodes.values())
+    sorters = []
+    for node in nodes:
+        node_dir = os.path.join(scratch_root, f"node_{node.id}")
+        os.makedirs(node_dir)
+        sorters.append(NodeExternalSorter(node, node_dir, node_memory_budget(node, memory_fraction), read_buffer_size))
+
+    # Run generation: each node sorts and spills the rows assigned to it
+    for row in relation:
+        sorters[row[3]].add(row)
+
+    node_streams = [sorter.finish() for sorter in sorters]
+    stats = ExternalSortStats(
+        bytes_spilled={sorter.node.id: sorter.bytes_spilled for sorter in sorters},
+        runs_created={sorter.node.id: sorter.runs_created for sorter in sorters},
+        merge_passes={sorter.node.id: sorter.merge_passes for sorter in sorters},
+    )
+
+    def sorted_rows() -> Iterator[Row]:
+        try:
+            for _, record in merge_sorted_runs(node_streams, key=itemgetter(0)):
+                yield decode_row(record)
+        finally:
+            shutil.rmtree(scratch_root, ignore_errors=True)
+
+    return sorted_rows(), stats
+
+if __name__ == "__main__":
+    num_nodes = 5
+    cluster = Cluster(f"SortCluster_{num_nodes}")
+    cluster.generate_random_cluster(num_nodes)
+    relation = generate_time_based_data(20000, num_nodes)
+
+    # A tiny fraction of Node.memory so the demo relation has to spill
+    rows, stats = external_sort_merge(cluster, relation, memory_fraction=1e-5, read_buffer_size=4096)
+    sorted_relation = list(rows)
+    assert [row[0] for row in sorted_relation] == sorted(row[0] for row in relation)
+    print(f"Sorted {len(sorted_relation)} rows")
+    print(f"Bytes spilled: {stats.total_bytes_spilled}")
+    print(f"Runs created per node: {stats.runs_created}")
+    print(f"Merge passes per node: {stats.merge_passes}")
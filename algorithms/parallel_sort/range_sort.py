@@ -1,63 +1,352 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Optional, Union
+from itertools import repeat
 from cluster_simulator.node import Node
 from cluster_simulator.cluster import Cluster
+from cluster_simulator.executor import NodeExecutor, create_executor
+from algorithms.relation import Relation
 import random
 import time
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 
-def range_partition_sort(cluster: Cluster, relation: List[Tuple], sort_attribute: int) -> List[Tuple]:
+DEFAULT_OVERSAMPLING = 64  # Sample keys per node for quantile splitters, as in sample sort
+
+RelationLike = Union[List[Tuple], Relation]
+
+def range_partition_sort(cluster: Cluster, relation: RelationLike, sort_attribute: int, vectorized: bool = True,
+                         splitter: str = 'equal_width', oversampling: int = DEFAULT_OVERSAMPLING,
+                         sampling: str = 'random', executor: Optional[NodeExecutor] = None,
+                         chunksize: int = 1) -> RelationLike:
     """
     Perform range-partitioning sort on a relation across a cluster.
 
+    A columnar ``Relation`` is partitioned into zero-copy slices and each
+    node sorts its slice with a NumPy argsort; the result is a ``Relation``.
+
     Args:
         cluster (Cluster): The cluster to perform the sort on.
-        relation (List[Tuple]): The relation to be sorted.
+        relation (RelationLike): The relation to be sorted.
         sort_attribute (int): The index of the attribute to sort on.
+        vectorized (bool): Use the batch boundary-search partitioner instead of
+            the per-tuple ``range_partition`` path. Ignored for a ``Relation``.
+        splitter (str): 'equal_width' to split ``[min, max]`` evenly, or
+            'sample' to pick compute-weighted quantile splitters from a sample
+            of the keys. Only the vectorized path supports 'sample'.
+        oversampling (int): Sample keys drawn per node when ``splitter='sample'``.
+        sampling (str): 'random' or 'reservoir' sampling of the keys.
+        executor (Optional[NodeExecutor]): Runs the local sorts. Defaults to
+            the cluster's executor.
+        chunksize (int): Partitions dispatched to a worker at a time.
 
     Returns:
-        List[Tuple]: The sorted relation.
+        RelationLike: The sorted relation, in the same representation as the input.
     """
     # Step 1: Range partition the relation
-    partitions = range_partition(cluster, relation, sort_attribute)
+    if vectorized or isinstance(relation, Relation):
+        indices = range_partition_indices(cluster, relation, sort_attribute, splitter, oversampling, sampling)
+        partitions = materialize_partitions(relation, indices)
+    elif splitter == 'equal_width':
+        partitions = range_partition(cluster, relation, sort_attribute)
+    else:
+        raise ValueError("The per-tuple partitioner only supports splitter='equal_width'.")
 
-    # Step 2: Sort each partition locally
-    sorted_partitions = []
-    for node_id, partition in partitions.items():
-        sorted_partition = cluster.nodes[node_id].local_sort(partition, sort_attribute)
-        sorted_partitions.append(sorted_partition)
+    # Step 2: Sort each partition locally, one task per node
+    sorted_partitions = sort_partitions(cluster, partitions, sort_attribute, executor, chunksize)
 
     # Concatenate the sorted partitions
+    if isinstance(relation, Relation):
+        return Relation.concat(sorted_partitions)
     return [tuple for partition in sorted_partitions for tuple in partition]
 
-def range_partition(cluster: Cluster, relation: List[Tuple], sort_attribute: int) -> Dict[str, List[Tuple]]:
+def range_partition(cluster: Cluster, relation: RelationLike, sort_attribute: int,
+                    assignment: Optional[Dict[str, str]] = None) -> Dict[str, RelationLike]:
     """
-    Range partition the relation across the nodes in the cluster.
+    Range partition the relation across the nodes in the cluster, skipping
+    nodes a health monitor has found dead (see ``Cluster.partition_node_ids``).
+
+    A list of tuples is routed one tuple at a time; a columnar ``Relation``
+    goes through ``range_partition_indices`` and is split into zero-copy slices.
 
     Args:
         cluster (Cluster): The cluster to partition the relation across.
-        relation (List[Tuple]): The relation to be partitioned.
+        relation (RelationLike): The relation to be partitioned.
         sort_attribute (int): The index of the attribute to partition on.
+        assignment (Optional[Dict[str, str]]): Moves the key range of node
+            ``k`` to node ``assignment[k]``, e.g. a placement from
+            ``ShuffleSimulator.optimize_assignment``. The partitions stay in
+            key order.
 
     Returns:
-        Dict[str, List[Tuple]]: A dictionary mapping node IDs to their partitions.
+        Dict[str, RelationLike]: A dictionary mapping node IDs to their partitions.
+
+    Raises:
+        ValueError: If ``assignment`` sends two key ranges to the same node.
     """
-    num_nodes = len(cluster.nodes)
+    if assignment is not None:
+        partitions = range_partition(cluster, relation, sort_attribute)
+        targets = [assignment.get(node_id, node_id) for node_id in partitions]
+        shared = sorted({target for target in targets if targets.count(target) > 1})
+        if shared:
+            raise ValueError(f"Invalid assignment: nodes {shared} would receive more than one key range.")
+        return dict(zip(targets, partitions.values()))
+    if isinstance(relation, Relation):
+        return materialize_partitions(relation, range_partition_indices(cluster, relation, sort_attribute))
+
+    node_ids = cluster.partition_node_ids()
+    num_nodes = len(node_ids)
     min_val = min(tuple[sort_attribute] for tuple in relation)
     max_val = max(tuple[sort_attribute] for tuple in relation)
     range_size = (max_val - min_val) / num_nodes
 
-    partitions = {node_id: [] for node_id in cluster.nodes}
+    partitions = {node_id: [] for node_id in node_ids}
 
     for tuple in relation:
         value = tuple[sort_attribute]
         partition_index = min(int((value - min_val) / range_size), num_nodes - 1)
-        node_id = list(cluster.nodes.keys())[partition_index]
+        node_id = node_ids[partition_index]
         partitions[node_id].append(tuple)
 
     return partitions
 
+def sort_column(relation: RelationLike, sort_attribute: int) -> np.ndarray:
+    """
+    Extract the sort attribute of every tuple into a single array.
+
+    Numeric keys become a native NumPy array; anything else (e.g. datetimes)
+    falls back to an object array, which ``np.searchsorted`` still handles.
+    A ``Relation`` already stores the column, so it is returned as is.
+
+    Args:
+        relation (RelationLike): The relation to read.
+        sort_attribute (int): The index of the attribute to extract.
+
+    Returns:
+        np.ndarray: The sort column.
+    """
+    if isinstance(relation, Relation):
+        return relation.order_keys(sort_attribute)
+    return np.asarray([row[sort_attribute] for row in relation])
+
+def equal_width_partitions(keys: np.ndarray, num_partitions: int) -> np.ndarray:
+    """
+    Map every key to its equal-width range with the rule of the per-tuple
+    path of ``range_partition``, ``min(int((value - min) / range_size), n - 1)``,
+    so both paths produce exactly the same partitions.
+
+    Args:
+        keys (np.ndarray): The sort column.
+        num_partitions (int): The number of ranges.
+
+    Returns:
+        np.ndarray: The partition index of every key.
+    """
+    min_val = keys.min()
+    range_size = (keys.max() - min_val) / num_partitions
+    if not range_size:
+        return np.zeros(len(keys), dtype=np.intp)  # Every key is equal
+    positions = np.asarray((keys - min_val) / range_size, dtype=float)
+    return np.minimum(positions.astype(np.intp), num_partitions - 1)
+
+def assign_partitions(keys: np.ndarray, boundaries: np.ndarray) -> np.ndarray:
+    """
+    Map every key to the index of the range it falls into.
+
+    A key equal to a boundary belongs to the upper range.
+
+    Args:
+        keys (np.ndarray): The sort column.
+        boundaries (np.ndarray): Ascending split boundaries.
+
+    Returns:
+        np.ndarray: The partition index of every key.
+    """
+    return np.searchsorted(boundaries, keys, side='right')
+
+def reservoir_sample(keys: Iterable, sample_size: int) -> List:
+    """
+    Draw a uniform sample of ``sample_size`` keys in a single pass (Algorithm R).
+
+    Args:
+        keys (Iterable): The keys to sample; may be a one-shot stream.
+        sample_size (int): The number of keys to keep.
+
+    Returns:
+        List: The sampled keys.
+    """
+    reservoir = []
+    for seen, key in enumerate(keys):
+        if seen < sample_size:
+            reservoir.append(key)
+        else:
+            slot = random.randint(0, seen)
+            if slot < sample_size:
+                reservoir[slot] = key
+    return reservoir
+
+def node_weights(cluster: Cluster, node_ids: List[str]) -> np.ndarray:
+    """
+    Share of the relation each node should receive, proportional to its compute.
+
+    Args:
+        cluster (Cluster): The cluster holding the nodes.
+        node_ids (List[str]): The nodes in partition order.
+
+    Returns:
+        np.ndarray: Weights that sum to 1.
+    """
+    compute = np.array([cluster.nodes[node_id].compute for node_id in node_ids], dtype=float)
+    return compute / compute.sum()
+
+def sample_boundaries(keys: np.ndarray, weights: np.ndarray, oversampling: int = DEFAULT_OVERSAMPLING,
+                      sampling: str = 'random') -> np.ndarray:
+    """
+    Pick split boundaries at the weighted quantiles of a sample of the keys.
+
+    ``oversampling * len(weights)`` keys are sampled and sorted; boundary ``j``
+    is the sample key at the cumulative weight of the first ``j + 1`` nodes, so
+    a node with twice the compute receives a range holding about twice the rows.
+
+    Args:
+        keys (np.ndarray): The sort column.
+        weights (np.ndarray): The share of rows for each partition, summing to 1.
+        oversampling (int): Sample keys drawn per partition.
+        sampling (str): 'random' to sample indices directly, or 'reservoir' to
+            sample in one streaming pass.
+
+    Returns:
+        np.ndarray: The ascending split boundaries.
+    """
+    sample_size = min(len(keys), max(1, oversampling * len(weights)))
+    if sampling == 'random':
+        sample = keys[np.random.choice(len(keys), sample_size, replace=False)]
+    elif sampling == 'reservoir':
+        sample = np.asarray(reservoir_sample(keys, sample_size), dtype=keys.dtype)
+    else:
+        raise ValueError("Invalid sampling. Use 'random' or 'reservoir'.")
+
+    sample = np.sort(sample)
+    positions = np.minimum((np.cumsum(weights)[:-1] * sample_size).astype(int), sample_size - 1)
+    return sample[positions]
+
+def partition_imbalance(partition_sizes: List[int], weights: Optional[np.ndarray] = None) -> float:
+    """
+    Ratio between the most overloaded partition and its fair share.
+
+    With equal weights this is ``max / mean``; 1.0 means perfectly balanced,
+    and a value of 3.0 means the slowest node does three times its share, so
+    the parallel phase takes three times longer than it should.
+
+    Args:
+        partition_sizes (List[int]): The number of rows in each partition.
+        weights (Optional[np.ndarray]): The intended share of each partition.
+            Defaults to equal shares.
+
+    Returns:
+        float: The imbalance factor.
+    """
+    sizes = np.asarray(partition_sizes, dtype=float)
+    total = sizes.sum()
+    if total == 0:
+        return 1.0
+    if weights is None:
+        weights = np.full(len(sizes), 1.0 / len(sizes))
+    return float((sizes / (total * weights)).max())
+
+def range_partition_indices(cluster: Cluster, relation: RelationLike, sort_attribute: int,
+                            splitter: str = 'equal_width', oversampling: int = DEFAULT_OVERSAMPLING,
+                            sampling: str = 'random') -> Dict[str, np.ndarray]:
+    """
+    Range partition the relation in one batch and return row indices per node.
+
+    The node-ID table and the split boundaries are computed once, and every
+    key is routed with a single ``searchsorted`` call. Each node receives a
+    slice of one stable ``argsort`` of the partition indices, so rows keep
+    their input order within a partition and no per-node lists are grown.
+
+    Args:
+        cluster (Cluster): The cluster to partition the relation across.
+        relation (RelationLike): The relation to be partitioned.
+        sort_attribute (int): The index of the attribute to partition on.
+        splitter (str): 'equal_width' or 'sample' (see ``sample_boundaries``).
+        oversampling (int): Sample keys drawn per node when ``splitter='sample'``.
+        sampling (str): 'random' or 'reservoir' sampling of the keys.
+
+    Returns:
+        Dict[str, np.ndarray]: A dictionary mapping node IDs to the indices of
+        the tuples in their partition.
+    """
+    node_ids = cluster.partition_node_ids()
+    if not relation:
+        return {node_id: np.empty(0, dtype=np.intp) for node_id in node_ids}
+
+    keys = sort_column(relation, sort_attribute)
+    if splitter == 'equal_width':
+        partition_of = equal_width_partitions(keys, len(node_ids))
+    elif splitter == 'sample':
+        boundaries = sample_boundaries(keys, node_weights(cluster, node_ids), oversampling, sampling)
+        partition_of = assign_partitions(keys, boundaries)
+    else:
+        raise ValueError("Invalid splitter. Use 'equal_width' or 'sample'.")
+
+    order = np.argsort(partition_of, kind='stable')
+    counts = np.bincount(partition_of, minlength=len(node_ids))
+    return dict(zip(node_ids, np.split(order, np.cumsum(counts)[:-1])))
+
+def materialize_partitions(relation: RelationLike, indices: Dict[str, np.ndarray]) -> Dict[str, RelationLike]:
+    """
+    Turn per-node index arrays back into per-node partitions.
+
+    A list of tuples yields one list per node. A ``Relation`` is reordered
+    with a single ``take`` and every node gets a zero-copy slice of it.
+
+    Args:
+        relation (RelationLike): The partitioned relation.
+        indices (Dict[str, np.ndarray]): Row indices per node.
+
+    Returns:
+        Dict[str, RelationLike]: A dictionary mapping node IDs to their partitions.
+    """
+    if isinstance(relation, Relation):
+        reordered = relation.take(np.concatenate(list(indices.values())))
+        bounds = np.cumsum([0] + [len(idx) for idx in indices.values()])
+        return {node_id: reordered.slice(bounds[i], bounds[i + 1]) for i, node_id in enumerate(indices)}
+    return {node_id: [relation[i] for i in idx.tolist()] for node_id, idx in indices.items()}
+
+def sort_partition(partition: RelationLike, sort_attribute: int) -> RelationLike:
+    """
+    Sort one partition. Module-level so that process pools can pickle it.
+
+    Args:
+        partition (RelationLike): The partition to be sorted.
+        sort_attribute (int): The index of the attribute to sort on.
+
+    Returns:
+        RelationLike: The sorted partition.
+    """
+    if isinstance(partition, Relation):
+        return partition.take(np.argsort(partition.order_keys(sort_attribute), kind='stable'))
+    return sorted(partition, key=lambda x: x[sort_attribute])
+
+def sort_partitions(cluster: Cluster, partitions: Dict[str, RelationLike], sort_attribute: int,
+                    executor: Optional[NodeExecutor] = None, chunksize: int = 1) -> List[RelationLike]:
+    """
+    Run every node's local sort on the executor.
+
+    Args:
+        cluster (Cluster): The cluster the partitions belong to.
+        partitions (Dict[str, RelationLike]): Node IDs mapped to their partitions.
+        sort_attribute (int): The index of the attribute to sort on.
+        executor (Optional[NodeExecutor]): Runs the sorts. Defaults to the
+            cluster's executor.
+        chunksize (int): Partitions dispatched to a worker at a time.
+
+    Returns:
+        List[RelationLike]: The sorted partitions, in node order.
+    """
+    executor = executor or cluster.executor
+    return list(executor.map(sort_partition, partitions.values(), repeat(sort_attribute), chunksize=chunksize))
+
 # Add a method to the Node class for local sorting
 def local_sort(self, partition: List[Tuple], sort_attribute: int) -> List[Tuple]:
     """
@@ -70,22 +359,80 @@ def local_sort(self, partition: List[Tuple], sort_attribute: int) -> List[Tuple]
     Returns:
         List[Tuple]: The sorted partition.
     """
-    return sorted(partition, key=lambda x: x[sort_attribute])
+    return sort_partition(partition, sort_attribute)
 
 # Monkey patch the Node class to add the local_sort method
 Node.local_sort = local_sort
 
-def run_sorting_experiment(num_nodes: int, num_data_points: int) -> Tuple[float, Dict[str, List[Tuple]]]:
-    cluster = Cluster(f"SortCluster_{num_nodes}")
+def run_sorting_experiment(num_nodes: int, num_data_points: int, vectorized: bool = True,
+                           splitter: str = 'equal_width',
+                           executor_kind: str = 'serial') -> Tuple[float, Dict[str, List[Tuple]]]:
+    # One worker per node, started before the clock so pool start-up is not measured
+    cluster = Cluster(f"SortCluster_{num_nodes}", executor=create_executor(executor_kind, max_workers=num_nodes))
     cluster.generate_random_cluster(num_nodes)
     relation = [(random.randint(1, 1000000), f"data_{i}") for i in range(num_data_points)]
+    cluster.executor.warm_up()
     start_time = time.time()
-    partitions = range_partition(cluster, relation, sort_attribute=0)
-    for node_id, partition in partitions.items():
-        cluster.nodes[node_id].local_sort(partition, sort_attribute=0)
+    if vectorized:
+        indices = range_partition_indices(cluster, relation, sort_attribute=0, splitter=splitter)
+        partitions = materialize_partitions(relation, indices)
+    else:
+        partitions = range_partition(cluster, relation, sort_attribute=0)
+    sort_partitions(cluster, partitions, sort_attribute=0)
     end_time = time.time()
+    cluster.executor.shutdown()
     return end_time - start_time, partitions
 
+def compare_partitioners(num_nodes: int = 5, num_data_points: int = 100000) -> Dict[str, float]:
+    """
+    Time the per-tuple and the vectorized partitioner on the same relation.
+
+    Args:
+        num_nodes (int): The number of nodes in the cluster.
+        num_data_points (int): The number of tuples to partition.
+
+    Returns:
+        Dict[str, float]: Seconds spent in each partitioner.
+    """
+    cluster = Cluster(f"SortCluster_{num_nodes}")
+    cluster.generate_random_cluster(num_nodes)
+    relation = [(random.randint(1, 1000000), f"data_{i}") for i in range(num_data_points)]
+
+    start_time = time.time()
+    range_partition(cluster, relation, sort_attribute=0)
+    per_tuple_time = time.time() - start_time
+
+    start_time = time.time()
+    materialize_partitions(relation, range_partition_indices(cluster, relation, sort_attribute=0))
+    vectorized_time = time.time() - start_time
+
+    return {"per_tuple": per_tuple_time, "vectorized": vectorized_time}
+
+def compare_splitters(num_nodes: int = 5, num_data_points: int = 100000, zipf_exponent: float = 1.2) -> Dict[str, float]:
+    """
+    Partition Zipf-distributed keys with both splitter strategies and report
+    the imbalance factor of each, relative to the nodes' compute shares.
+
+    Args:
+        num_nodes (int): The number of nodes in the cluster.
+        num_data_points (int): The number of tuples to partition.
+        zipf_exponent (float): Skew of the key distribution.
+
+    Returns:
+        Dict[str, float]: The imbalance factor per splitter.
+    """
+    cluster = Cluster(f"SortCluster_{num_nodes}")
+    cluster.generate_random_cluster(num_nodes)
+    keys = np.minimum(np.random.zipf(zipf_exponent, num_data_points), 1000000)
+    relation = [(int(key), f"data_{i}") for i, key in enumerate(keys)]
+    weights = node_weights(cluster, list(cluster.nodes.keys()))
+
+    imbalance = {}
+    for splitter in ('equal_width', 'sample'):
+        indices = range_partition_indices(cluster, relation, sort_attribute=0, splitter=splitter)
+        imbalance[splitter] = partition_imbalance([len(idx) for idx in indices.values()], weights)
+    return imbalance
+
 def plot_range_sort_visualizations():
     num_nodes = 5
     num_data_points = 10000
@@ -100,7 +447,7 @@ def plot_range_sort_visualizations():
     # 1. Partition Distribution
     partition_sizes = [len(partition) for partition in partitions.values()]
     ax1.bar(range(num_nodes), partition_sizes)
-    ax1.set_title("Partition Size Distribution")
+    ax1.set_title(f"Partition Size Distribution (imbalance {partition_imbalance(partition_sizes):.2f})")
     ax1.set_xlabel("Node ID")
     ax1.set_ylabel("Number of Elements")
 
@@ -126,9 +473,10 @@ def plot_range_sort_visualizations():
     ax3.set_xlabel("Time (seconds)")
     ax3.set_ylabel("Percentage Sorted")
 
-    # 4. Parallel Efficiency
-    single_node_time = run_sorting_experiment(1, num_data_points)[0]
-    speedups = [single_node_time / run_sorting_experiment(n, num_data_points)[0] for n in range(1, num_nodes + 1)]
+    # 4. Parallel Efficiency: every node sorts in its own worker process
+    single_node_time = run_sorting_experiment(1, num_data_points, executor_kind='process')[0]
+    speedups = [single_node_time / run_sorting_experiment(n, num_data_points, executor_kind='process')[0]
+                for n in range(1, num_nodes + 1)]
     ax4.plot(range(1, num_nodes + 1), speedups, marker='o')
     ax4.plot([1, num_nodes], [1, num_nodes], 'r--', label="Ideal Speedup")
     ax4.set_title("Parallel Efficiency")
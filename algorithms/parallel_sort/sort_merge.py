@@ -1,10 +1,16 @@
+import heapq
 import random
+from operator import itemgetter
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from cluster_simulator.node import Node
 from cluster_simulator.cluster import Cluster
+from cluster_simulator.executor import NodeExecutor
+from algorithms.relation import Relation
+
+TimeRelation = Union[List[Tuple[datetime, datetime, str, int]], Relation]
 
 def generate_time_based_data(points_per_node: int, num_nodes: int) -> List[Tuple[datetime, datetime, str, int]]:
     data = []
@@ -22,22 +28,98 @@ def generate_time_based_data(points_per_node: int, num_nodes: int) -> List[Tuple
     
     return data
 
-def local_sort(partition: List[Tuple[datetime, datetime, str, int]]) -> List[Tuple[datetime, datetime, str, int]]:
-    return sorted(partition, key=lambda x: x[0])
+def sort_key(item: Tuple[datetime, datetime, str, int]) -> datetime:
+    return item[0]
 
-def parallel_external_sort_merge(cluster: Cluster, relation: List[Tuple[datetime, datetime, str, int]]) -> List[Tuple[datetime, datetime, str, int]]:
-    num_nodes = len(cluster.nodes)
-    
+def local_sort(partition: TimeRelation) -> TimeRelation:
+    if isinstance(partition, Relation):
+        return partition.take(np.argsort(partition.column(0), kind='stable'))
+    return sorted(partition, key=sort_key)
+
+def partition_by_node(relation: TimeRelation, num_nodes: int) -> List[TimeRelation]:
     # Distribute data to nodes based on the preassigned node
+    if isinstance(relation, Relation):
+        return relation.partition(relation.column(3), num_nodes)
     node_partitions = [[] for _ in range(num_nodes)]
     for item in relation:
         node_partitions[item[3]].append(item)
-    
+    return node_partitions
+
+def merge_sorted_runs(runs: List[Iterable], key: Callable = sort_key, fan_in: Optional[int] = None) -> Iterator:
+    """
+    Lazily merge locally sorted runs into one globally ordered stream.
+
+    Each merge keeps a heap holding only the current head of every input run,
+    so items are produced one at a time without materializing the output.
+    Ties are broken by run order, which keeps the merge stable.
+
+    When ``fan_in`` is given and there are more runs than that, the runs are
+    merged through a tree of generators in which no merge reads from more
+    than ``fan_in`` inputs: groups of ``fan_in`` runs are merged first, then
+    those merged streams are merged in turn, until one stream is left.
+
+    Args:
+        runs (List[Iterable]): The sorted runs to merge.
+        key (Callable): Extracts the comparison key from an item.
+        fan_in (Optional[int]): Maximum number of inputs per merge, at least 2.
+
+    Returns:
+        Iterator: The merged items in ascending key order.
+    """
+    if fan_in is not None and fan_in < 2:
+        raise ValueError("fan_in must be at least 2.")
+
+    streams = list(runs)
+    while fan_in is not None and len(streams) > fan_in:
+        streams = [heapq.merge(*streams[i:i + fan_in], key=key) for i in range(0, len(streams), fan_in)]
+    return heapq.merge(*streams, key=key)
+
+def sort_node_runs(cluster: Cluster, relation: TimeRelation, executor: Optional[NodeExecutor] = None,
+                   chunksize: int = 1) -> List[TimeRelation]:
+    node_partitions = partition_by_node(relation, len(cluster.nodes))
+
     # Local sort on each node
-    locally_sorted = [local_sort(partition) for partition in node_partitions]
-    
+    executor = executor or cluster.executor
+    return list(executor.map(local_sort, node_partitions, chunksize=chunksize))
+
+def parallel_external_sort_merge_stream(cluster: Cluster, relation: TimeRelation,
+                                        fan_in: Optional[int] = None, executor: Optional[NodeExecutor] = None,
+                                        chunksize: int = 1) -> Iterator[Tuple[datetime, datetime, str, int]]:
+    """
+    Sort each node's partition locally, then stream the k-way merge of the
+    sorted runs instead of re-sorting the concatenated relation.
+
+    Args:
+        cluster (Cluster): The cluster whose nodes hold the partitions.
+        relation (TimeRelation): Rows whose last field is the index of the
+            node that holds them, as tuples or as a columnar ``Relation``.
+        fan_in (Optional[int]): Maximum number of runs per merge (see
+            ``merge_sorted_runs``).
+        executor (Optional[NodeExecutor]): Runs the local sorts. Defaults to
+            the cluster's executor.
+        chunksize (int): Partitions dispatched to a worker at a time.
+
+    Returns:
+        Iterator[Tuple[datetime, datetime, str, int]]: The rows in timestamp order.
+    """
+    locally_sorted = sort_node_runs(cluster, relation, executor, chunksize)
+
     # Merge sorted partitions
-    return sorted([item for partition in locally_sorted for item in partition], key=lambda x: x[0])
+    return merge_sorted_runs(locally_sorted, key=sort_key, fan_in=fan_in)
+
+def parallel_external_sort_merge(cluster: Cluster, relation: TimeRelation,
+                                 fan_in: Optional[int] = None, executor: Optional[NodeExecutor] = None,
+                                 chunksize: int = 1) -> TimeRelation:
+    if not isinstance(relation, Relation):
+        return list(parallel_external_sort_merge_stream(cluster, relation, fan_in, executor, chunksize))
+
+    # Columnar input: merge only (timestamp, position) pairs, then gather the rows in one take
+    locally_sorted = sort_node_runs(cluster, relation, executor, chunksize)
+    offsets = np.cumsum([0] + [len(run) for run in locally_sorted])
+    runs = [zip(run.column(0).tolist(), range(offsets[i], offsets[i + 1])) for i, run in enumerate(locally_sorted)]
+    positions = np.fromiter((position for _, position in merge_sorted_runs(runs, key=itemgetter(0), fan_in=fan_in)),
+                            dtype=np.intp, count=len(relation))
+    return Relation.concat(locally_sorted).take(positions)
 
 def visualize_sort_merge(num_nodes: int, points_per_node: int):
     cluster = Cluster(f"SortCluster_{num_nodes}")
@@ -66,9 +148,7 @@ def visualize_sort_merge(num_nodes: int, points_per_node: int):
 
     # Step 2: Local sorting on each node
     axs[1].set_title("2. Local Sorting on Each Node (by Timestamp)")
-    node_partitions = [[] for _ in range(num_nodes)]
-    for item in relation:
-        node_partitions[item[3]].append(item)
+    node_partitions = partition_by_node(relation, num_nodes)
     locally_sorted = [local_sort(partition) for partition in node_partitions]
     for i, partition in enumerate(locally_sorted):
         for timestamp, _, _, _ in partition:
@@ -0,0 +1,115 @@
+from typing import Any, Sequence, Tuple
+from dataclasses import dataclass
+import math
+import numpy as np
+from algorithms.parallell_join.hashing import hash_keys, mix64
+
+BLOCK_BITS = 512  # One 64-byte cache line per block in the blocked variant
+SECOND_HASH_SALT = 0x5851F42D4C957F2D  # Decorrelates the second hash from the first
+
+class BloomFilter:
+    def __init__(self, expected_items: int, false_positive_rate: float = 0.01, blocked: bool = False):
+        """
+        A Bloom filter over join keys, stored as a packed bit array.
+
+        Keys are hashed in batches with the same stable hash as the
+        partitioner, and the ``k`` bit positions are derived by double hashing
+        (``h1 + i * h2``). In the blocked variant all ``k`` bits of a key fall
+        in one 512-bit block, so a lookup touches a single cache line at the
+        cost of a slightly higher false-positive rate.
+
+        Args:
+            expected_items (int): Number of keys that will be added.
+            false_positive_rate (float): Target false-positive rate.
+            blocked (bool): Use the cache-line blocked layout.
+        """
+        expected_items = max(1, expected_items)
+        num_bits = math.ceil(-expected_items * math.log(false_positive_rate) / math.log(2) ** 2)
+        if blocked:
+            num_bits = math.ceil(num_bits / BLOCK_BITS) * BLOCK_BITS
+        else:
+            num_bits = math.ceil(num_bits / 64) * 64
+        self.num_bits: int = num_bits
+        self.num_hashes: int = max(1, round(num_bits / expected_items * math.log(2)))
+        self.blocked: bool = blocked
+        self.expected_false_positive_rate: float = false_positive_rate
+        self.words = np.zeros(num_bits // 64, dtype=np.uint64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.words.nbytes
+
+    def bit_positions(self, keys: Sequence[Any]) -> np.ndarray:
+        """The ``(len(keys), num_hashes)`` bit positions of every key."""
+        first = hash_keys(keys)
+        second = mix64(first.view(np.int64) ^ np.int64(SECOND_HASH_SALT)) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        if not self.blocked:
+            return (first[:, None] + steps * second[:, None]) % np.uint64(self.num_bits)
+        block_starts = (first % np.uint64(self.num_bits // BLOCK_BITS)) * np.uint64(BLOCK_BITS)
+        offsets = (second[:, None] + steps * ((first[:, None] >> np.uint64(32)) | np.uint64(1))) % np.uint64(BLOCK_BITS)
+        return block_starts[:, None] + offsets
+
+    def add(self, keys: Sequence[Any]) -> None:
+        positions = self.bit_positions(keys).ravel()
+        np.bitwise_or.at(self.words, positions >> np.uint64(6), np.uint64(1) << (positions & np.uint64(63)))
+
+    def contains(self, keys: Sequence[Any]) -> np.ndarray:
+        """A boolean mask: False means the key was certainly never added."""
+        positions = self.bit_positions(keys)
+        bits = (self.words[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)
+        return bits.all(axis=1)
+
+@dataclass
+class SemiJoinStats:
+    build_rows: int  # Rows of the smaller table the filter was built from
+    probe_rows: int  # Rows of the larger table before filtering
+    rows_passed: int
+    false_positives: int  # Rows that passed the filter but have no matching key
+    filter_bytes: int
+    expected_false_positive_rate: float
+
+    @property
+    def rows_eliminated(self) -> int:
+        return self.probe_rows - self.rows_passed
+
+    @property
+    def false_positive_rate(self) -> float:
+        # Share of the rows without a match that the filter failed to eliminate
+        non_matching = self.rows_eliminated + self.false_positives
+        return self.false_positives / non_matching if non_matching else 0.0
+
+def as_list(keys: Sequence[Any]) -> list:
+    return keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+
+def bloom_semi_join_mask(build_keys: Sequence[Any], probe_keys: Sequence[Any], false_positive_rate: float = 0.01,
+                         blocked: bool = False) -> Tuple[np.ndarray, SemiJoinStats]:
+    """
+    Build a Bloom filter from ``build_keys`` and test every probe key.
+
+    Args:
+        build_keys (Sequence[Any]): Join keys of the smaller table.
+        probe_keys (Sequence[Any]): Join keys of the larger table.
+        false_positive_rate (float): Target false-positive rate of the filter.
+        blocked (bool): Use the cache-line blocked layout.
+
+    Returns:
+        Tuple[np.ndarray, SemiJoinStats]: The mask of probe rows that may have
+        a match, and the filter statistics. False positives are counted
+        against the exact key set, for reporting only.
+    """
+    bloom_filter = BloomFilter(len(build_keys), false_positive_rate, blocked)
+    bloom_filter.add(build_keys)
+    mask = bloom_filter.contains(probe_keys)
+
+    build_key_set = set(as_list(build_keys))
+    false_positives = sum(1 for key, passed in zip(as_list(probe_keys), mask.tolist()) if passed and key not in build_key_set)
+    stats = SemiJoinStats(
+        build_rows=len(build_keys),
+        probe_rows=len(probe_keys),
+        rows_passed=int(mask.sum()),
+        false_positives=false_positives,
+        filter_bytes=bloom_filter.nbytes,
+        expected_false_positive_rate=false_positive_rate,
+    )
+    return mask, stats
@@ -0,0 +1,236 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import numpy as np
+from algorithms.parallell_join.hashing import hash_keys, mix64
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024  # Bytes of build rows kept in memory
+PARTITION_BATCH_SIZE = 4096  # Rows hashed per vectorized batch
+MAX_RECURSION_DEPTH = 6  # Repartitioning levels before falling back to block nested loops
+
+def row_bytes(row: Tuple) -> int:
+    """Approximate in-memory size of a row: the tuple plus each of its fields."""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+def level_partition_ids(keys: List[Any], num_partitions: int, level: int) -> List[int]:
+    """
+    Partition keys with a hash that changes at every recursion level, so a
+    spilled partition that is repartitioned actually splits up.
+    """
+    hashes = hash_keys(keys)
+    if level:
+        hashes = mix64(hashes.view(np.int64) + level)
+    return (hashes % np.uint64(num_partitions)).tolist()
+
+def build_hash_table(rows: Iterable[Tuple]) -> Dict[Any, List[Tuple]]:
+    hash_table = defaultdict(list)
+    for row in rows:
+        hash_table[row[0]].append(row)
+    return hash_table
+
+class SpillFile:
+    def __init__(self, path: str):
+        """
+        An append-only file of pickled rows for one spilled partition.
+
+        Args:
+            path (str): Where the rows are written.
+        """
+        self.path = path
+        self.file = open(path, "wb")
+        self.pickler = pickle.Pickler(self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.num_rows = 0
+        self.num_bytes = 0  # In-memory size of the rows, used to decide whether they fit when read back
+
+    def write(self, row: Tuple, size: int) -> None:
+        self.pickler.dump(row)
+        # The pickler memoizes every object it has written; clear it so the memo does not grow with the file
+        self.pickler.clear_memo()
+        self.num_rows += 1
+        self.num_bytes += size
+
+    def close(self) -> int:
+        """Close the file for writing and return its size on disk."""
+        self.file.close()
+        return os.path.getsize(self.path)
+
+    def read(self) -> Iterator[Tuple]:
+        with open(self.path, "rb") as spill_file:
+            unpickler = pickle.Unpickler(spill_file)
+            for _ in range(self.num_rows):
+                yield unpickler.load()
+
+@dataclass
+class HybridHashJoinStats:
+    in_memory_bytes: int = 0  # Build rows that never left memory
+    reloaded_bytes: int = 0  # Spilled build rows read back from disk to be joined, at every level
+    spilled_bytes_r: int = 0  # Bytes written to disk for spilled build (R) partitions
+    spilled_bytes_s: int = 0  # Bytes written to disk for spilled probe (S) partitions
+    spilled_partitions: int = 0
+    recursion_depth: int = 0  # Deepest repartitioning level reached
+    nested_loop_fallbacks: int = 0  # Partitions that could not be split below the budget
+
+    @property
+    def spilled_bytes(self) -> int:
+        return self.spilled_bytes_r + self.spilled_bytes_s
+
+class HybridHashJoin:
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET, num_partitions: int = 8,
+                 scratch_dir: Optional[str] = None, max_recursion_depth: int = MAX_RECURSION_DEPTH):
+        """
+        Hybrid hash join of a build relation R with a probe relation S under a
+        memory budget.
+
+        R is hash-partitioned into memory; whenever its partitions outgrow the
+        budget, the largest in-memory partition is written to disk and every
+        later row of that partition follows it. S is then streamed: rows of
+        in-memory partitions are probed right away, rows of spilled
+        partitions are written next to their R partition. Each spilled pair
+        is joined afterwards, recursively repartitioned with a new hash if
+        the R side still does not fit.
+
+        Args:
+            memory_budget (int): Bytes of R rows that may be held in memory.
+            num_partitions (int): Partitions created at every level.
+            scratch_dir (Optional[str]): Parent directory for spill files. A
+                temporary directory is used when omitted.
+            max_recursion_depth (int): Repartitioning levels before a
+                partition is joined with block nested loops instead.
+        """
+        if num_partitions < 2:
+            raise ValueError("num_partitions must be at least 2.")
+        self.memory_budget = memory_budget
+        self.num_partitions = num_partitions
+        self.scratch_dir = scratch_dir
+        self.max_recursion_depth = max_recursion_depth
+        self.stats = HybridHashJoinStats()
+        self._spill_dir: Optional[str] = None
+        self._spill_count = 0
+
+    def join(self, table_r: Iterable[Tuple], table_s: Iterable[Tuple]) -> Iterator[Tuple[Tuple, Tuple]]:
+        """
+        Join R and S on their first field. R should be the smaller relation.
+
+        Args:
+            table_r (Iterable[Tuple]): The build relation.
+            table_s (Iterable[Tuple]): The probe relation.
+
+        Returns:
+            Iterator[Tuple[Tuple, Tuple]]: The ``(r_row, s_row)`` pairs.
+        """
+        self.stats = HybridHashJoinStats()
+        self._spill_dir = tempfile.mkdtemp(prefix="hybrid_hash_join_", dir=self.scratch_dir)
+        try:
+            yield from self._join(table_r, table_s, level=0)
+        finally:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _new_spill_file(self, side: str) -> SpillFile:
+        self._spill_count += 1
+        return SpillFile(os.path.join(self._spill_dir, f"{side}_{self._spill_count}.pkl"))
+
+    def _join(self, table_r: Iterable[Tuple], table_s: Iterable[Tuple], level: int) -> Iterator[Tuple[Tuple, Tuple]]:
+        self.stats.recursion_depth = max(self.stats.recursion_depth, level)
+
+        # Build phase: partition R into memory, spilling the largest partition whenever over budget
+        buckets: Dict[int, List[Tuple]] = defaultdict(list)
+        bucket_bytes: Dict[int, int] = defaultdict(int)
+        spilled_r: Dict[int, SpillFile] = {}
+        in_memory = 0
+        for rows, partition_ids in self._partitioned_batches(table_r, level):
+            for row, partition_id in zip(rows, partition_ids):
+                size = row_bytes(row)
+                if partition_id in spilled_r:
+                    spilled_r[partition_id].write(row, size)
+                    continue
+                buckets[partition_id].append(row)
+                bucket_bytes[partition_id] += size
+                in_memory += size
+                while in_memory > self.memory_budget and buckets:
+                    victim = max(buckets, key=bucket_bytes.__getitem__)
+                    spill_file = spilled_r[victim] = self._new_spill_file("r")
+                    for victim_row in buckets.pop(victim):
+                        spill_file.write(victim_row, row_bytes(victim_row))
+                    in_memory -= bucket_bytes.pop(victim)
+
+        for spill_file in spilled_r.values():
+            self.stats.spilled_bytes_r += spill_file.close()
+        self.stats.spilled_partitions += len(spilled_r)
+        if level == 0:
+            self.stats.in_memory_bytes += in_memory
+        else:
+            self.stats.reloaded_bytes += in_memory  # These rows came from a spill file
+
+        hash_tables = {partition_id: build_hash_table(rows) for partition_id, rows in buckets.items()}
+        del buckets
+
+        # Probe phase: join S rows of in-memory partitions, spill the rest next to their R partition
+        spilled_s = {partition_id: self._new_spill_file("s") for partition_id in spilled_r}
+        for rows, partition_ids in self._partitioned_batches(table_s, level):
+            for s_row, partition_id in zip(rows, partition_ids):
+                if partition_id in spilled_s:
+                    spilled_s[partition_id].write(s_row, 0)
+                    continue
+                hash_table = hash_tables.get(partition_id)
+                if hash_table is not None:
+                    for r_row in hash_table.get(s_row[0], ()):
+                        yield (r_row, s_row)
+        del hash_tables
+
+        for spill_file in spilled_s.values():
+            self.stats.spilled_bytes_s += spill_file.close()
+
+        # Join the spilled partition pairs one at a time
+        for partition_id, r_file in spilled_r.items():
+            s_file = spilled_s[partition_id]
+            if s_file.num_rows:
+                yield from self._join_spilled_pair(r_file, s_file, level)
+            os.remove(r_file.path)
+            os.remove(s_file.path)
+
+    def _join_spilled_pair(self, r_file: SpillFile, s_file: SpillFile, level: int) -> Iterator[Tuple[Tuple, Tuple]]:
+        if r_file.num_bytes <= self.memory_budget:
+            self.stats.reloaded_bytes += r_file.num_bytes
+            hash_table = build_hash_table(r_file.read())
+            for s_row in s_file.read():
+                for r_row in hash_table.get(s_row[0], ()):
+                    yield (r_row, s_row)
+        elif level < self.max_recursion_depth:
+            # Still too big: repartition the pair with the next level's hash
+            yield from self._join(r_file.read(), s_file.read(), level + 1)
+        else:
+            self.stats.nested_loop_fallbacks += 1
+            yield from self._block_nested_loop_join(r_file, s_file)
+
+    def _block_nested_loop_join(self, r_file: SpillFile, s_file: SpillFile) -> Iterator[Tuple[Tuple, Tuple]]:
+        # R holds too many rows of too few keys to split: load it one budget-sized block at a time
+        r_rows = r_file.read()
+        while True:
+            block, block_bytes = [], 0
+            for row in r_rows:
+                block.append(row)
+                block_bytes += row_bytes(row)
+                if block_bytes >= self.memory_budget:
+                    break
+            if not block:
+                return
+            self.stats.reloaded_bytes += block_bytes
+            hash_table = build_hash_table(block)
+            for s_row in s_file.read():
+                for r_row in hash_table.get(s_row[0], ()):
+                    yield (r_row, s_row)
+
+    def _partitioned_batches(self, table: Iterable[Tuple], level: int) -> Iterator[Tuple[List[Tuple], List[int]]]:
+        rows_iter = iter(table)
+        while True:
+            rows = list(islice(rows_iter, PARTITION_BATCH_SIZE))
+            if not rows:
+                return
+            yield rows, level_partition_ids([row[0] for row in rows], self.num_partitions, level)
@@ -1,35 +1,273 @@
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Iterator, Tuple, Optional, Union
+from collections import Counter, defaultdict
+from operator import itemgetter
+import random
 from cluster_simulator.cluster import Cluster
-import hashlib
+from cluster_simulator.executor import NodeExecutor, SerialExecutor
+from cluster_simulator.network import ShuffleCost, ShuffleSimulator, default_placement, phase_sizes
+from algorithms.parallell_join.hashing import hash_partition_ids, md5_partition_id
+from algorithms.parallell_join.bloom_filter import SemiJoinStats, as_list, bloom_semi_join_mask
+from algorithms.parallell_join.skew import (DEFAULT_SKEW_THRESHOLD, SkewStats, assign_heavy_hitters, detect_heavy_hitters,
+                                            split_rows)
+from algorithms.relation import Relation
+import numpy as np
+
+NESTED_LOOP_MAX_PAIRS = 256  # Below this many row pairs a nested loop beats building anything
+HASH_TABLE_BYTES_PER_ROW = 200  # Rough in-memory size of one build row in a Python dict of lists
+RANGE_MAX_IMBALANCE = 1.5  # Largest partition / mean partition, on a key sample, that still allows range partitioning
+PLANNER_SAMPLE_SIZE = 1000  # Keys sampled per table by choose_partition_type
+
+Table = Union[List[Tuple[int, any]], Relation]
+
+def nested_loop_join_partition(r_partition: List[Tuple[int, any]], s_partition: List[Tuple[int, any]]) -> Iterator[Tuple[any, any]]:
+    """
+    Join one pair of co-located partitions with a nested loop.
+
+    Args:
+        r_partition (List[Tuple[int, any]]): The partition of the first table.
+        s_partition (List[Tuple[int, any]]): The partition of the second table.
+
+    Returns:
+        Iterator[Tuple[any, any]]: The matching ``(r_row, s_row)`` pairs.
+    """
+    for r_row in r_partition:
+        for s_row in s_partition:
+            if r_row[0] == s_row[0]:  # Join based on the key
+                yield (r_row, s_row)
+
+def hash_join_partition(r_partition: List[Tuple[int, any]], s_partition: List[Tuple[int, any]]) -> Iterator[Tuple[any, any]]:
+    """
+    Join one pair of co-located partitions with a build/probe hash join.
+
+    The hash table is built on the smaller side and maps each key to all of
+    its rows, so duplicate keys on either side produce every matching pair.
+    Output pairs are always ``(r_row, s_row)`` whichever side was built.
+
+    Args:
+        r_partition (List[Tuple[int, any]]): The partition of the first table.
+        s_partition (List[Tuple[int, any]]): The partition of the second table.
+
+    Returns:
+        Iterator[Tuple[any, any]]: The matching ``(r_row, s_row)`` pairs.
+    """
+    build_is_r = len(r_partition) <= len(s_partition)
+    build, probe = (r_partition, s_partition) if build_is_r else (s_partition, r_partition)
+
+    # Build phase
+    hash_table = defaultdict(list)
+    for row in build:
+        hash_table[row[0]].append(row)
+
+    # Probe phase
+    for probe_row in probe:
+        for build_row in hash_table.get(probe_row[0], ()):
+            yield (build_row, probe_row) if build_is_r else (probe_row, build_row)
+
+def sort_merge_join_partition(r_partition: List[Tuple[int, any]], s_partition: List[Tuple[int, any]]) -> Iterator[Tuple[any, any]]:
+    """
+    Join one pair of co-located partitions by sorting both on the key and
+    merging them. Runs of equal keys on both sides produce their full cross
+    product, so duplicate keys are handled.
+
+    Args:
+        r_partition (List[Tuple[int, any]]): The partition of the first table.
+        s_partition (List[Tuple[int, any]]): The partition of the second table.
+
+    Returns:
+        Iterator[Tuple[any, any]]: The matching ``(r_row, s_row)`` pairs in key order.
+    """
+    r_sorted = sorted(r_partition, key=itemgetter(0))
+    s_sorted = sorted(s_partition, key=itemgetter(0))
+
+    r_idx = s_idx = 0
+    while r_idx < len(r_sorted) and s_idx < len(s_sorted):
+        r_key = r_sorted[r_idx][0]
+        s_key = s_sorted[s_idx][0]
+        if r_key < s_key:
+            r_idx += 1
+        elif s_key < r_key:
+            s_idx += 1
+        else:
+            # Find the end of the run of equal keys on each side
+            r_end = r_idx
+            while r_end < len(r_sorted) and r_sorted[r_end][0] == r_key:
+                r_end += 1
+            s_end = s_idx
+            while s_end < len(s_sorted) and s_sorted[s_end][0] == s_key:
+                s_end += 1
+            for r_row in r_sorted[r_idx:r_end]:
+                for s_row in s_sorted[s_idx:s_end]:
+                    yield (r_row, s_row)
+            r_idx, s_idx = r_end, s_end
+
+def columnar_join_partition(r_partition: Table, s_partition: Table) -> Iterator[Tuple[any, any]]:
+    """
+    Join one pair of co-located columnar partitions without touching rows
+    until the output is built.
+
+    The S keys are argsorted once; two ``searchsorted`` calls give, for
+    every R key, the range of equal S keys, and ``np.repeat`` expands those
+    ranges into matching index pairs. Only the matching rows are then
+    converted back to tuples.
+
+    Args:
+        r_partition (Table): The partition of the first table.
+        s_partition (Table): The partition of the second table.
+
+    Returns:
+        Iterator[Tuple[any, any]]: The matching ``(r_row, s_row)`` pairs.
+    """
+    if not len(r_partition) or not len(s_partition):
+        return iter(())
+    if not isinstance(r_partition, Relation):
+        r_partition = Relation.from_rows(r_partition)
+    if not isinstance(s_partition, Relation):
+        s_partition = Relation.from_rows(s_partition)
+
+    r_keys = r_partition.values(0)
+    s_keys = s_partition.values(0)
+    s_order = np.argsort(s_keys, kind='stable')
+    s_sorted = s_keys[s_order]
+    lower = np.searchsorted(s_sorted, r_keys, side='left')
+    upper = np.searchsorted(s_sorted, r_keys, side='right')
+
+    counts = upper - lower
+    r_indices = np.repeat(np.arange(len(r_keys)), counts)
+    # Position of every output pair inside its R key's run of equal S keys
+    run_starts = np.repeat(lower - (np.cumsum(counts) - counts), counts)
+    s_indices = s_order[run_starts + np.arange(counts.sum())]
+    return zip(r_partition.take(r_indices).to_rows(), s_partition.take(s_indices).to_rows())
+
+LOCAL_JOIN_ALGORITHMS: Dict[str, Callable[[List[Tuple[int, any]], List[Tuple[int, any]]], Iterator[Tuple[any, any]]]] = {
+    'nested_loop': nested_loop_join_partition,
+    'hash': hash_join_partition,
+    'sort_merge': sort_merge_join_partition,
+    'columnar': columnar_join_partition,
+}
+
+def choose_local_join(r_size: int, s_size: int, memory_mb: int, columnar: bool = False) -> str:
+    """
+    Pick the local join algorithm for one partition pair.
+
+    Columnar partitions always use the vectorized columnar join. For tuples,
+    tiny partitions use a nested loop, which has no build cost. Otherwise a
+    hash join is used as long as the hash table on the smaller side fits in
+    the node's memory; when it does not, sort-merge join is used.
+
+    Args:
+        r_size (int): Rows in the partition of the first table.
+        s_size (int): Rows in the partition of the second table.
+        memory_mb (int): Memory of the node that runs the join, in MB.
+        columnar (bool): Whether the partitions are ``Relation`` slices.
+
+    Returns:
+        str: A key of ``LOCAL_JOIN_ALGORITHMS``.
+    """
+    if columnar:
+        return 'columnar'
+    if r_size * s_size <= NESTED_LOOP_MAX_PAIRS:
+        return 'nested_loop'
+    if min(r_size, s_size) * HASH_TABLE_BYTES_PER_ROW <= memory_mb * 1024 * 1024:
+        return 'hash'
+    return 'sort_merge'
+
+def hash_table_bytes(table: Table) -> int:
+    """Memory needed to hold ``table`` as the build side of a local join."""
+    if isinstance(table, Relation):
+        return table.nbytes
+    return len(table) * HASH_TABLE_BYTES_PER_ROW
+
+def key_bounds(table: Table) -> Tuple[any, any]:
+    """The smallest and largest join key of a non-empty table."""
+    if isinstance(table, Relation):
+        keys = table.values(0)
+        return keys.min().item(), keys.max().item()
+    return min(row[0] for row in table), max(row[0] for row in table)
+
+def join_keys(table: Table) -> Union[List[any], np.ndarray]:
+    return table.values(0) if isinstance(table, Relation) else [row[0] for row in table]
+
+def filter_rows(table: Table, mask: np.ndarray) -> Table:
+    if isinstance(table, Relation):
+        return table.take(np.flatnonzero(mask))
+    return [row for row, keep in zip(table, mask.tolist()) if keep]
+
+def as_relation(table: Table) -> Relation:
+    return table if isinstance(table, Relation) else Relation.from_rows(table, num_columns=2)
+
+def scatter_rows(table: Table, indices: List[int], partition_ids: List[int], num_partitions: int) -> Dict[int, Table]:
+    """Send row ``indices[i]`` of ``table`` to partition ``partition_ids[i]``; a row may be listed more than once."""
+    if isinstance(table, Relation):
+        selected = table.take(np.array(indices, dtype=np.intp))
+        return dict(enumerate(selected.partition(np.array(partition_ids, dtype=np.intp), num_partitions)))
+    partitions = {i: [] for i in range(num_partitions)}
+    for index, partition_id in zip(indices, partition_ids):
+        partitions[partition_id].append(table[index])
+    return partitions
+
+def slice_rows(table: Table, start: int, stop: int) -> Table:
+    return table.slice(start, stop) if isinstance(table, Relation) else table[start:stop]
+
+def concat_tables(first: Table, second: Table) -> Table:
+    if isinstance(first, Relation):
+        return Relation.concat([first, second])
+    return first + second
+
+def run_local_join(algorithm: str, r_partition: Table, s_partition: Table) -> List[Tuple[any, any]]:
+    """
+    Run a local join to completion. Used as the task sent to pooled executors,
+    whose results have to be pickled back as a whole.
+    """
+    return list(LOCAL_JOIN_ALGORITHMS[algorithm](r_partition, s_partition))
 
 class PartitionedParallelJoin:
-    def __init__(self, cluster: Cluster):
+    def __init__(self, cluster: Cluster, hash_function: str = 'fast'):
         """
         Initialize the PartitionedParallelJoin with a given cluster.
 
         Args:
             cluster (Cluster): The cluster on which the join operation will be performed.
+            hash_function (str): 'fast' for the vectorized SplitMix64 partitioner
+                or 'md5' for the original per-row MD5 partitioner.
         """
+        if hash_function not in ('fast', 'md5'):
+            raise ValueError("Invalid hash_function. Use 'fast' or 'md5'.")
         self.cluster = cluster
-        self.num_partitions = len(cluster.nodes)  # Number of partitions equals number of nodes
+        self.hash_function = hash_function
+        self.num_partitions = len(cluster.partition_node_ids())  # Number of partitions equals number of (live) nodes
+        self.local_join_plan: Dict[int, str] = {}  # Local join algorithm used per partition by the last join
+        self.semi_join_stats: Optional[SemiJoinStats] = None  # Bloom pre-filter results of the last join
+        self.skew_stats: Optional[SkewStats] = None  # Heavy hitters and per-node work of the last skew-aware join
+        self.partition_type: Optional[str] = None  # Partitioning used by the last join, after resolving 'auto'
+        self.partition_placement: Dict[int, str] = default_placement(cluster, range(self.num_partitions))  # Node of every partition
+        self.network_cost: Optional[ShuffleCost] = None  # Simulated shuffle cost of the last network-aware join
 
-    def range_partition(self, table: List[Tuple[int, any]]) -> Dict[int, List[Tuple[int, any]]]:
+    def range_partition(self, table: Table, key_range: Optional[Tuple[int, int]] = None) -> Dict[int, Table]:
         """
         Range partitioning function based on the join key.
 
         Args:
-            table (List[Tuple[int, any]]): The table to be partitioned.
+            table (Table): The table to be partitioned, as tuples or as a
+                columnar ``Relation`` (split into zero-copy slices).
+            key_range (Optional[Tuple[int, int]]): The ``(min_key, max_key)``
+                to split. Both inputs of a join must be split with the same
+                range so that equal keys land in the same partition. Defaults
+                to the range of ``table``.
 
         Returns:
-            Dict[int, List[Tuple[int, any]]]: A dictionary of partitions.
+            Dict[int, Table]: A dictionary of partitions.
         """
+        if isinstance(table, Relation):
+            return self.range_partition_relation(table, key_range)
+
         partitions = {i: [] for i in range(self.num_partitions)}
         if not table:
             return partitions
 
         # Determine range boundaries for partitioning based on the join key
-        min_key = min(row[0] for row in table)
-        max_key = max(row[0] for row in table)
+        if key_range is None:
+            key_range = key_bounds(table)
+        min_key, max_key = key_range
         range_size = (max_key - min_key + 1) / self.num_partitions
 
         for row in table:
@@ -40,16 +278,82 @@ class PartitionedParallelJoin:
 
         return partitions
 
-    def hash_partition(self, table: List[Tuple[int, any]]) -> Dict[int, List[Tuple[int, any]]]:
+    def range_partition_relation(self, table: Relation, key_range: Optional[Tuple[int, int]] = None) -> Dict[int, Relation]:
+        """
+        Range partitioning of a columnar relation, with the same buckets as
+        ``range_partition`` computed for the whole key column at once.
+
+        Args:
+            table (Relation): The table to be partitioned.
+            key_range (Optional[Tuple[int, int]]): The ``(min_key, max_key)`` to split.
+
+        Returns:
+            Dict[int, Relation]: A dictionary of zero-copy partitions.
+        """
+        if not len(table):
+            return {i: table for i in range(self.num_partitions)}
+        if key_range is None:
+            key_range = key_bounds(table)
+        min_key, max_key = key_range
+        range_size = (max_key - min_key + 1) / self.num_partitions
+
+        partition_ids = ((table.values(0) - min_key) // range_size).astype(np.intp)
+        partition_ids = np.minimum(partition_ids, self.num_partitions - 1)  # Ensure it's within bounds
+        return dict(enumerate(table.partition(partition_ids, self.num_partitions)))
+
+    def hash_partition(self, table: Table) -> Dict[int, Table]:
         """
         Hash partitioning function based on the join key.
 
         Args:
-            table (List[Tuple[int, any]]): The table to be partitioned.
+            table (Table): The table to be partitioned.
+
+        Returns:
+            Dict[int, Table]: A dictionary of partitions.
+        """
+        if self.hash_function == 'md5':
+            return self.md5_hash_partition(table)
+        return self.fast_hash_partition(table)
+
+    def fast_hash_partition(self, table: Table) -> Dict[int, Table]:
+        """
+        Hash partitioning with all keys hashed in one vectorized batch.
+
+        Args:
+            table (Table): The table to be partitioned.
+
+        Returns:
+            Dict[int, Table]: A dictionary of partitions.
+        """
+        if isinstance(table, Relation):
+            partition_ids = hash_partition_ids(table.values(0), self.num_partitions)
+            return dict(enumerate(table.partition(partition_ids, self.num_partitions)))
+
+        partitions = {i: [] for i in range(self.num_partitions)}
+        if not table:
+            return partitions
+
+        partition_ids = hash_partition_ids([row[0] for row in table], self.num_partitions)
+        for partition_id, row in zip(partition_ids.tolist(), table):
+            partitions[partition_id].append(row)
+
+        return partitions
+
+    def md5_hash_partition(self, table: Table) -> Dict[int, Table]:
+        """
+        Hash partitioning with an MD5 digest of every key, one row at a time.
+
+        Args:
+            table (Table): The table to be partitioned.
 
         Returns:
-            Dict[int, List[Tuple[int, any]]]: A dictionary of partitions.
+            Dict[int, Table]: A dictionary of partitions.
         """
+        if isinstance(table, Relation):
+            partition_ids = np.array([md5_partition_id(key, self.num_partitions) for key in table.values(0).tolist()],
+                                     dtype=np.intp)
+            return dict(enumerate(table.partition(partition_ids, self.num_partitions)))
+
         partitions = {i: [] for i in range(self.num_partitions)}
         if not table:
             return partitions
@@ -57,47 +361,384 @@ class PartitionedParallelJoin:
         for row in table:
             key = row[0]
             # Compute hash of the key and mod by number of partitions to assign to a partition
-            partition_id = int(hashlib.md5(str(key).encode()).hexdigest(), 16) % self.num_partitions
+            partition_id = md5_partition_id(key, self.num_partitions)
             partitions[partition_id].append(row)
 
         return partitions
 
-    def join(self, table_r: List[Tuple[int, any]], table_s: List[Tuple[int, any]], partition_type: str = 'range') -> List[Tuple[any, any]]:
+    def broadcast_nodes(self, table: Table) -> List[int]:
+        """The partitions whose node has enough memory to hold ``table`` as a hash table."""
+        required_mb = hash_table_bytes(table) / (1024 * 1024)
+        node_ids = self.cluster.partition_node_ids()
+        return [i for i, node_id in enumerate(node_ids) if self.cluster.nodes[node_id].memory >= required_mb]
+
+    def broadcast_partition(self, table_r: Table, table_s: Table) -> Tuple[Dict[int, Table], Dict[int, Table]]:
         """
-        Perform a partitioned parallel join using either range or hash partitioning.
+        Fragment-and-replicate partitioning: the smaller table is copied to
+        every node that can hold its hash table, and the larger table is cut
+        into one contiguous block per such node, as if each node already
+        stored that block. Only the smaller table crosses the network.
 
         Args:
-            table_r (List[Tuple[int, any]]): The first table to join.
-            table_s (List[Tuple[int, any]]): The second table to join.
-            partition_type (str): The type of partitioning to use ('range' or 'hash').
+            table_r (Table): The first table to join.
+            table_s (Table): The second table to join.
 
         Returns:
-            List[Tuple[any, any]]: The result of the join operation.
+            Tuple[Dict[int, Table], Dict[int, Table]]: The partitions of each
+            table. Nodes without enough memory get empty partitions.
+        """
+        broadcast_r = len(table_r) <= len(table_s)
+        small, large = (table_r, table_s) if broadcast_r else (table_s, table_r)
+        targets = self.broadcast_nodes(small)
+        if not targets:
+            raise ValueError("No node has enough memory to hold the broadcast table.")
+
+        small_partitions = {i: slice_rows(small, 0, 0) for i in range(self.num_partitions)}
+        large_partitions = {i: slice_rows(large, 0, 0) for i in range(self.num_partitions)}
+        bounds = np.linspace(0, len(large), len(targets) + 1).astype(int).tolist()
+        for target, start, stop in zip(targets, bounds, bounds[1:]):
+            small_partitions[target] = small  # Every target shares the same replica
+            large_partitions[target] = slice_rows(large, start, stop)
+        return (small_partitions, large_partitions) if broadcast_r else (large_partitions, small_partitions)
+
+    def choose_partition_type(self, table_r: Table, table_s: Table) -> str:
+        """
+        Pick the partitioning for a join from the input sizes and the
+        cluster's memory.
+
+        Broadcast is used when the smaller table fits in the memory of at
+        least half of the nodes and copying it to them moves fewer rows than
+        reshuffling both tables. Otherwise range partitioning is used for
+        numeric keys whose equal-width buckets come out balanced on a sample
+        of the keys, and hash partitioning for everything else.
+
+        Args:
+            table_r (Table): The first table to join.
+            table_s (Table): The second table to join.
+
+        Returns:
+            str: 'broadcast', 'range' or 'hash'.
+        """
+        small = table_r if len(table_r) <= len(table_s) else table_s
+        targets = self.broadcast_nodes(small)
+        broadcast_rows = len(small) * (len(targets) - 1)
+        shuffle_rows = (len(table_r) + len(table_s)) * (self.num_partitions - 1) / self.num_partitions
+        if 2 * len(targets) >= self.num_partitions and broadcast_rows < shuffle_rows:
+            return 'broadcast'
+
+        samples = [as_list(join_keys(table)) for table in (table_r, table_s) if len(table)]
+        samples = [random.sample(keys, min(PLANNER_SAMPLE_SIZE, len(keys))) for keys in samples]
+        keys = [key for sample in samples for key in sample]
+        if not keys or not all(isinstance(key, (int, float)) and not isinstance(key, bool) for key in keys):
+            return 'hash'
+        bounds = [key_bounds(table) for table in (table_r, table_s) if len(table)]
+        min_key, max_key = min(low for low, _ in bounds), max(high for _, high in bounds)
+        range_size = (max_key - min_key + 1) / self.num_partitions
+        bucket_ids = np.minimum(((np.array(keys, dtype=np.float64) - min_key) // range_size).astype(np.intp),
+                                self.num_partitions - 1)
+        bucket_sizes = np.bincount(bucket_ids, minlength=self.num_partitions)
+        return 'range' if bucket_sizes.max() <= RANGE_MAX_IMBALANCE * bucket_sizes.mean() else 'hash'
+
+    def partition_tables(self, table_r: Table, table_s: Table,
+                         partition_type: str) -> Tuple[Dict[int, Table], Dict[int, Table]]:
         """
+        Partition both join inputs with the same partitioning function.
+
+        If either input is a columnar ``Relation``, the other one is converted
+        too, so both are partitioned with the vectorized path.
+
+        Args:
+            table_r (Table): The first table to join.
+            table_s (Table): The second table to join.
+            partition_type (str): The type of partitioning to use ('range',
+                'hash', 'broadcast', or 'auto' for ``choose_partition_type``).
+
+        Returns:
+            Tuple[Dict[int, Table], Dict[int, Table]]: The partitions of each table.
+        """
+        if isinstance(table_r, Relation) or isinstance(table_s, Relation):
+            table_r, table_s = as_relation(table_r), as_relation(table_s)
+        if partition_type == 'auto':
+            partition_type = self.choose_partition_type(table_r, table_s)
+
+        if partition_type == 'broadcast':
+            return self.broadcast_partition(table_r, table_s)
         if partition_type == 'range':
-            # Partition both tables using range partitioning
-            r_partitions = self.range_partition(table_r)
-            s_partitions = self.range_partition(table_s)
-        elif partition_type == 'hash':
+            # Partition both tables using range partitioning over their combined key range
+            bounds = [key_bounds(table) for table in (table_r, table_s) if len(table)]
+            key_range = (min(low for low, _ in bounds), max(high for _, high in bounds)) if bounds else None
+            return self.range_partition(table_r, key_range), self.range_partition(table_s, key_range)
+        if partition_type == 'hash':
             # Partition both tables using hash partitioning
-            r_partitions = self.hash_partition(table_r)
-            s_partitions = self.hash_partition(table_s)
+            return self.hash_partition(table_r), self.hash_partition(table_s)
+        raise ValueError("Invalid partition_type. Use 'range', 'hash', 'broadcast' or 'auto'.")
+
+    def skew_partition_tables(self, table_r: Table, table_s: Table, partition_type: str,
+                              detection: str = 'sample',
+                              skew_threshold: float = DEFAULT_SKEW_THRESHOLD) -> Tuple[Dict[int, Table], Dict[int, Table]]:
+        """
+        Partition both join inputs, spreading heavy-hitter keys over several
+        nodes (partial fragment-and-replicate).
+
+        Heavy keys are detected on the larger (probe) table. Their probe rows
+        are split over the least-loaded partitions, filling them up to an
+        even level (see ``assign_heavy_hitters``), and the
+        matching rows of the smaller (build) table are copied to each of
+        those partitions, so every output pair is still produced exactly
+        once. All other rows keep their ``partition_tables`` placement. The
+        heavy keys and the rows per node before and after are recorded in
+        ``skew_stats``.
+
+        Args:
+            table_r (Table): The first table to join.
+            table_s (Table): The second table to join.
+            partition_type (str): The partitioning of the other rows ('range' or 'hash').
+            detection (str): 'sample' or 'sketch' (see ``detect_heavy_hitters``).
+            skew_threshold (float): Share of a fair partition a single key
+                must exceed to be treated as heavy.
+
+        Returns:
+            Tuple[Dict[int, Table], Dict[int, Table]]: The partitions of each table.
+        """
+        if isinstance(table_r, Relation) or isinstance(table_s, Relation):
+            table_r, table_s = as_relation(table_r), as_relation(table_s)
+        r_partitions, s_partitions = self.partition_tables(table_r, table_s, partition_type)
+        work_before = [len(r_partitions[i]) + len(s_partitions[i]) for i in range(self.num_partitions)]
+
+        probe_is_s = len(table_r) <= len(table_s)
+        build, probe = (table_r, table_s) if probe_is_s else (table_s, table_r)
+        heavy_hitters = detect_heavy_hitters(join_keys(probe), self.num_partitions, detection, skew_threshold)
+        if not heavy_hitters:
+            self.skew_stats = SkewStats(heavy_hitters, work_before, work_before)
+            return r_partitions, s_partitions
+
+        def is_light(table: Table) -> np.ndarray:
+            return np.fromiter((key not in heavy_hitters for key in as_list(join_keys(table))), dtype=bool, count=len(table))
+
+        # Keep the other rows where plain partitioning put them
+        r_partitions = {i: filter_rows(partition, is_light(partition)) for i, partition in r_partitions.items()}
+        s_partitions = {i: filter_rows(partition, is_light(partition)) for i, partition in s_partitions.items()}
+        node_loads = [len(r_partitions[i]) + len(s_partitions[i]) for i in range(self.num_partitions)]
+
+        build_keys, probe_keys = as_list(join_keys(build)), as_list(join_keys(probe))
+        build_counts = Counter(key for key in build_keys if key in heavy_hitters)
+        assignment = assign_heavy_hitters(heavy_hitters, node_loads, build_counts)
+
+        # Probe rows of a heavy key are split over its partitions by their shares, its build rows go to all of them
+        probe_counts = Counter(key for key in probe_keys if key in assignment)
+        deals = {key: np.repeat(list(shares), split_rows(probe_counts[key], list(shares.values()))).tolist()
+                 for key, shares in assignment.items()}
+        probe_indices, probe_targets, dealt = [], [], Counter()
+        for index, key in enumerate(probe_keys):
+            if key in deals:
+                probe_indices.append(index)
+                probe_targets.append(deals[key][dealt[key]])
+                dealt[key] += 1
+        build_indices, build_targets = [], []
+        for index, key in enumerate(build_keys):
+            for target in assignment.get(key, ()):
+                build_indices.append(index)
+                build_targets.append(target)
+
+        heavy_probe = scatter_rows(probe, probe_indices, probe_targets, self.num_partitions)
+        heavy_build = scatter_rows(build, build_indices, build_targets, self.num_partitions)
+        heavy_r, heavy_s = (heavy_build, heavy_probe) if probe_is_s else (heavy_probe, heavy_build)
+        r_partitions = {i: concat_tables(r_partitions[i], heavy_r[i]) for i in range(self.num_partitions)}
+        s_partitions = {i: concat_tables(s_partitions[i], heavy_s[i]) for i in range(self.num_partitions)}
+
+        work_after = [len(r_partitions[i]) + len(s_partitions[i]) for i in range(self.num_partitions)]
+        self.skew_stats = SkewStats(heavy_hitters, work_before, work_after)
+        return r_partitions, s_partitions
+
+    def bloom_reduce(self, table_r: Table, table_s: Table, false_positive_rate: float = 0.01,
+                     blocked: bool = False) -> Tuple[Table, Table]:
+        """
+        Semi-join reduction: drop rows of the larger table whose key cannot
+        match, before anything is partitioned or shipped.
+
+        A Bloom filter is built from the smaller table's keys and applied to
+        the larger table. The outcome is recorded in ``semi_join_stats``.
+
+        Args:
+            table_r (Table): The first table to join.
+            table_s (Table): The second table to join.
+            false_positive_rate (float): Target false-positive rate of the filter.
+            blocked (bool): Use the cache-line blocked filter layout.
+
+        Returns:
+            Tuple[Table, Table]: Both tables, the larger one filtered.
+        """
+        filter_s = len(table_r) <= len(table_s)
+        build, probe = (table_r, table_s) if filter_s else (table_s, table_r)
+        mask, self.semi_join_stats = bloom_semi_join_mask(join_keys(build), join_keys(probe), false_positive_rate, blocked)
+        probe = filter_rows(probe, mask)
+        return (table_r, probe) if filter_s else (probe, table_s)
+
+    def place_partitions(self, phases: Dict[str, Dict[int, Table]], optimize: bool = True) -> ShuffleCost:
+        """
+        Assign partitions to nodes to minimise the simulated shuffle time on
+        the cluster's network, and record the placement and its cost in
+        ``partition_placement`` and ``network_cost``.
+
+        Args:
+            phases (Dict[str, Dict[int, Table]]): The partition maps moved
+                over the network, by phase name.
+            optimize (bool): Search for a better placement, or only cost the
+                current one.
+
+        Returns:
+            ShuffleCost: The simulated cost of the chosen placement.
+        """
+        simulator = ShuffleSimulator(self.cluster)
+        if optimize:
+            self.partition_placement, self.network_cost = simulator.optimize_assignment(
+                phase_sizes(phases), self.partition_placement)
         else:
-            raise ValueError("Invalid partition_type. Use 'range' or 'hash'.")
+            self.network_cost = simulator.simulate_shuffle(phases, self.partition_placement)
+        return self.network_cost
 
-        # Join the partitions in parallel
-        results = []
+    def plan_local_joins(self, r_partitions: Dict[int, Table], s_partitions: Dict[int, Table],
+                         local_join: str = 'auto') -> Dict[int, str]:
+        """
+        Choose the local join algorithm for every partition.
+
+        Args:
+            r_partitions (Dict[int, Table]): The partitions of the first table.
+            s_partitions (Dict[int, Table]): The partitions of the second table.
+            local_join (str): 'auto' to let ``choose_local_join`` decide per
+                partition from its size and its node's memory, or one of
+                'hash', 'sort_merge', 'nested_loop' and 'columnar' for every partition.
+
+        Returns:
+            Dict[int, str]: The algorithm for each partition.
+        """
+        if local_join != 'auto' and local_join not in LOCAL_JOIN_ALGORITHMS:
+            raise ValueError("Invalid local_join. Use 'auto', 'hash', 'sort_merge', 'nested_loop' or 'columnar'.")
+
+        plan = {}
         for i in range(self.num_partitions):
-            r_partition = r_partitions[i]
-            s_partition = s_partitions[i]
+            if local_join == 'auto':
+                memory = self.cluster.nodes[self.partition_placement[i]].memory
+                plan[i] = choose_local_join(len(r_partitions[i]), len(s_partitions[i]), memory,
+                                            columnar=isinstance(r_partitions[i], Relation))
+            else:
+                plan[i] = local_join
+        return plan
+
+    def join_stream(self, table_r: Table, table_s: Table, partition_type: str = 'range',
+                    local_join: str = 'auto', executor: Optional[NodeExecutor] = None,
+                    chunksize: int = 1, bloom_filter: bool = False, bloom_false_positive_rate: float = 0.01,
+                    blocked_bloom: bool = False, skew_handling: bool = False, skew_detection: str = 'sample',
+                    skew_threshold: float = DEFAULT_SKEW_THRESHOLD,
+                    network_aware: bool = False) -> Iterator[Tuple[any, any]]:
+        """
+        Perform a partitioned parallel join and stream the result pairs.
+
+        With a serial executor each partition's join is consumed lazily, so no
+        result list is built at all. Pooled executors return each partition's
+        result as one list, which is yielded as soon as that partition is done.
+
+        Args:
+            table_r (Table): The first table to join, as tuples or a ``Relation``.
+            table_s (Table): The second table to join, as tuples or a ``Relation``.
+            partition_type (str): The type of partitioning to use ('range', 'hash',
+                'broadcast', or 'auto' for ``choose_partition_type``).
+            local_join (str): The per-partition join algorithm, or 'auto' (see
+                ``plan_local_joins``).
+            executor (Optional[NodeExecutor]): Runs the per-partition joins.
+                Defaults to the cluster's executor.
+            chunksize (int): Partition pairs dispatched to a worker at a time.
+            bloom_filter (bool): Filter the larger table with a Bloom filter of
+                the smaller table's keys before partitioning (see ``bloom_reduce``).
+            bloom_false_positive_rate (float): Target false-positive rate of the filter.
+            blocked_bloom (bool): Use the cache-line blocked filter layout.
+            skew_handling (bool): Spread heavy-hitter keys over several nodes
+                (see ``skew_partition_tables``).
+            skew_detection (str): How heavy hitters are found, 'sample' or 'sketch'.
+            skew_threshold (float): Share of a fair partition a single key
+                must exceed to be treated as heavy.
+            network_aware (bool): Place partitions on nodes to minimise the
+                simulated shuffle time (see ``place_partitions``).
 
-            # Perform a nested loop join on the partitions
-            for r_row in r_partition:
-                for s_row in s_partition:
-                    if r_row[0] == s_row[0]:  # Join based on the key
-                        results.append((r_row, s_row))
+        Returns:
+            Iterator[Tuple[any, any]]: The ``(r_row, s_row)`` pairs of the join.
+        """
+        self.semi_join_stats = None
+        self.skew_stats = None
+        # One partition per live node, in case a health monitor has found failures since the last join
+        self.num_partitions = len(self.cluster.partition_node_ids())
+        if bloom_filter:
+            table_r, table_s = self.bloom_reduce(table_r, table_s, bloom_false_positive_rate, blocked_bloom)
+
+        if partition_type == 'auto':
+            partition_type = self.choose_partition_type(table_r, table_s)
+        self.partition_type = partition_type
+
+        # A broadcast join spreads the large table evenly already, whatever its keys
+        if skew_handling and partition_type != 'broadcast':
+            r_partitions, s_partitions = self.skew_partition_tables(table_r, table_s, partition_type,
+                                                                    skew_detection, skew_threshold)
+        else:
+            r_partitions, s_partitions = self.partition_tables(table_r, table_s, partition_type)
 
-        return results
+        self.partition_placement = default_placement(self.cluster, range(self.num_partitions))
+        self.network_cost = None
+        if network_aware and partition_type == 'broadcast':
+            # Only the replicated table moves, and every replica has the same size wherever it goes
+            replicated = r_partitions if len(table_r) <= len(table_s) else s_partitions
+            self.place_partitions({"broadcast": replicated}, optimize=False)
+        elif network_aware:
+            self.place_partitions({"shuffle_r": r_partitions, "shuffle_s": s_partitions})
+        self.local_join_plan = self.plan_local_joins(r_partitions, s_partitions, local_join)
+
+        # Join the partitions in parallel, one task per node
+        executor = executor or self.cluster.executor
+        partition_ids = range(self.num_partitions)
+        if isinstance(executor, SerialExecutor):
+            for i in partition_ids:
+                yield from LOCAL_JOIN_ALGORITHMS[self.local_join_plan[i]](r_partitions[i], s_partitions[i])
+            return
+
+        for partition_result in executor.map(run_local_join,
+                                             [self.local_join_plan[i] for i in partition_ids],
+                                             [r_partitions[i] for i in partition_ids],
+                                             [s_partitions[i] for i in partition_ids],
+                                             chunksize=chunksize):
+            yield from partition_result
+
+    def join(self, table_r: Table, table_s: Table, partition_type: str = 'range',
+             local_join: str = 'auto', executor: Optional[NodeExecutor] = None, chunksize: int = 1,
+             bloom_filter: bool = False, bloom_false_positive_rate: float = 0.01,
+             blocked_bloom: bool = False, skew_handling: bool = False, skew_detection: str = 'sample',
+             skew_threshold: float = DEFAULT_SKEW_THRESHOLD,
+             network_aware: bool = False) -> List[Tuple[any, any]]:
+        """
+        Perform a partitioned parallel join using range, hash or broadcast partitioning.
+
+        Args:
+            table_r (Table): The first table to join, as tuples or a ``Relation``.
+            table_s (Table): The second table to join, as tuples or a ``Relation``.
+            partition_type (str): The type of partitioning to use ('range', 'hash',
+                'broadcast', or 'auto' for ``choose_partition_type``).
+            local_join (str): The per-partition join algorithm, or 'auto'.
+            executor (Optional[NodeExecutor]): Runs the per-partition joins.
+                Defaults to the cluster's executor.
+            chunksize (int): Partition pairs dispatched to a worker at a time.
+            bloom_filter (bool): Apply the Bloom-filter semi-join reduction first.
+            bloom_false_positive_rate (float): Target false-positive rate of the filter.
+            blocked_bloom (bool): Use the cache-line blocked filter layout.
+            skew_handling (bool): Spread heavy-hitter keys over several nodes.
+            skew_detection (str): How heavy hitters are found, 'sample' or 'sketch'.
+            skew_threshold (float): Share of a fair partition a single key
+                must exceed to be treated as heavy.
+            network_aware (bool): Place partitions to minimise the simulated shuffle time.
+
+        Returns:
+            List[Tuple[any, any]]: The result of the join operation.
+        """
+        return list(self.join_stream(table_r, table_s, partition_type, local_join, executor, chunksize,
+                                     bloom_filter, bloom_false_positive_rate, blocked_bloom,
+                                     skew_handling, skew_detection, skew_threshold, network_aware))
 
 
 
@@ -122,3 +763,15 @@ class PartitionedParallelJoin:
 # print("\nHash Partitioned Join Result:")
 # for row in hash_result:
 #     print(row)
+
+# # Perform Broadcast Join: the smaller table is replicated, the larger one stays in place
+# broadcast_result = range_join.join(table_r, table_s, partition_type='broadcast')
+# print("\nBroadcast Join Result:")
+# for row in broadcast_result:
+#     print(row)
+
+# # Let the planner choose between broadcast, hash and range
+# auto_result = range_join.join(table_r, table_s, partition_type='auto')
+# print(f"\nAuto ({range_join.partition_type}) Join Result:")
+# for row in auto_result:
+#     print(row)
@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Sequence
+from collections import Counter
+from dataclasses import dataclass
+import math
+import random
+import numpy as np
+from algorithms.parallell_join.hashing import hash_keys, mix64
+
+DEFAULT_SAMPLE_SIZE = 10000
+DEFAULT_SKEW_THRESHOLD = 0.5  # A key is heavy once it alone fills this share of a fair partition
+
+class CountMinSketch:
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        """
+        Approximate key frequencies in ``depth x width`` counters.
+
+        Estimates never undercount, and overcount by more than
+        ``epsilon * total`` with probability at most ``delta``.
+
+        Args:
+            epsilon (float): Relative error bound.
+            delta (float): Probability of exceeding the error bound.
+        """
+        self.width: int = math.ceil(math.e / epsilon)
+        self.depth: int = math.ceil(math.log(1 / delta))
+        self.counts = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total: int = 0
+
+    def columns(self, keys: Sequence[Any]) -> np.ndarray:
+        """The ``(depth, len(keys))`` counter column of every key in every row."""
+        hashes = hash_keys(keys).view(np.int64)
+        return np.stack([mix64(hashes + row) % np.uint64(self.width) for row in range(self.depth)]).astype(np.intp)
+
+    def add(self, keys: Sequence[Any]) -> None:
+        for row, columns in enumerate(self.columns(keys)):
+            np.add.at(self.counts[row], columns, 1)
+        self.total += len(keys)
+
+    def estimate(self, keys: Sequence[Any]) -> np.ndarray:
+        columns = self.columns(keys)
+        return np.min([self.counts[row, columns[row]] for row in range(self.depth)], axis=0)
+
+def detect_heavy_hitters(keys: Sequence[Any], num_partitions: int, method: str = 'sample',
+                         skew_threshold: float = DEFAULT_SKEW_THRESHOLD,
+                         sample_size: int = DEFAULT_SAMPLE_SIZE) -> Dict[Any, int]:
+    """
+    Find the keys frequent enough to overload a partition on their own.
+
+    Args:
+        keys (Sequence[Any]): The join keys of the table to check.
+        num_partitions (int): The number of partitions the table is split into.
+        method (str): 'sample' to count a uniform sample of the keys, or
+            'sketch' to stream every key through a count-min sketch.
+        skew_threshold (float): A key is heavy when its frequency exceeds
+            this fraction of ``len(keys) / num_partitions``.
+        sample_size (int): Keys drawn when ``method='sample'``.
+
+    Returns:
+        Dict[Any, int]: The heavy keys with their estimated frequencies.
+    """
+    if not len(keys):
+        return {}
+    key_list = keys.tolist() if isinstance(keys, np.ndarray) else list(keys)
+    threshold = skew_threshold * len(key_list) / num_partitions
+
+    if method == 'sample':
+        sample = random.sample(key_list, min(sample_size, len(key_list)))
+        scale = len(key_list) / len(sample)
+        estimates = {key: round(count * scale) for key, count in Counter(sample).items()}
+    elif method == 'sketch':
+        sketch = CountMinSketch()
+        sketch.add(key_list)
+        estimates = dict(zip(key_list, sketch.estimate(key_list).tolist()))
+    else:
+        raise ValueError("Invalid method. Use 'sample' or 'sketch'.")
+
+    return {key: count for key, count in estimates.items() if count > threshold}
+
+def assign_heavy_hitters(heavy_hitters: Dict[Any, int], node_loads: List[int],
+                         build_counts: Dict[Any, int]) -> Dict[Any, Dict[int, float]]:
+    """
+    Choose the partitions that share each heavy key, and how much of it each takes.
+
+    Heaviest key first, the key's probe rows are poured into the
+    least-loaded partitions (water-filling): each chosen partition is
+    topped up to the same level, counting the copy of the key's build
+    rows it also receives, and the number of partitions is the one that
+    makes that level lowest. ``node_loads`` is updated to match.
+
+    Args:
+        heavy_hitters (Dict[Any, int]): Heavy keys and their probe frequencies.
+        node_loads (List[int]): Rows already assigned to each partition.
+        build_counts (Dict[Any, int]): Build rows per heavy key.
+
+    Returns:
+        Dict[Any, Dict[int, float]]: For every heavy key, its partitions and
+        the share of its probe rows each one takes.
+    """
+    num_partitions = len(node_loads)
+    assignment = {}
+    for key, frequency in sorted(heavy_hitters.items(), key=lambda item: -item[1]):
+        copies = build_counts.get(key, 0)
+        order = sorted(range(num_partitions), key=node_loads.__getitem__)
+        # Filling the k least-loaded partitions to one level L takes sum(L - load - copies) = frequency
+        best_level, fan_out, filled = math.inf, 1, 0.0
+        for k, target in enumerate(order, start=1):
+            filled += node_loads[target] + copies
+            level = (frequency + filled) / k
+            # Every one of the k partitions must take some rows
+            if (k == 1 or level > node_loads[target] + copies) and level < best_level:
+                best_level, fan_out = level, k
+        targets = order[:fan_out]
+        shares = {target: (best_level - node_loads[target] - copies) / frequency if frequency else 1 / fan_out
+                  for target in targets}
+        for target in targets:
+            node_loads[target] += frequency * shares[target] + copies
+        assignment[key] = shares
+    return assignment
+
+def split_rows(rows: int, shares: Sequence[float]) -> List[int]:
+    """
+    Split ``rows`` into whole counts proportional to ``shares`` (largest remainder).
+
+    Args:
+        rows (int): The rows to split.
+        shares (Sequence[float]): Non-negative weights, one per part.
+
+    Returns:
+        List[int]: Counts per part that add up to ``rows``.
+    """
+    total = sum(shares)
+    exact = [rows * share / total if total else rows / len(shares) for share in shares]
+    counts = [math.floor(value) for value in exact]
+    by_remainder = sorted(range(len(shares)), key=lambda part: counts[part] - exact[part])
+    for part in by_remainder[:rows - sum(counts)]:
+        counts[part] += 1
+    return counts
+
+@dataclass
+class SkewStats:
+    heavy_hitters: Dict[Any, int]  # Heavy probe-side keys and their estimated frequencies
+    work_before: List[int]  # Input rows per node with plain partitioning
+    work_after: List[int]  # Input rows per node after fragment-and-replicate of heavy keys
+
+    @staticmethod
+    def imbalance(work: List[int]) -> float:
+        mean = sum(work) / len(work) if work else 0
+        return max(work) / mean if mean else 1.0
+
+    @property
+    def imbalance_before(self) -> float:
+        return self.imbalance(self.work_before)
+
+    @property
+    def imbalance_after(self) -> float:
+        return self.imbalance(self.work_after)
+
+if __name__ == "__main__":
+    from cluster_simulator.cluster import Cluster
+    from algorithms.parallell_join.partitioned_parallel_join import PartitionedParallelJoin
+
+    cluster = Cluster("DataCenter1")
+    cluster.generate_random_cluster(8)
+    # Zipf-like probe side: key 0 alone holds about a third of the rows
+    table_r = [(key, f"r{key}") for key in range(1000)] + [(0, "r0-dup")]
+    table_s = [(0 if i % 3 == 0 else random.randint(0, 999), f"s{i}") for i in range(60000)]
+
+    join = PartitionedParallelJoin(cluster)
+    for detection in ("sample", "sketch"):
+        result = join.join(table_r, table_s, partition_type='hash', skew_handling=True, skew_detection=detection)
+        stats = join.skew_stats
+        print(f"{detection}: {len(result)} pairs, heavy keys {stats.heavy_hitters}")
+        print(f"  rows per node before: {stats.work_before} (max/mean {stats.imbalance_before:.2f})")
+        print(f"  rows per node after:  {stats.work_after} (max/mean {stats.imbalance_after:.2f})")
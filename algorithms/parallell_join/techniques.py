@@ -1,6 +1,9 @@
 import random
 from collections import defaultdict
 from itertools import chain
+from cluster_simulator.executor import SerialExecutor
+from algorithms.parallell_join.hybrid_hash_join import DEFAULT_MEMORY_BUDGET, HybridHashJoin
+from algorithms.relation import as_rows
 
 # Sample tables
 table_r = [(1, 'A'), (2, 'B'), (3, 'C'), (4, 'D')]
@@ -10,149 +13,136 @@ table_s = [(2, 'X'), (4, 'Y'), (5, 'Z')]
 def hash_function(key, num_partitions):
     return key % num_partitions
 
-# Partition tables
+# Partition tables (lists of tuples or columnar Relations)
 def partition_table(table, num_partitions):
     partitions = defaultdict(list)
-    for row in table:
+    for row in as_rows(table):
         key = row[0]
         partition_id = hash_function(key, num_partitions)
         partitions[partition_id].append(row)
     return partitions
 
-# 1. Partitioned Parallel Hash Join
-def partitioned_parallel_hash_join(table_r, table_s, num_partitions=2):
-    print("\n1. Partitioned Parallel Hash Join:")
-    
-    # Partition tables using hash function
+# Run join_partition on every pair of co-located partitions, one task per partition.
+# The per-partition join functions are module-level so process pools can pickle them.
+def join_partitions(join_partition, table_r, table_s, num_partitions, executor=None, chunksize=1):
+    executor = executor or SerialExecutor()
     r_partitions = partition_table(table_r, num_partitions)
     s_partitions = partition_table(table_s, num_partitions)
+    results = []
+    for partition_result in executor.map(join_partition,
+                                         [r_partitions[i] for i in range(num_partitions)],
+                                         [s_partitions[i] for i in range(num_partitions)],
+                                         chunksize=chunksize):
+        results.extend(partition_result)
+    return results
+
+# 1. Partitioned Parallel Hash Join
+def hash_join_partition(r_partition, s_partition):
+    # Build a hash table on r_partition (smaller relation)
+    hash_table = {row[0]: row for row in r_partition}
 
+    # Probe with s_partition
     results = []
+    for row in s_partition:
+        key = row[0]
+        if key in hash_table:
+            results.append((hash_table[key], row))
+    return results
+
+def partitioned_parallel_hash_join(table_r, table_s, num_partitions=2, executor=None):
+    print("\n1. Partitioned Parallel Hash Join:")
     
-    for i in range(num_partitions):
-        r_partition = r_partitions[i]
-        s_partition = s_partitions[i]
-        
-        # Build a hash table on r_partition (smaller relation)
-        hash_table = {row[0]: row for row in r_partition}
-        
-        # Probe with s_partition
-        for row in s_partition:
-            key = row[0]
-            if key in hash_table:
-                results.append((hash_table[key], row))
+    results = join_partitions(hash_join_partition, table_r, table_s, num_partitions, executor)
     
     print(results)
     return results
 
 # 2. Hybrid Hash Join Optimization
-def hybrid_hash_join_optimization(table_r, table_s, num_partitions=2):
+def hybrid_hash_join_optimization(table_r, table_s, num_partitions=2, memory_budget=DEFAULT_MEMORY_BUDGET):
     print("\n2. Hybrid Hash Join Optimization:")
     
-    # Partition tables using hash function
-    r_partitions = partition_table(table_r, num_partitions)
-    s_partitions = partition_table(table_s, num_partitions)
-
-    results = []
-    
-    # Retain the first partition of R in memory
-    r0 = r_partitions[0]
-    s0 = s_partitions[0]
-    
-    # Build a hash table on r0 (smaller relation)
-    hash_table = {row[0]: row for row in r0}
-    
-    # Probe with s0 directly
-    for row in s0:
-        key = row[0]
-        if key in hash_table:
-            results.append((hash_table[key], row))
+    # Keep as many partitions of R in memory as the budget allows and spill the rest,
+    # together with the matching partitions of S, to disk
+    hybrid_join = HybridHashJoin(memory_budget=memory_budget, num_partitions=num_partitions)
+    results = list(hybrid_join.join(table_r, table_s))
     
     print(results)
+    print(f"In-memory bytes: {hybrid_join.stats.in_memory_bytes}, spilled bytes: {hybrid_join.stats.spilled_bytes}, "
+          f"reloaded bytes: {hybrid_join.stats.reloaded_bytes}")
     return results
 
 # 3. Partitioned Parallel Merge Join
-def partitioned_parallel_merge_join(table_r, table_s, num_partitions=2):
-    print("\n3. Partitioned Parallel Merge Join:")
-    
-    # Partition tables using hash function
-    r_partitions = partition_table(table_r, num_partitions)
-    s_partitions = partition_table(table_s, num_partitions)
+def merge_join_partition(r_partition, s_partition):
+    r_partition = sorted(r_partition)
+    s_partition = sorted(s_partition)
     
+    # Perform merge join
     results = []
+    r_idx = s_idx = 0
+    while r_idx < len(r_partition) and s_idx < len(s_partition):
+        r_key = r_partition[r_idx][0]
+        s_key = s_partition[s_idx][0]
+        if r_key == s_key:
+            results.append((r_partition[r_idx], s_partition[s_idx]))
+            r_idx += 1
+            s_idx += 1
+        elif r_key < s_key:
+            r_idx += 1
+        else:
+            s_idx += 1
+    return results
+
+def partitioned_parallel_merge_join(table_r, table_s, num_partitions=2, executor=None):
+    print("\n3. Partitioned Parallel Merge Join:")
     
-    for i in range(num_partitions):
-        r_partition = sorted(r_partitions[i])
-        s_partition = sorted(s_partitions[i])
-        
-        # Perform merge join
-        r_idx = s_idx = 0
-        while r_idx < len(r_partition) and s_idx < len(s_partition):
-            r_key = r_partition[r_idx][0]
-            s_key = s_partition[s_idx][0]
-            if r_key == s_key:
-                results.append((r_partition[r_idx], s_partition[s_idx]))
-                r_idx += 1
-                s_idx += 1
-            elif r_key < s_key:
-                r_idx += 1
-            else:
-                s_idx += 1
+    results = join_partitions(merge_join_partition, table_r, table_s, num_partitions, executor)
     
     print(results)
     return results
 
 # 4. Partitioned Parallel Nested-Loop Join
-def partitioned_parallel_nested_loop_join(table_r, table_s, num_partitions=2):
-    print("\n4. Partitioned Parallel Nested-Loop Join:")
-    
-    # Partition tables using hash function
-    r_partitions = partition_table(table_r, num_partitions)
-    s_partitions = partition_table(table_s, num_partitions)
-    
+def nested_loop_join_partition(r_partition, s_partition):
+    # Perform nested-loop join
     results = []
+    for r_row in r_partition:
+        for s_row in s_partition:
+            if r_row[0] == s_row[0]:
+                results.append((r_row, s_row))
+    return results
+
+def partitioned_parallel_nested_loop_join(table_r, table_s, num_partitions=2, executor=None):
+    print("\n4. Partitioned Parallel Nested-Loop Join:")
     
-    for i in range(num_partitions):
-        r_partition = r_partitions[i]
-        s_partition = s_partitions[i]
-        
-        # Perform nested-loop join
-        for r_row in r_partition:
-            for s_row in s_partition:
-                if r_row[0] == s_row[0]:
-                    results.append((r_row, s_row))
+    results = join_partitions(nested_loop_join_partition, table_r, table_s, num_partitions, executor)
     
     print(results)
     return results
 
 # 5. Partitioned Parallel Indexed Nested-Loops Join
-def partitioned_parallel_indexed_nested_loop_join(table_r, table_s, num_partitions=2):
-    print("\n5. Partitioned Parallel Indexed Nested-Loops Join:")
-    
-    # Partition tables using hash function
-    r_partitions = partition_table(table_r, num_partitions)
-    s_partitions = partition_table(table_s, num_partitions)
+def indexed_nested_loop_join_partition(r_partition, s_partition):
+    # Build an index on s_partition
+    index = {row[0]: row for row in s_partition}
     
+    # Perform indexed nested-loop join
     results = []
+    for r_row in r_partition:
+        if r_row[0] in index:
+            results.append((r_row, index[r_row[0]]))
+    return results
+
+def partitioned_parallel_indexed_nested_loop_join(table_r, table_s, num_partitions=2, executor=None):
+    print("\n5. Partitioned Parallel Indexed Nested-Loops Join:")
     
-    for i in range(num_partitions):
-        r_partition = r_partitions[i]
-        s_partition = s_partitions[i]
-        
-        # Build an index on s_partition
-        index = {row[0]: row for row in s_partition}
-        
-        # Perform indexed nested-loop join
-        for r_row in r_partition:
-            if r_row[0] in index:
-                results.append((r_row, index[r_row[0]]))
+    results = join_partitions(indexed_nested_loop_join_partition, table_r, table_s, num_partitions, executor)
     
     print(results)
     return results
 
 # Run the join algorithms
-partitioned_parallel_hash_join(table_r, table_s)
-hybrid_hash_join_optimization(table_r, table_s)
-partitioned_parallel_merge_join(table_r, table_s)
-partitioned_parallel_nested_loop_join(table_r, table_s)
-partitioned_parallel_indexed_nested_loop_join(table_r, table_s)
+if __name__ == "__main__":
+    partitioned_parallel_hash_join(table_r, table_s)
+    hybrid_hash_join_optimization(table_r, table_s)
+    partitioned_parallel_merge_join(table_r, table_s)
+    partitioned_parallel_nested_loop_join(table_r, table_s)
+    partitioned_parallel_indexed_nested_loop_join(table_r, table_s)
+
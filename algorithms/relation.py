@@ -0,0 +1,195 @@
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from datetime import datetime
+import numpy as np
+
+ROW_CHUNK_SIZE = 4096  # Rows decoded per batch when iterating a Relation as tuples
+
+class DictionaryColumn:
+    def __init__(self, codes: np.ndarray, dictionary: np.ndarray):
+        """
+        A string column stored as integer codes into a sorted dictionary of
+        the distinct values.
+
+        Because the dictionary is sorted, comparing codes gives the same
+        order as comparing the strings, so the codes can be sorted and range
+        partitioned directly.
+
+        Args:
+            codes (np.ndarray): The index into ``dictionary`` of every value.
+            dictionary (np.ndarray): The sorted distinct values (object array).
+        """
+        self.codes = codes
+        self.dictionary = dictionary
+
+    @classmethod
+    def encode(cls, values: Sequence[str]) -> 'DictionaryColumn':
+        dictionary, codes = np.unique(np.fromiter(values, dtype=object, count=len(values)), return_inverse=True)
+        code_dtype = np.int32 if len(dictionary) < 2 ** 31 else np.int64
+        return cls(codes.astype(code_dtype).reshape(-1), dictionary)
+
+    def decode(self) -> np.ndarray:
+        return self.dictionary[self.codes]
+
+    def tolist(self) -> List[str]:
+        return self.decode().tolist()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: Union[slice, np.ndarray]) -> 'DictionaryColumn':
+        # Slices are views of the codes; both share the dictionary
+        return DictionaryColumn(self.codes[index], self.dictionary)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(value) for value in self.dictionary.tolist())
+
+Column = Union[np.ndarray, DictionaryColumn]
+
+def encode_column(values: Sequence[Any]) -> Column:
+    """
+    Store one column of Python values in the most compact supported layout:
+    ``int64``, ``float64`` or ``datetime64[us]`` arrays, a dictionary-encoded
+    column for strings, and an object array for anything else.
+
+    Args:
+        values (Sequence[Any]): The values of the column, one per row.
+
+    Returns:
+        Column: The encoded column.
+    """
+    types = {type(value) for value in values}
+    if types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass  # Wider than 64 bits
+    elif types and types <= {int, float}:
+        return np.array(values, dtype=np.float64)
+    elif types == {datetime} and all(value.tzinfo is None for value in values):
+        return np.array(values, dtype='datetime64[us]')
+    elif types == {str}:
+        return DictionaryColumn.encode(values)
+    return np.fromiter(values, dtype=object, count=len(values))
+
+def concat_columns(columns: List[Column]) -> Column:
+    if not isinstance(columns[0], DictionaryColumn):
+        return np.concatenate(columns)
+    dictionary = columns[0].dictionary
+    if all(column.dictionary is dictionary for column in columns):
+        return DictionaryColumn(np.concatenate([column.codes for column in columns]), dictionary)
+    return DictionaryColumn.encode(np.concatenate([column.decode() for column in columns]))
+
+class Relation:
+    def __init__(self, columns: Sequence[Column]):
+        """
+        A relation stored column by column in typed arrays.
+
+        Slicing returns views of the same arrays, so partitions of a relation
+        that has been reordered once cost no further copies.
+
+        Args:
+            columns (Sequence[Column]): The columns, all of the same length.
+        """
+        self.columns: List[Column] = list(columns)
+        lengths = {len(column) for column in self.columns}
+        if len(lengths) > 1:
+            raise ValueError("All columns of a Relation must have the same length.")
+        self.num_rows: int = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple], num_columns: Optional[int] = None) -> 'Relation':
+        """
+        Convert a list of tuples into a Relation.
+
+        Args:
+            rows (Iterable[Tuple]): Rows that all have the same number of fields.
+            num_columns (Optional[int]): The number of fields, needed only when
+                ``rows`` is empty.
+
+        Returns:
+            Relation: The columnar relation.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls([np.empty(0, dtype=object) for _ in range(num_columns or 0)])
+        return cls([encode_column(values) for values in zip(*rows)])
+
+    def to_rows(self) -> List[Tuple]:
+        """Convert back to the list-of-tuples form."""
+        return list(zip(*(column.tolist() for column in self.columns)))
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for start in range(0, self.num_rows, ROW_CHUNK_SIZE):
+            yield from self.slice(start, start + ROW_CHUNK_SIZE).to_rows()
+
+    @property
+    def num_columns(self) -> int:
+        return len(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns)
+
+    def column(self, index: int) -> Column:
+        return self.columns[index]
+
+    def order_keys(self, index: int) -> np.ndarray:
+        """
+        An array that sorts like column ``index`` within this relation: the
+        column itself, or the codes of a dictionary-encoded column.
+        """
+        column = self.columns[index]
+        return column.codes if isinstance(column, DictionaryColumn) else column
+
+    def values(self, index: int) -> np.ndarray:
+        """
+        The values of column ``index`` as an array comparable across
+        relations: dictionary-encoded strings are decoded.
+        """
+        column = self.columns[index]
+        return column.decode() if isinstance(column, DictionaryColumn) else column
+
+    def slice(self, start: int, stop: int) -> 'Relation':
+        """Rows ``start`` to ``stop``, as views of this relation's columns."""
+        return Relation([column[start:stop] for column in self.columns])
+
+    def take(self, indices: np.ndarray) -> 'Relation':
+        """The rows at ``indices``, in that order (copies the selected rows)."""
+        return Relation([column[indices] for column in self.columns])
+
+    def partition(self, partition_ids: np.ndarray, num_partitions: int) -> List['Relation']:
+        """
+        Split the relation by a partition index per row.
+
+        The rows are reordered by partition with one stable sort and one copy;
+        every partition is then a zero-copy slice of the reordered relation.
+
+        Args:
+            partition_ids (np.ndarray): The partition of every row.
+            num_partitions (int): The number of partitions.
+
+        Returns:
+            List[Relation]: The partitions, rows in their original relative order.
+        """
+        order = np.argsort(partition_ids, kind='stable')
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(partition_ids, minlength=num_partitions))))
+        reordered = self.take(order)
+        return [reordered.slice(bounds[i], bounds[i + 1]) for i in range(num_partitions)]
+
+    @staticmethod
+    def concat(relations: List['Relation']) -> 'Relation':
+        if not relations:
+            return Relation([])
+        return Relation([concat_columns([relation.columns[i] for relation in relations])
+                         for i in range(relations[0].num_columns)])
+
+    def __str__(self) -> str:
+        return f"Relation(rows={self.num_rows}, columns={self.num_columns})"
+
+def as_rows(table: Union[List[Tuple], Relation]) -> List[Tuple]:
+    """Accept either representation where an algorithm needs tuples."""
+    return table.to_rows() if isinstance(table, Relation) else table
@@ -1,18 +1,70 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, Tuple, TYPE_CHECKING
+from dataclasses import dataclass
+import gc
+import heapq
 from cluster_simulator.node import Node
+from cluster_simulator.executor import NodeExecutor, SerialExecutor
+from cluster_simulator.topology import CSRTopology, random_edges
 import random
+import numpy as np
+
+if TYPE_CHECKING:
+    from cluster_simulator.health import LiveNodeSet
+
+DEFAULT_BANDWIDTH = 1000.0  # Link bandwidth in MB/s (roughly 10 Gbit Ethernet)
+DEFAULT_LATENCY = 0.1  # One-way link latency in ms
+ROUTING_REFERENCE_MB = 1.0  # Transfer size the routing weights are computed for
+
+@dataclass
+class Link:
+    bandwidth: float = DEFAULT_BANDWIDTH  # in MB/s, in each direction
+    latency: float = DEFAULT_LATENCY  # in ms
+
+    def transfer_time(self, megabytes: float) -> float:
+        """Seconds to send ``megabytes`` over the link when it is not shared."""
+        return self.latency / 1000 + megabytes / self.bandwidth
+
+def link_key(node1_id: str, node2_id: str) -> Tuple[str, str]:
+    return (node1_id, node2_id) if node1_id <= node2_id else (node2_id, node1_id)
 
 class Cluster:
-    def __init__(self, name: str):
+    def __init__(self, name: str, executor: Optional[NodeExecutor] = None):
         """
         Initialize a new cluster.
 
         Args:
             name (str): The name of the cluster.
+            executor (Optional[NodeExecutor]): Runs the per-node phase of the
+                algorithms executed on this cluster. Defaults to serial execution.
         """
         self.name: str = name
         self.nodes: Dict[str, Node] = {}
-        self.network_topology: Dict[str, List[str]] = {}
+        self.network_topology: Dict[str, Set[str]] = {}
+        self.links: Dict[Tuple[str, str], Link] = {}  # Keyed by link_key of the two endpoints
+        self._routes: Dict[str, Tuple[Dict[str, float], Dict[str, str]]] = {}  # Shortest-path trees by source
+        self.executor: NodeExecutor = executor or SerialExecutor()
+        self.live_nodes: Optional['LiveNodeSet'] = None  # Published by a HealthMonitor, if one watches the cluster
+        self._next_node_id = 0  # generate_random_cluster never reuses an id, even of a removed node
+
+    def partition_node_ids(self) -> List[str]:
+        """
+        The nodes new partitions are placed on: the live set published by a
+        health monitor when one is attached, otherwise every node.
+        """
+        if self.live_nodes is None:
+            return list(self.nodes)
+        return self.live_nodes.ids()
+
+    def set_executor(self, executor: NodeExecutor) -> None:
+        """
+        Replace the executor used for per-node work, shutting down the old one.
+
+        Args:
+            executor (NodeExecutor): The new executor.
+        """
+        if executor is not self.executor:
+            self.executor.shutdown()
+        self.executor = executor
 
     def add_node(self, node: Node) -> None:
         """
@@ -22,63 +74,167 @@ class Cluster:
             node (Node): The node to be added.
         """
         self.nodes[node.id] = node
-        self.network_topology[node.id] = []
+        self.network_topology[node.id] = set()
 
     def remove_node(self, node_id: str) -> None:
         """
-        Remove a node from the cluster.
+        Remove a node and its links from the cluster, in time proportional
+        to the node's degree.
 
         Args:
             node_id (str): The ID of the node to be removed.
         """
         if node_id in self.nodes:
-            del self.nodes[node_id]
-            del self.network_topology[node_id]
-            for connections in self.network_topology.values():
-                if node_id in connections:
-                    connections.remove(node_id)
+            node = self.nodes.pop(node_id)
+            for neighbor_id in self.network_topology.pop(node_id):
+                self.network_topology[neighbor_id].discard(node_id)
+                del self.links[link_key(node_id, neighbor_id)]
+                node.disconnect_from(self.nodes[neighbor_id])
+            self._routes.clear()
+            if self.live_nodes is not None:
+                self.live_nodes.mark(node_id, False)
 
-    def connect_nodes(self, node1_id: str, node2_id: str) -> None:
+    def connect_nodes(self, node1_id: str, node2_id: str, bandwidth: float = DEFAULT_BANDWIDTH,
+                      latency: float = DEFAULT_LATENCY) -> None:
         """
         Connect two nodes in the cluster.
 
         Args:
             node1_id (str): The ID of the first node.
             node2_id (str): The ID of the second node.
+            bandwidth (float): Link bandwidth in MB/s, in each direction.
+            latency (float): One-way link latency in ms.
         """
         if node1_id in self.nodes and node2_id in self.nodes:
             self.nodes[node1_id].connect_to(self.nodes[node2_id])
-            self.network_topology[node1_id].append(node2_id)
-            self.network_topology[node2_id].append(node1_id)
+            self.network_topology[node1_id].add(node2_id)
+            self.network_topology[node2_id].add(node1_id)
+            self.links[link_key(node1_id, node2_id)] = Link(bandwidth, latency)
+            self._routes.clear()
+
+    def link(self, node1_id: str, node2_id: str) -> Link:
+        return self.links[link_key(node1_id, node2_id)]
+
+    def shortest_paths(self, source_id: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """
+        Dijkstra from ``source_id``, weighting each link by the time to send
+        ``ROUTING_REFERENCE_MB`` over it. The tree is computed on first use
+        and cached until the topology changes.
+
+        Args:
+            source_id (str): The node to route from.
+
+        Returns:
+            Tuple[Dict[str, float], Dict[str, str]]: The cost to every
+            reachable node, and the previous hop on its shortest path.
+        """
+        if source_id not in self._routes:
+            distances, previous = {source_id: 0.0}, {}
+            heap = [(0.0, source_id)]
+            while heap:
+                distance, node_id = heapq.heappop(heap)
+                if distance > distances[node_id]:
+                    continue
+                for neighbor_id in self.network_topology[node_id]:
+                    candidate = distance + self.link(node_id, neighbor_id).transfer_time(ROUTING_REFERENCE_MB)
+                    if candidate < distances.get(neighbor_id, float('inf')):
+                        distances[neighbor_id] = candidate
+                        previous[neighbor_id] = node_id
+                        heapq.heappush(heap, (candidate, neighbor_id))
+            self._routes[source_id] = (distances, previous)
+        return self._routes[source_id]
+
+    def all_pairs_shortest_paths(self) -> Dict[str, Dict[str, float]]:
+        """The routing cost between every pair of connected nodes."""
+        return {node_id: self.shortest_paths(node_id)[0] for node_id in self.nodes}
+
+    def route(self, source_id: str, target_id: str) -> List[str]:
+        """
+        The nodes on the cheapest path from ``source_id`` to ``target_id``,
+        both included.
+
+        Raises:
+            ValueError: If the two nodes are not connected.
+        """
+        distances, previous = self.shortest_paths(source_id)
+        if target_id not in distances:
+            raise ValueError(f"No route from node {source_id} to node {target_id}.")
+        path = [target_id]
+        while path[-1] != source_id:
+            path.append(previous[path[-1]])
+        return path[::-1]
 
     def generate_random_cluster(self, num_nodes: int, min_connections: int = 2, max_connections: int = 5) -> None:
         """
         Generate a random cluster with the specified number of nodes.
 
+        Node resources and links are drawn as NumPy batches (see
+        ``random_edges``), so building scales linearly with the number of
+        nodes. The generator is seeded from ``random``, so ``random.seed``
+        still makes the cluster reproducible.
+
         Args:
             num_nodes (int): The number of nodes to generate.
             min_connections (int): The minimum number of connections per node.
             max_connections (int): The maximum number of connections per node.
         """
-        # Create nodes
-        for i in range(num_nodes):
-            node = Node(
-                node_id=str(i),
-                compute=random.uniform(2.0, 4.0),  # Random compute power between 2.0 and 4.0 GHz
-                memory=random.randint(4096, 16384),  # Random memory between 4 and 16 GB
-                storage=random.randint(100000, 1000000)  # Random storage between 100 GB and 1 TB
-            )
-            self.add_node(node)
-
-        # Connect nodes
-        if num_nodes > 1:
-            for node_id in self.nodes:
-                num_connections = random.randint(min(min_connections, num_nodes - 1), 
-                                                 min(max_connections, num_nodes - 1))
-                possible_connections = list(set(self.nodes.keys()) - {node_id} - set(self.network_topology[node_id]))
-                connections = random.sample(possible_connections, min(num_connections, len(possible_connections)))
-                for connection in connections:
-                    self.connect_nodes(node_id, connection)
+        rng = np.random.default_rng(random.getrandbits(64))
+        # Every object created here survives, so cyclic garbage collection passes during the build are wasted work
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            first_id = max([self._next_node_id] + [int(node_id) + 1 for node_id in self.nodes if node_id.isdigit()])
+            self._next_node_id = first_id + num_nodes
+            node_ids = [str(first_id + i) for i in range(num_nodes)]
+
+            # Create nodes
+            compute = rng.uniform(2.0, 4.0, size=num_nodes).tolist()  # Random compute power between 2.0 and 4.0 GHz
+            memory = rng.integers(4096, 16384, endpoint=True, size=num_nodes).tolist()  # Random memory between 4 and 16 GB
+            storage = rng.integers(100000, 1000000, endpoint=True, size=num_nodes).tolist()  # Random storage between 100 GB and 1 TB
+            for i, node_id in enumerate(node_ids):
+                self.add_node(Node(node_id=node_id, compute=compute[i], memory=memory[i], storage=storage[i]))
+
+            # Connect nodes, skipping the per-call checks of connect_nodes since every id is new
+            for source, target in random_edges(num_nodes, min_connections, max_connections, rng).tolist():
+                node1_id, node2_id = node_ids[source], node_ids[target]
+                self.nodes[node1_id].connect_to(self.nodes[node2_id])
+                self.network_topology[node1_id].add(node2_id)
+                self.network_topology[node2_id].add(node1_id)
+                self.links[link_key(node1_id, node2_id)] = Link()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self._routes.clear()
+
+    def to_csr(self) -> CSRTopology:
+        """
+        Export the topology as compressed sparse row arrays, for analyses of
+        large static clusters that do not need the per-node objects.
+
+        Returns:
+            CSRTopology: The adjacency and link properties, nodes in insertion order.
+        """
+        node_ids = list(self.nodes)
+        positions = {node_id: i for i, node_id in enumerate(node_ids)}
+        num_links = len(self.links)
+        ends = np.fromiter((positions[node_id] for key in self.links for node_id in key), dtype=np.int64,
+                           count=2 * num_links).reshape(num_links, 2)
+        bandwidth = np.fromiter((link.bandwidth for link in self.links.values()), dtype=np.float64, count=num_links)
+        latency = np.fromiter((link.latency for link in self.links.values()), dtype=np.float64, count=num_links)
+
+        # Store every link in both directions, grouped by source
+        sources = np.concatenate((ends[:, 0], ends[:, 1]))
+        targets = np.concatenate((ends[:, 1], ends[:, 0]))
+        order = np.argsort(sources, kind='stable')
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(node_ids)))))
+        index_dtype = np.int32 if len(node_ids) < 2 ** 31 else np.int64
+        return CSRTopology(
+            node_ids=node_ids,
+            indptr=indptr,
+            indices=targets[order].astype(index_dtype),
+            bandwidth=np.tile(bandwidth, 2)[order],
+            latency=np.tile(latency, 2)[order],
+        )
 
     def __str__(self) -> str:
         return f"Cluster(name={self.name}, nodes={len(self.nodes)})"
@@ -90,4 +246,4 @@ if __name__ == "__main__":
     print(cluster)
     print("Network Topology:")
     for node_id, connections in cluster.network_topology.items():
-        print(f"Node {node_id}: {connections}")
\ No newline at end of file
+        print(f"Node {node_id}: {sorted(connections, key=int)}")
\ No newline at end of file
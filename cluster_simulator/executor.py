@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+import os
+
+class NodeExecutor(ABC):
+    """
+    Runs the per-node phase of an algorithm (a local sort, a local join) with
+    one task per node.
+
+    Subclasses decide where each task runs. ``map`` keeps the order of its
+    inputs, so results line up with the nodes that produced them.
+    """
+
+    @abstractmethod
+    def map(self, fn: Callable, *iterables: Iterable, chunksize: int = 1) -> Iterator:
+        """
+        Apply ``fn`` to every set of arguments drawn from ``iterables``.
+
+        Args:
+            fn (Callable): The per-node task. Must be a module-level function
+                when the executor runs tasks in other processes.
+            *iterables (Iterable): One argument sequence per parameter of ``fn``.
+            chunksize (int): Tasks sent to a worker per dispatch.
+
+        Returns:
+            Iterator: The results, in input order.
+        """
+
+    def warm_up(self) -> None:
+        """Start the workers ahead of time so their start-up is not timed."""
+
+    def shutdown(self) -> None:
+        """Release the workers."""
+
+    def __enter__(self) -> 'NodeExecutor':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown()
+
+class SerialExecutor(NodeExecutor):
+    """Runs every node's task one after another in the calling thread."""
+
+    def map(self, fn: Callable, *iterables: Iterable, chunksize: int = 1) -> Iterator:
+        return map(fn, *iterables)
+
+    def __str__(self) -> str:
+        return "SerialExecutor()"
+
+class PoolExecutor(NodeExecutor):
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Base class for executors backed by a ``concurrent.futures`` pool.
+
+        Args:
+            max_workers (Optional[int]): The number of workers. Defaults to the
+                number of CPUs.
+        """
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self._pool: Optional[Executor] = None
+
+    @abstractmethod
+    def create_pool(self) -> Executor:
+        """The ``concurrent.futures`` pool, created on first use."""
+
+    @property
+    def pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = self.create_pool()
+        return self._pool
+
+    def map(self, fn: Callable, *iterables: Iterable, chunksize: int = 1) -> Iterator:
+        return self.pool.map(fn, *iterables, chunksize=chunksize)
+
+    def warm_up(self) -> None:
+        # Pools start their workers lazily; one trivial task per worker starts them all
+        list(self.pool.map(abs, range(self.max_workers)))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__}(max_workers={self.max_workers})"
+
+class ThreadPoolNodeExecutor(PoolExecutor):
+    """Runs node tasks on a thread pool; useful when tasks release the GIL (NumPy, I/O)."""
+
+    def create_pool(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+class ProcessPoolNodeExecutor(PoolExecutor):
+    """Runs node tasks in worker processes, so CPU-bound local work scales across cores."""
+
+    def create_pool(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+def create_executor(kind: str = 'serial', max_workers: Optional[int] = None) -> NodeExecutor:
+    """
+    Build an executor by name.
+
+    Args:
+        kind (str): 'serial', 'thread' or 'process'.
+        max_workers (Optional[int]): The number of workers for pooled executors.
+
+    Returns:
+        NodeExecutor: The executor.
+    """
+    if kind == 'serial':
+        return SerialExecutor()
+    if kind == 'thread':
+        return ThreadPoolNodeExecutor(max_workers)
+    if kind == 'process':
+        return ProcessPoolNodeExecutor(max_workers)
+    raise ValueError("Invalid executor kind. Use 'serial', 'thread' or 'process'.")
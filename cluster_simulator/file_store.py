@@ -0,0 +1,348 @@
+from typing import Dict, Iterator, List, Optional, Union
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from cluster_simulator.node import Directory, File, Node
+
+RECORD_HEADER = struct.Struct("<IIIq")  # CRC-32 of everything after it, path length, content length, size in MB
+CHECKSUM = struct.Struct("<I")  # The leading CRC-32 of a record header
+TOMBSTONE = 0xFFFFFFFF  # Content length of a record that deletes its path
+COMPACTION_THRESHOLD = 0.5  # Dead share of the segment that triggers automatic compaction
+MIN_COMPACTION_BYTES = 1024 * 1024  # Segments smaller than this are never compacted automatically
+CONTENT_ERRORS = "surrogateescape"  # Lets File.content carry bytes that are not UTF-8, and give them back unchanged
+
+def encode_record(encoded_path: bytes, content: bytes, size: int, content_length: Optional[int] = None) -> bytes:
+    """A segment record; ``content_length`` is ``TOMBSTONE`` for a delete."""
+    length = len(content) if content_length is None else content_length
+    tail = RECORD_HEADER.pack(0, len(encoded_path), length, size)[CHECKSUM.size:] + encoded_path + content
+    return CHECKSUM.pack(zlib.crc32(tail)) + tail
+
+@dataclass
+class FileEntry:
+    path: str
+    offset: int  # Where the content starts in the segment
+    length: int  # Content bytes
+    size: int  # Declared size in MB, charged to the node's available_storage
+
+class FileStore:
+    def __init__(self, node: Node, directory: Optional[str] = None):
+        """
+        A node's files, stored as an append-only segment file with an
+        in-memory index.
+
+        Every write appends a record (header, path, content) to the segment;
+        a delete appends a tombstone. A dict maps each path to the location
+        of its latest content, and a sorted list of the paths answers prefix
+        and directory listings with a binary search. Reads return
+        ``memoryview`` slices of a memory map of the segment, so content is
+        never copied into Python objects unless asked for. Space held by
+        overwritten and deleted files is reclaimed by ``compact``.
+
+        The store becomes ``node.store``: ``Node.add_file``,
+        ``Node.remove_file`` and ``Node.add_directory`` then go through it, and
+        the declared ``File.size`` of every stored file is charged to
+        ``node.available_storage`` exactly once. Files the node already held
+        are moved into the store. If the segment already exists, its index
+        is rebuilt from it.
+
+        Args:
+            node (Node): The node whose files are stored.
+            directory (Optional[str]): Where the segment file is kept. A new
+                temporary directory is used when omitted.
+        """
+        self.node = node
+        self.directory = directory or tempfile.mkdtemp(prefix=f"node_{node.id}_")
+        self.segment_path = os.path.join(self.directory, f"node_{node.id}.seg")
+        self.index: Dict[str, FileEntry] = {}
+        self.paths: List[str] = []  # Sorted, for prefix scans
+        self.segment_bytes = 0
+        self.live_bytes = 0  # Bytes of the records still referenced by the index
+        self._segment = open(self.segment_path, "a+b")
+        self._map: Optional[mmap.mmap] = None
+        self._retired_maps: List[mmap.mmap] = []  # Older maps that readers may still hold views of
+
+        existing = []
+        if node.store is None:
+            existing = list(node.files)
+            node.files.clear()
+        if os.path.getsize(self.segment_path):
+            self._recover()
+        # Files already on the node were charged when they were added
+        for file in existing:
+            replaced = self._append(file.name, file.content.encode(errors=CONTENT_ERRORS), file.size)
+            if replaced is not None:
+                self.node.available_storage += replaced.size
+        node.store = self
+
+    # Segment I/O
+
+    def _append(self, path: str, content: bytes, size: int) -> Optional[FileEntry]:
+        """Append a record for ``path`` and index it. Returns the entry it replaced, if any."""
+        encoded_path = path.encode()
+        self._segment.seek(0, os.SEEK_END)
+        start = self._segment.tell()
+        self._segment.write(encode_record(encoded_path, content, size))
+        self._segment.flush()
+        record_bytes = RECORD_HEADER.size + len(encoded_path) + len(content)
+        self.segment_bytes = start + record_bytes
+        replaced = self._drop(path)
+        self.index[path] = FileEntry(path, start + RECORD_HEADER.size + len(encoded_path), len(content), size)
+        insort(self.paths, path)
+        self.live_bytes += record_bytes
+        return replaced
+
+    def _append_tombstone(self, path: str) -> None:
+        encoded_path = path.encode()
+        self._segment.seek(0, os.SEEK_END)
+        self._segment.write(encode_record(encoded_path, b"", 0, TOMBSTONE))
+        self._segment.flush()
+        self.segment_bytes += RECORD_HEADER.size + len(encoded_path)
+
+    def _drop(self, path: str) -> Optional[FileEntry]:
+        entry = self.index.pop(path, None)
+        if entry is not None:
+            del self.paths[bisect_left(self.paths, path)]
+            self.live_bytes -= RECORD_HEADER.size + len(path.encode()) + entry.length
+        return entry
+
+    def _recover(self) -> None:
+        """
+        Rebuild the index from the segment. Reading stops at the first record
+        that is cut short or fails its checksum, the torn tail of a write a
+        crash interrupted; the segment is truncated there before indexing.
+        """
+        self._segment.seek(0)
+        data = self._segment.read()
+        records = []  # (path, content start, content length or TOMBSTONE, size)
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(data):
+            checksum, path_length, content_length, size = RECORD_HEADER.unpack_from(data, offset)
+            path_start = offset + RECORD_HEADER.size
+            content_start = path_start + path_length
+            end = content_start + (0 if content_length == TOMBSTONE else content_length)
+            if end > len(data) or zlib.crc32(data[offset + CHECKSUM.size:end]) != checksum:
+                break
+            try:
+                path = data[path_start:content_start].decode()
+            except UnicodeDecodeError:
+                break
+            records.append((path, content_start, content_length, size))
+            offset = end
+        if offset < len(data):
+            self._segment.truncate(offset)
+            self._segment.flush()
+
+        for path, content_start, content_length, size in records:
+            self._drop(path)
+            if content_length == TOMBSTONE:
+                continue
+            self.index[path] = FileEntry(path, content_start, content_length, size)
+            insort(self.paths, path)
+            self.live_bytes += RECORD_HEADER.size + len(path.encode()) + content_length
+        self.segment_bytes = offset
+        self.node.available_storage -= sum(entry.size for entry in self.index.values())
+
+    def _mapped(self, end: int) -> mmap.mmap:
+        if self._map is None or len(self._map) < end:
+            self._retire_map()
+            self._map = mmap.mmap(self._segment.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _retire_map(self) -> None:
+        if self._map is None:
+            return
+        try:
+            self._map.close()
+        except BufferError:
+            self._retired_maps.append(self._map)  # A reader still holds a view of it
+        self._map = None
+        self._retired_maps = [segment_map for segment_map in self._retired_maps if not self._try_close(segment_map)]
+
+    @staticmethod
+    def _try_close(segment_map: mmap.mmap) -> bool:
+        try:
+            segment_map.close()
+        except BufferError:
+            return False
+        return True
+
+    # File operations
+
+    def write(self, path: str, content: Union[bytes, str], size: Optional[int] = None) -> bool:
+        """
+        Store ``content`` under ``path``, replacing any earlier version.
+
+        Args:
+            path (str): The file's path, directories separated by '/'.
+            content (Union[bytes, str]): The content; strings are stored as
+                UTF-8, with the bytes ``get_file`` escaped restored as they were.
+            size (Optional[int]): The size in MB charged to the node's storage.
+                Defaults to the content length rounded up to whole MB.
+
+        Returns:
+            bool: False, with nothing written, if the node lacks the storage.
+        """
+        content = content.encode(errors=CONTENT_ERRORS) if isinstance(content, str) else bytes(content)
+        if size is None:
+            size = -(-len(content) // (1024 * 1024))
+        previous = self.index.get(path)
+        freed = previous.size if previous is not None else 0
+        if size > self.node.available_storage + freed:
+            return False
+        self._append(path, content, size)
+        self.node.available_storage += freed - size
+        if previous is not None:
+            self._maybe_compact()  # The replaced version is dead space, as a deleted file is
+        return True
+
+    def read(self, path: str) -> memoryview:
+        """
+        The content of ``path`` as a zero-copy view of the segment.
+
+        Raises:
+            KeyError: If there is no such file.
+        """
+        entry = self.index[path]
+        return memoryview(self._mapped(entry.offset + entry.length))[entry.offset:entry.offset + entry.length]
+
+    def delete(self, path: str) -> Optional[FileEntry]:
+        """Delete ``path`` and free its storage. Returns its index entry, or None if absent."""
+        entry = self._drop(path)
+        if entry is None:
+            return None
+        self._append_tombstone(path)
+        self.node.available_storage += entry.size
+        self._maybe_compact()
+        return entry
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def list_prefix(self, prefix: str) -> Iterator[str]:
+        """Every path that starts with ``prefix``, in sorted order."""
+        for position in range(bisect_left(self.paths, prefix), len(self.paths)):
+            path = self.paths[position]
+            if not path.startswith(prefix):
+                return
+            yield path
+
+    def listdir(self, directory: str = "") -> List[str]:
+        """The files and subdirectories (with a trailing '/') directly inside ``directory``."""
+        prefix = directory.rstrip("/") + "/" if directory else ""
+        children: List[str] = []
+        for path in self.list_prefix(prefix):
+            child = path[len(prefix):]
+            name = child.split("/", 1)[0] + "/" if "/" in child else child
+            if not children or children[-1] != name:
+                children.append(name)
+        return children
+
+    # File and Directory objects, as used by Node
+
+    def add_file(self, file: File, directory: str = "") -> bool:
+        path = f"{directory.rstrip('/')}/{file.name}" if directory else file.name
+        return self.write(path, file.content, file.size)
+
+    def remove_file(self, path: str) -> Optional[File]:
+        if path not in self.index:
+            return None
+        file = self.get_file(path)
+        self.delete(path)
+        return file
+
+    def get_file(self, path: str) -> File:
+        """
+        Materialise ``path`` as a ``File``, decoding its content as UTF-8.
+        Bytes that are not valid UTF-8 become lone surrogates, which
+        ``write`` turns back into the same bytes.
+        """
+        entry = self.index[path]
+        return File(name=path, size=entry.size, content=bytes(self.read(path)).decode(errors=CONTENT_ERRORS))
+
+    def add_directory(self, directory: Directory, parent: str = "") -> bool:
+        """Store every file of ``directory`` and its subdirectories under ``parent/directory.name``."""
+        path = f"{parent.rstrip('/')}/{directory.name}" if parent else directory.name
+        stored = all([self.add_file(file, path) for file in directory.files])
+        return all([self.add_directory(subdirectory, path) for subdirectory in directory.subdirectories]) and stored
+
+    def files(self) -> List[File]:
+        return [self.get_file(path) for path in self.paths]
+
+    # Space reclamation
+
+    @property
+    def dead_bytes(self) -> int:
+        return self.segment_bytes - self.live_bytes
+
+    def _maybe_compact(self) -> None:
+        if self.segment_bytes >= MIN_COMPACTION_BYTES and self.dead_bytes > COMPACTION_THRESHOLD * self.segment_bytes:
+            self.compact()
+
+    def compact(self) -> int:
+        """
+        Rewrite the segment with only the live files, in path order.
+
+        Returns:
+            int: The bytes reclaimed.
+        """
+        before = self.segment_bytes
+        compacted_path = self.segment_path + ".compact"
+        source = self._mapped(self.segment_bytes) if self.segment_bytes else None
+        entries = {}
+        with open(compacted_path, "wb") as compacted:
+            for path in self.paths:
+                entry = self.index[path]
+                encoded_path = path.encode()
+                start = compacted.tell()
+                compacted.write(encode_record(encoded_path, source[entry.offset:entry.offset + entry.length],
+                                              entry.size))
+                entries[path] = FileEntry(path, start + RECORD_HEADER.size + len(encoded_path), entry.length,
+                                          entry.size)
+            self.segment_bytes = compacted.tell()
+        self._retire_map()
+        self._segment.close()
+        os.replace(compacted_path, self.segment_path)
+        self._segment = open(self.segment_path, "a+b")
+        self.index = entries
+        self.live_bytes = self.segment_bytes
+        return before - self.segment_bytes
+
+    def close(self) -> None:
+        """Close the segment and the memory maps. Views returned by ``read`` become invalid."""
+        self._retire_map()
+        self._segment.close()
+
+if __name__ == "__main__":
+    import shutil
+    import time
+
+    node = Node(node_id="0", compute=3.0, memory=8192, storage=100000)
+    store = FileStore(node)
+    payload = b"x" * 4096
+    start_time = time.time()
+    for i in range(20000):
+        store.write(f"logs/{i % 100:03d}/part_{i}.log", payload, size=1)
+    print(f"Wrote {len(store)} files in {time.time() - start_time:.2f}s, "
+          f"available storage {node.available_storage}MB of {node.storage}MB")
+
+    start_time = time.time()
+    hits = sum(len(store.read(f"logs/{i % 100:03d}/part_{i}.log")) for i in range(0, 20000, 7))
+    print(f"Read {hits} bytes by path in {time.time() - start_time:.3f}s; logs/042/ has {len(store.listdir('logs/042'))} files")
+
+    for i in range(0, 20000, 4):
+        store.remove_file(f"logs/{i % 100:03d}/part_{i}.log")
+    store.write("logs/000/part_1.log", b"rewritten", size=1)
+    before = store.segment_bytes
+    reclaimed = store.compact()
+    print(f"Compaction: {before} -> {store.segment_bytes} bytes ({reclaimed} reclaimed), "
+          f"{len(store)} files, available storage {node.available_storage}MB")
+    print(f"Still readable after compaction: {bytes(store.read('logs/000/part_1.log'))}")
+    store.close()
+    shutil.rmtree(store.directory)
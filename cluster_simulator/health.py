@@ -0,0 +1,317 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from bisect import bisect_right
+from collections import deque
+import asyncio
+import math
+import random
+from cluster_simulator.cluster import Cluster
+from cluster_simulator.node import Node
+
+DEFAULT_MEAN_LATENCY = 0.005  # Median ping round trip of a node, in seconds
+DEFAULT_LATENCY_SPREAD = 0.5  # Sigma of the log-normal spread of latencies between and within nodes
+DEFAULT_TIMEOUT = 0.05  # Seconds a ping waits for its pong
+DEFAULT_MAX_CONCURRENCY = 1000  # Pings in flight at once
+DEFAULT_INTERVAL = 0.2  # Seconds between the starts of two sweeps
+DEFAULT_PHI_THRESHOLD = 8.0  # Suspicion level at which a node is declared dead (about 1 false positive in 10^8)
+HEARTBEAT_WINDOW = 100  # Inter-arrival times kept per node by the phi accrual detector
+
+class SimulatedLatency:
+    def __init__(self, mean: float = DEFAULT_MEAN_LATENCY, spread: float = DEFAULT_LATENCY_SPREAD,
+                 seed: Optional[int] = None):
+        """
+        Ping round-trip times drawn from a log-normal distribution. Every node
+        gets its own median once, so some nodes are consistently slower
+        than others, and every ping varies around it.
+
+        Args:
+            mean (float): The median round trip over all nodes, in seconds.
+            spread (float): Sigma of the log-normal, for both the per-node
+                median and the per-ping variation.
+            seed (Optional[int]): Seed of the random source.
+        """
+        self.mean = mean
+        self.spread = spread
+        self.rng = random.Random(seed)
+        self.node_medians: Dict[str, float] = {}
+
+    def sample(self, node_id: str) -> float:
+        median = self.node_medians.get(node_id)
+        if median is None:
+            median = self.node_medians[node_id] = self.mean * self.rng.lognormvariate(0.0, self.spread)
+        return median * self.rng.lognormvariate(0.0, self.spread)
+
+class PhiAccrualDetector:
+    def __init__(self, threshold: float = DEFAULT_PHI_THRESHOLD, window: int = HEARTBEAT_WINDOW,
+                 min_std: float = DEFAULT_INTERVAL / 4, first_interval: float = DEFAULT_INTERVAL,
+                 acceptable_pause: float = DEFAULT_INTERVAL):
+        """
+        The phi accrual failure detector of Hayashibara et al.
+
+        For every node it keeps the recent intervals between heartbeats and
+        reports phi = -log10(P(the next heartbeat is still to come)) under a
+        normal distribution fitted to them. Phi grows the longer a heartbeat
+        is overdue relative to the node's usual rhythm, so one late pong of
+        a jittery node does not make it look dead, while a silent node
+        crosses the threshold within a few intervals.
+
+        Args:
+            threshold (float): Phi above which a node is considered dead.
+            window (int): Intervals kept per node.
+            min_std (float): Floor on the standard deviation, in seconds, so
+                very regular heartbeats do not make phi explode on small delays.
+            first_interval (float): Interval assumed for a node heard from only once.
+            acceptable_pause (float): Extra silence, in seconds, tolerated on
+                top of the usual interval, e.g. one lost ping.
+        """
+        self.threshold = threshold
+        self.window = window
+        self.min_std = min_std
+        self.first_interval = first_interval
+        self.acceptable_pause = acceptable_pause
+        self.intervals: Dict[str, deque] = {}
+        self.last_heartbeat: Dict[str, float] = {}
+
+    def heartbeat(self, node_id: str, now: float) -> None:
+        last = self.last_heartbeat.get(node_id)
+        if last is None:
+            self.intervals[node_id] = deque([self.first_interval], maxlen=self.window)
+        else:
+            self.intervals[node_id].append(now - last)
+        self.last_heartbeat[node_id] = now
+
+    def phi(self, node_id: str, now: float) -> float:
+        last = self.last_heartbeat.get(node_id)
+        if last is None:
+            return math.inf
+        intervals = self.intervals[node_id]
+        mean = sum(intervals) / len(intervals)
+        std = max(self.min_std, math.sqrt(sum((x - mean) ** 2 for x in intervals) / len(intervals)))
+        mean += self.acceptable_pause
+        # Logistic approximation of the normal CDF, as used by Akka and Cassandra
+        y = (now - last - mean) / std
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y))
+        still_to_come = e / (1.0 + e) if now - last > mean else 1.0 - 1.0 / (1.0 + e)
+        return -math.log10(max(still_to_come, 1e-300))
+
+    def is_alive(self, node_id: str, now: float) -> bool:
+        return self.phi(node_id, now) < self.threshold
+
+    def forget(self, node_id: str) -> None:
+        self.intervals.pop(node_id, None)
+        self.last_heartbeat.pop(node_id, None)
+
+class TimeoutDetector:
+    def __init__(self, timeout: float = 3 * DEFAULT_INTERVAL):
+        """
+        A node is dead once ``timeout`` seconds have passed since its last heartbeat.
+
+        Args:
+            timeout (float): Seconds of silence tolerated.
+        """
+        self.timeout = timeout
+        self.last_heartbeat: Dict[str, float] = {}
+
+    def heartbeat(self, node_id: str, now: float) -> None:
+        self.last_heartbeat[node_id] = now
+
+    def is_alive(self, node_id: str, now: float) -> bool:
+        last = self.last_heartbeat.get(node_id)
+        return last is not None and now - last < self.timeout
+
+    def forget(self, node_id: str) -> None:
+        self.last_heartbeat.pop(node_id, None)
+
+class LiveNodeSet:
+    def __init__(self, node_ids: Iterator[str] = ()):
+        """
+        The nodes believed to be alive, updated one transition at a time.
+
+        Every change bumps ``version`` and is logged, so a consumer can catch
+        up with ``changes_since`` or be called back through ``subscribe``
+        instead of rescanning the cluster. ``ids`` keeps the order in which
+        nodes (re)joined, so the partition index of a surviving node only
+        shifts when an earlier node leaves.
+
+        Args:
+            node_ids (Iterator[str]): The nodes alive initially.
+        """
+        self._ids: Dict[str, None] = dict.fromkeys(node_ids)
+        self.version = 0
+        self._log: List[Tuple[int, str, bool]] = []  # (version, node_id, alive) per change
+        self._subscribers: List[Callable[[str, bool], None]] = []
+        self._ordered: Optional[List[str]] = None
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def ids(self) -> List[str]:
+        """The live node IDs as a list, rebuilt only after a change."""
+        if self._ordered is None:
+            self._ordered = list(self._ids)
+        return self._ordered
+
+    def mark(self, node_id: str, alive: bool) -> bool:
+        """
+        Record that ``node_id`` is alive or dead.
+
+        Returns:
+            bool: Whether this changed the set.
+        """
+        if (node_id in self._ids) == alive:
+            return False
+        if alive:
+            self._ids[node_id] = None
+        else:
+            del self._ids[node_id]
+        self.version += 1
+        self._ordered = None
+        self._log.append((self.version, node_id, alive))
+        for callback in self._subscribers:
+            callback(node_id, alive)
+        return True
+
+    def changes_since(self, version: int) -> List[Tuple[str, bool]]:
+        """The (node_id, alive) transitions after ``version``, oldest first."""
+        start = bisect_right(self._log, version, key=lambda entry: entry[0])
+        return [(node_id, alive) for _, node_id, alive in self._log[start:]]
+
+    def subscribe(self, callback: Callable[[str, bool], None]) -> None:
+        """Call ``callback(node_id, alive)`` on every future change."""
+        self._subscribers.append(callback)
+
+class HealthMonitor:
+    def __init__(self, cluster: Cluster, timeout: float = DEFAULT_TIMEOUT,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, detector: str = 'phi',
+                 phi_threshold: float = DEFAULT_PHI_THRESHOLD, interval: float = DEFAULT_INTERVAL,
+                 latency: Optional[SimulatedLatency] = None):
+        """
+        Concurrent liveness checks of every node of a cluster.
+
+        A sweep pings all nodes at once on the event loop, with at most
+        ``max_concurrency`` pings in flight and each one abandoned after
+        ``timeout``. A node answers after its simulated latency if
+        ``Node.ping()`` says it is up, and never otherwise. Answers are fed
+        to a failure detector as heartbeats, and nodes whose verdict changes
+        are published to ``live_nodes``. The monitor attaches that set to the
+        cluster, so ``Cluster.partition_node_ids`` and the partitioners that
+        use it skip dead nodes.
+
+        Args:
+            cluster (Cluster): The cluster to watch.
+            timeout (float): Seconds a ping waits for its answer.
+            max_concurrency (int): Pings in flight at once.
+            detector (str): 'phi' for phi accrual or 'timeout' for a fixed
+                heartbeat timeout of three intervals.
+            phi_threshold (float): Suspicion level of the phi accrual detector.
+            interval (float): Seconds between sweeps started by ``run``; also
+                scales the failure detectors.
+            latency (Optional[SimulatedLatency]): Response times of the nodes.
+        """
+        if detector == 'phi':
+            self.detector = PhiAccrualDetector(phi_threshold, min_std=interval / 4, first_interval=interval,
+                                               acceptable_pause=interval)
+        elif detector == 'timeout':
+            self.detector = TimeoutDetector(3 * interval)
+        else:
+            raise ValueError("Invalid detector. Use 'phi' or 'timeout'.")
+        self.cluster = cluster
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.interval = interval
+        self.latency = latency or SimulatedLatency()
+        self.live_nodes = LiveNodeSet(cluster.nodes)
+        cluster.live_nodes = self.live_nodes
+        self.sweeps = 0
+        self.last_sweep_time = 0.0  # Seconds the last sweep took
+        self.last_timeouts = 0  # Pings of the last sweep that went unanswered
+
+    async def ping(self, node: Node, semaphore: asyncio.Semaphore) -> Optional[float]:
+        """The round-trip time of one ping to ``node``, or None if it timed out."""
+        async with semaphore:
+            latency = self.latency.sample(node.id)
+            # The outcome is known up front, so waiting min(latency, timeout) is the
+            # same as racing the pong against a timer, without a second task per ping
+            if latency > self.timeout or not node.ping():
+                await asyncio.sleep(self.timeout)
+                return None
+            await asyncio.sleep(latency)
+            return latency
+
+    async def sweep(self) -> List[Tuple[str, bool]]:
+        """
+        Ping every node once, then update the live set.
+
+        Returns:
+            List[Tuple[str, bool]]: The (node_id, alive) transitions it published.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        nodes = list(self.cluster.nodes.values())
+        answers = await asyncio.gather(*(self.ping(node, semaphore) for node in nodes))
+        now = loop.time()
+        for node, answer in zip(nodes, answers):
+            if answer is not None:
+                self.detector.heartbeat(node.id, now)
+        self.sweeps += 1
+        self.last_sweep_time = now - start
+        self.last_timeouts = answers.count(None)
+        return self.evaluate(now)
+
+    def evaluate(self, now: float) -> List[Tuple[str, bool]]:
+        """Apply the detector's verdict on every node at time ``now`` and publish the changes."""
+        version = self.live_nodes.version
+        for node_id in self.cluster.nodes:
+            self.live_nodes.mark(node_id, self.detector.is_alive(node_id, now))
+        for node_id in [node_id for node_id in self.live_nodes if node_id not in self.cluster.nodes]:
+            self.live_nodes.mark(node_id, False)
+        for node_id in [node_id for node_id in self.detector.last_heartbeat if node_id not in self.cluster.nodes]:
+            self.detector.forget(node_id)
+        return self.live_nodes.changes_since(version)
+
+    async def run(self, sweeps: Optional[int] = None) -> None:
+        """Sweep every ``interval`` seconds, ``sweeps`` times or until cancelled."""
+        loop = asyncio.get_running_loop()
+        done = 0
+        while sweeps is None or done < sweeps:
+            start = loop.time()
+            await self.sweep()
+            done += 1
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - start)))
+
+if __name__ == "__main__":
+    from algorithms.relation import Relation
+    from algorithms.parallel_sort.range_sort import range_partition
+
+    async def demo() -> None:
+        cluster = Cluster("DataCenter1")
+        cluster.generate_random_cluster(5000)
+        monitor = HealthMonitor(cluster, latency=SimulatedLatency(seed=0))
+        await monitor.run(sweeps=3)
+        sequential = sum(monitor.latency.node_medians.values())
+        print(f"Sweep of {len(cluster.nodes)} nodes: {monitor.last_sweep_time * 1000:.0f} ms "
+              f"(one at a time: about {sequential:.1f} s), {len(monitor.live_nodes)} live")
+
+        failed = random.sample(list(cluster.nodes), 100)
+        for node_id in failed:
+            cluster.nodes[node_id].is_active = False
+        changes = []
+        monitor.live_nodes.subscribe(lambda node_id, alive: changes.append(node_id))
+        sweeps_before = monitor.sweeps
+        while len(changes) < len(failed) and monitor.sweeps - sweeps_before < 20:
+            await monitor.run(sweeps=1)
+        print(f"Detected {len(changes)} of {len(failed)} failures after {monitor.sweeps - sweeps_before} sweeps, "
+              f"{sum(node_id not in failed for node_id in changes)} false positives")
+
+        relation = Relation.from_rows([(i, i) for i in range(100000)])
+        partitions = range_partition(cluster, relation, 0)
+        print(f"Range partitioning now uses {len(partitions)} nodes; "
+              f"dead nodes receiving rows: {sum(node_id in failed for node_id in partitions)}")
+
+    asyncio.run(demo())
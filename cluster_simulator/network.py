@@ -0,0 +1,314 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import defaultdict
+from dataclasses import dataclass, field
+import operator
+import numpy as np
+from cluster_simulator.cluster import Cluster
+
+DEFAULT_ROW_BYTES = 100  # Assumed wire size of one tuple when a table is not columnar
+BYTES_PER_MB = 1024 * 1024
+MAX_ASSIGNMENT_PASSES = 10  # Rounds of pairwise swaps tried by optimize_assignment
+
+Flows = Dict[Tuple[str, str], float]  # Bytes to send per (source node, target node)
+
+@dataclass
+class PhaseCost:
+    name: str
+    time: float  # Seconds until the last transfer of the phase completes
+    bytes_sent: float  # Bytes that crossed at least one link
+    bytes_local: float  # Bytes whose source and target are the same node
+    link_busy: Dict[Tuple[str, str], float] = field(default_factory=dict)  # Seconds each directed link is in use
+    bottleneck_link: Optional[Tuple[str, str]] = None
+
+@dataclass
+class ShuffleCost:
+    phases: List[PhaseCost]
+
+    @property
+    def total_time(self) -> float:
+        return sum(phase.time for phase in self.phases)
+
+    @property
+    def total_bytes_sent(self) -> float:
+        return sum(phase.bytes_sent for phase in self.phases)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Seconds per phase, in execution order."""
+        return {phase.name: phase.time for phase in self.phases}
+
+def table_bytes(table: Any) -> float:
+    """Wire size of a partition: the array bytes of a ``Relation``, or a fixed size per tuple."""
+    nbytes = getattr(table, 'nbytes', None)
+    return nbytes if nbytes is not None else len(table) * DEFAULT_ROW_BYTES
+
+def phase_sizes(phases: Dict[str, Dict[Any, Any]]) -> Dict[str, Dict[Any, float]]:
+    """The size in bytes of every partition of every phase's partition map."""
+    return {name: {key: table_bytes(table) for key, table in partitions.items()} for name, partitions in phases.items()}
+
+def default_placement(cluster: Cluster, partition_keys: Sequence[Any]) -> Dict[Any, str]:
+    """
+    The node each partition runs on when no assignment is given: keys that
+    are node ids stay on that node, integer partition ``i`` goes to the
+    ``i``-th of ``Cluster.partition_node_ids``.
+
+    Raises:
+        ValueError: If a key is neither a node id nor a partition index.
+    """
+    node_ids = cluster.partition_node_ids()
+    placement = {}
+    for key in partition_keys:
+        if key in cluster.nodes:
+            placement[key] = key
+            continue
+        try:
+            index = operator.index(key)
+        except TypeError:
+            index = None
+        if index is None or isinstance(key, bool) or not 0 <= index < len(node_ids):
+            raise ValueError(f"Partition key {key!r} is neither a node id nor a partition index below "
+                             f"{len(node_ids)}; pass an explicit placement.")
+        placement[key] = node_ids[index]
+    return placement
+
+def shuffle_flows(cluster: Cluster, partition_bytes: Dict[Any, float], placement: Dict[Any, str]) -> Flows:
+    """
+    The traffic of repartitioning a table that starts out evenly spread over
+    the cluster: every node holds ``1 / len(nodes)`` of each partition's rows
+    and sends them to the node the partition is placed on.
+
+    Args:
+        cluster (Cluster): The cluster.
+        partition_bytes (Dict[Any, float]): The size of every partition.
+        placement (Dict[Any, str]): The node of every partition.
+
+    Returns:
+        Flows: Bytes per (source, target) pair.
+    """
+    flows: Flows = defaultdict(float)
+    share = 1 / len(cluster.nodes)
+    for key, size in partition_bytes.items():
+        for source_id in cluster.nodes:
+            flows[(source_id, placement[key])] += size * share
+    return flows
+
+class ShuffleSimulator:
+    def __init__(self, cluster: Cluster):
+        """
+        Estimate how long data movement takes on a cluster's network.
+
+        Every transfer follows the cluster's shortest route. All transfers of
+        a phase start together and share the links they cross, so a link is
+        busy for the total bytes routed over it divided by its bandwidth, and
+        a transfer finishes when the busiest link on its route does, plus the
+        route's latency.
+
+        Args:
+            cluster (Cluster): The cluster whose links and routes are used.
+        """
+        self.cluster = cluster
+
+    def simulate_flows(self, flows: Flows, name: str = "shuffle") -> PhaseCost:
+        """
+        Cost one phase of concurrent transfers.
+
+        Args:
+            flows (Flows): Bytes per (source, target) pair.
+            name (str): The phase name used in the breakdown.
+
+        Returns:
+            PhaseCost: The duration, traffic and link usage of the phase.
+        """
+        link_bytes: Dict[Tuple[str, str], float] = defaultdict(float)
+        routes = {}
+        bytes_sent = bytes_local = 0.0
+        for (source_id, target_id), size in flows.items():
+            if not size:
+                continue
+            if source_id == target_id:
+                bytes_local += size
+                continue
+            bytes_sent += size
+            route = self.cluster.route(source_id, target_id)
+            routes[(source_id, target_id)] = route
+            for hop in zip(route, route[1:]):
+                link_bytes[hop] += size
+
+        link_busy = {hop: size / BYTES_PER_MB / self.cluster.link(*hop).bandwidth for hop, size in link_bytes.items()}
+        time = 0.0
+        for route in routes.values():
+            hops = list(zip(route, route[1:]))
+            latency = sum(self.cluster.link(*hop).latency for hop in hops) / 1000
+            time = max(time, max(link_busy[hop] for hop in hops) + latency)
+        bottleneck = max(link_busy, key=link_busy.__getitem__) if link_busy else None
+        return PhaseCost(name, time, bytes_sent, bytes_local, dict(link_busy), bottleneck)
+
+    def simulate_shuffle(self, phases: Dict[str, Dict[Any, Any]],
+                         placement: Optional[Dict[Any, str]] = None) -> ShuffleCost:
+        """
+        Cost the shuffles that produce a set of partition maps, one phase per
+        map, run one after the other.
+
+        Args:
+            phases (Dict[str, Dict[Any, Any]]): Partition maps by phase name,
+                as returned by ``range_partition`` or ``hash_partition``.
+            placement (Optional[Dict[Any, str]]): The node of every partition.
+                Defaults to ``default_placement``.
+
+        Returns:
+            ShuffleCost: The cost of every phase.
+        """
+        return self.simulate_sizes(phase_sizes(phases), placement)
+
+    def simulate_sizes(self, phases: Dict[str, Dict[Any, float]],
+                       placement: Optional[Dict[Any, str]] = None) -> ShuffleCost:
+        """Like ``simulate_shuffle``, from partition sizes in bytes."""
+        costs = []
+        for name, partition_bytes in phases.items():
+            phase_placement = placement or default_placement(self.cluster, list(partition_bytes))
+            costs.append(self.simulate_flows(shuffle_flows(self.cluster, partition_bytes, phase_placement), name))
+        return ShuffleCost(costs)
+
+    def optimize_assignment(self, phases: Dict[str, Dict[Any, float]], placement: Optional[Dict[Any, str]] = None,
+                            max_passes: int = MAX_ASSIGNMENT_PASSES) -> Tuple[Dict[Any, str], ShuffleCost]:
+        """
+        Choose the node of every partition to minimise simulated shuffle time.
+
+        Starting from ``placement``, pairs of partitions swap nodes whenever
+        that lowers the total simulated time, until a full pass finds no
+        improving swap. A swap is costed by moving only the two partitions'
+        traffic on precomputed per-node link loads (see ``_link_tables``),
+        so a pass costs O(P^2 * links) rather than re-simulating every flow. Every node keeps exactly the partitions it had, so
+        the degree of parallelism is unchanged; only which partition lands
+        where is optimised, which lets the largest partitions go to the
+        best-connected nodes.
+
+        Args:
+            phases (Dict[str, Dict[Any, float]]): Partition sizes in bytes by
+                phase name (see ``phase_sizes``). All phases must share the
+                same partition keys.
+            placement (Optional[Dict[Any, str]]): The starting placement.
+                Defaults to ``default_placement``.
+            max_passes (int): Upper bound on the number of improvement passes.
+
+        Returns:
+            Tuple[Dict[Any, str], ShuffleCost]: The best placement found and its cost.
+        """
+        keys = list(next(iter(phases.values()))) if phases else []
+        placement = dict(placement or default_placement(self.cluster, keys))
+        node_ids, unit_busy, route_latency = self._link_tables()
+        node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+        sizes = np.array([[partition_bytes.get(key, 0.0) for key in keys] for partition_bytes in phases.values()],
+                         dtype=np.float64).reshape(len(phases), len(keys))
+        nonempty = (sizes > 0).astype(np.int64)
+        targets = np.array([node_index[placement[key]] for key in keys], dtype=np.intp)
+        # Per phase: the bytes and non-empty partitions placed on every node, and the seconds each link is busy
+        loads = np.zeros((len(phases), len(node_ids)))
+        senders = np.zeros((len(phases), len(node_ids)), dtype=np.int64)
+        for phase in range(len(phases)):
+            loads[phase] = np.bincount(targets, weights=sizes[phase], minlength=len(node_ids))
+            senders[phase] = np.bincount(targets, weights=nonempty[phase], minlength=len(node_ids))
+        busy = loads @ unit_busy
+
+        def phase_latency(phase_senders: np.ndarray) -> np.ndarray:
+            # The slowest route into a node that receives data, per link
+            return np.array([route_latency[row > 0].max(axis=0, initial=-np.inf) for row in phase_senders])
+
+        def total_time(phase_busy: np.ndarray, latency: np.ndarray) -> float:
+            return float(np.max(phase_busy + latency, axis=1, initial=0.0).sum())
+
+        latency = phase_latency(senders)
+        best_time = total_time(busy, latency)
+        for _ in range(max_passes):
+            improved = False
+            for i in range(len(keys)):
+                for j in range(i + 1, len(keys)):
+                    first, second = targets[i], targets[j]
+                    if first == second:
+                        continue
+                    # Swapping moves the size difference from one node to the other
+                    moved = sizes[:, j] - sizes[:, i]
+                    if not moved.any():
+                        continue
+                    swapped_busy = busy + moved[:, None] * (unit_busy[first] - unit_busy[second])
+                    moved_senders = nonempty[:, j] - nonempty[:, i]
+                    swapped_senders, swapped_latency = senders, latency
+                    if moved_senders.any():
+                        swapped_senders = senders.copy()
+                        swapped_senders[:, first] += moved_senders
+                        swapped_senders[:, second] -= moved_senders
+                        swapped_latency = phase_latency(swapped_senders)
+                    swapped_time = total_time(swapped_busy, swapped_latency)
+                    if swapped_time < best_time - 1e-12:
+                        targets[i], targets[j] = second, first
+                        busy, senders, latency, best_time = swapped_busy, swapped_senders, swapped_latency, swapped_time
+                        improved = True
+            if not improved:
+                break
+        placement.update((key, node_ids[target]) for key, target in zip(keys, targets))
+        return placement, self.simulate_sizes(phases, placement)
+
+    def _link_tables(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        What placing a byte on each node costs every directed link, for
+        ``optimize_assignment`` to cost a swap without re-routing every flow.
+
+        A phase lasts as long as its slowest link plus the slowest route
+        crossing that link, so the tables hold, per target node and link,
+        the seconds the link is busy per byte sent to the node by
+        ``shuffle_flows``, and the largest latency of the routes into the
+        node that cross the link (``-inf`` where none does, ``inf`` on
+        every link if the node cannot be reached).
+
+        Returns:
+            Tuple[List[str], np.ndarray, np.ndarray]: The node ids, and the
+            busy and latency tables, one row per node.
+        """
+        node_ids = list(self.cluster.nodes)
+        share = 1 / len(node_ids) if node_ids else 0.0
+        hops: Dict[Tuple[str, str], int] = {}
+        per_target = []
+        for target_id in node_ids:
+            unit_busy: Dict[int, float] = defaultdict(float)
+            latency: Dict[int, float] = {}
+            reachable = True
+            for source_id in node_ids:
+                if source_id == target_id:
+                    continue
+                try:
+                    route = self.cluster.route(source_id, target_id)
+                except ValueError:
+                    reachable = False
+                    continue
+                route_hops = list(zip(route, route[1:]))
+                route_latency = sum(self.cluster.link(*hop).latency for hop in route_hops) / 1000
+                for hop in route_hops:
+                    column = hops.setdefault(hop, len(hops))
+                    unit_busy[column] += share / BYTES_PER_MB / self.cluster.link(*hop).bandwidth
+                    latency[column] = max(latency.get(column, -np.inf), route_latency)
+            per_target.append((unit_busy, latency, reachable))
+
+        busy_table = np.zeros((len(node_ids), len(hops)))
+        latency_table = np.full((len(node_ids), len(hops)), -np.inf)
+        for row, (unit_busy, latency, reachable) in enumerate(per_target):
+            busy_table[row, list(unit_busy)] = list(unit_busy.values())
+            latency_table[row, list(latency)] = list(latency.values())
+            if not reachable:
+                latency_table[row] = np.inf  # Never worth sending data to
+        return node_ids, busy_table, latency_table
+
+if __name__ == "__main__":
+    import random
+
+    cluster = Cluster("DataCenter1")
+    cluster.generate_random_cluster(8)
+    # Upgrade the links of node 0 so it becomes a well-connected hub
+    for neighbor_id in cluster.network_topology["0"]:
+        cluster.connect_nodes("0", neighbor_id, bandwidth=10000.0)
+
+    partition_sizes = {i: random.choice([1, 1, 1, 20]) * 50 * BYTES_PER_MB for i in range(len(cluster.nodes))}
+    simulator = ShuffleSimulator(cluster)
+    before = simulator.simulate_sizes({"shuffle": partition_sizes})
+    placement, after = simulator.optimize_assignment({"shuffle": partition_sizes})
+    print(f"Default placement: {before.total_time:.3f}s, bottleneck link {before.phases[0].bottleneck_link}")
+    print(f"Optimised placement: {after.total_time:.3f}s, bottleneck link {after.phases[0].bottleneck_link}")
+    print(f"Partition -> node: {placement}")
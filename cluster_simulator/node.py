@@ -1,6 +1,9 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    from cluster_simulator.file_store import FileStore
+
 @dataclass
 class File:
     name: str
@@ -14,18 +17,56 @@ class Directory:
     subdirectories: List['Directory'] = field(default_factory=list)
 
 class Node:
+    # Slots instead of a per-instance __dict__; the file, directory and neighbor
+    # containers are only allocated once a node actually uses them
+    __slots__ = ('id', 'compute', 'memory', 'storage', 'available_storage', 'is_active',
+                 '_files', '_directories', '_neighbors', '_store')
+
     def __init__(self, node_id: str, compute: float, memory: int, storage: int):
         self.id: str = node_id
-        self.files: List[File] = []
-        self.directories: List[Directory] = []
-        self.neighbors: Dict[str, 'Node'] = {}
+        self._files: Optional[List[File]] = None
+        self._directories: Optional[List[Directory]] = None
+        self._neighbors: Optional[Dict[str, 'Node']] = None
+        self._store: Optional['FileStore'] = None  # Set by FileStore when the node's files move to disk
         self.compute: float = compute  # in GHz
         self.memory: int = memory  # in MB
         self.storage: int = storage  # in MB
         self.available_storage: int = storage
-        self.network_address: str = f"192.168.0.{node_id}"  # Simple network address assignment
         self.is_active: bool = True  # To simulate node availability
 
+    @property
+    def store(self) -> Optional['FileStore']:
+        return self._store
+
+    @store.setter
+    def store(self, store: Optional['FileStore']) -> None:
+        self._store = store
+
+    @property
+    def files(self) -> List[File]:
+        # With a store, a snapshot read from disk; appending to it does not add files
+        if self.store is not None:
+            return self.store.files()
+        if self._files is None:
+            self._files = []
+        return self._files
+
+    @property
+    def directories(self) -> List[Directory]:
+        if self._directories is None:
+            self._directories = []
+        return self._directories
+
+    @property
+    def neighbors(self) -> Dict[str, 'Node']:
+        if self._neighbors is None:
+            self._neighbors = {}
+        return self._neighbors
+
+    @property
+    def network_address(self) -> str:
+        return f"192.168.0.{self.id}"  # Simple network address assignment, formatted on demand
+
     def ping(self) -> bool:
         """Simulate a ping response."""
         return self.is_active
@@ -35,13 +76,30 @@ class Node:
         return f"Pong from {self.id} at {self.network_address}"
 
     def add_file(self, file: File) -> bool:
+        if self.store is not None:
+            return self.store.add_file(file)
         if file.size <= self.available_storage:
             self.files.append(file)
             self.available_storage -= file.size
             return True
         return False
 
+    def remove_file(self, name: str) -> Optional[File]:
+        """Remove the file called ``name`` and free its storage. Returns the file, or None if absent."""
+        if self.store is not None:
+            return self.store.remove_file(name)
+        for index, file in enumerate(self.files):
+            if file.name == name:
+                del self.files[index]
+                self.available_storage += file.size
+                return file
+        return None
+
     def add_directory(self, directory: Directory) -> None:
+        if self.store is not None:
+            # The files are written under the directory's path; the Directory object is not kept
+            self.store.add_directory(directory)
+            return
         self.directories.append(directory)
 
     def connect_to(self, node: 'Node') -> None:
@@ -0,0 +1,222 @@
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import hashlib
+import numpy as np
+from cluster_simulator.cluster import Cluster
+from cluster_simulator.node import File, Node
+
+MB_PER_VIRTUAL_NODE = 10000  # One ring position per 10 GB of storage, so 10 to 100 per generated node
+
+def ring_hash(key: str) -> int:
+    """A 64-bit position on the ring, the same in every process."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+class ConsistentHashRing:
+    def __init__(self, replication_factor: int = 1, mb_per_virtual_node: int = MB_PER_VIRTUAL_NODE):
+        """
+        A consistent-hash ring of nodes.
+
+        Each node owns one virtual position per ``mb_per_virtual_node`` of
+        its storage, so larger nodes receive proportionally more keys. A key
+        is stored on the owners of the first ``replication_factor`` distinct
+        nodes met walking clockwise from its hash. Adding or removing a node
+        only changes the owners of keys next to that node's positions.
+
+        Args:
+            replication_factor (int): Copies kept of every key.
+            mb_per_virtual_node (int): Storage represented by one ring position.
+        """
+        if replication_factor < 1:
+            raise ValueError("replication_factor must be at least 1.")
+        self.replication_factor = replication_factor
+        self.mb_per_virtual_node = mb_per_virtual_node
+        self.weights: Dict[str, int] = {}  # Virtual positions per node
+        self._positions = np.empty(0, dtype=np.uint64)
+        self._owners: List[str] = []
+        self._successors: List[Tuple[str, ...]] = []  # Replica set of the keys ending at every position
+
+    def virtual_nodes(self, node: Node) -> int:
+        return max(1, round(node.storage / self.mb_per_virtual_node))
+
+    def add_node(self, node: Node) -> None:
+        self.add_nodes([node])
+
+    def add_nodes(self, nodes: List[Node]) -> None:
+        for node in nodes:
+            self.weights[node.id] = self.virtual_nodes(node)
+        self._rebuild()
+
+    def remove_node(self, node_id: str) -> None:
+        self.weights.pop(node_id, None)
+        self._rebuild()
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.weights
+
+    def _rebuild(self) -> None:
+        entries = sorted((ring_hash(f"{node_id}#{i}"), node_id)
+                         for node_id, count in self.weights.items() for i in range(count))
+        self._positions = np.array([position for position, _ in entries], dtype=np.uint64)
+        self._owners = [node_id for _, node_id in entries]
+
+        # Precompute, for every position, the distinct nodes met walking clockwise from it
+        replicas = min(self.replication_factor, len(self.weights))
+        self._successors = []
+        num_positions = len(self._owners)
+        for start in range(num_positions):
+            nodes: List[str] = []
+            offset = 0
+            while len(nodes) < replicas:
+                owner = self._owners[(start + offset) % num_positions]
+                if owner not in nodes:
+                    nodes.append(owner)
+                offset += 1
+            self._successors.append(tuple(nodes))
+
+    def lookup(self, key: str) -> Tuple[str, ...]:
+        """The nodes that store ``key``, primary first."""
+        return self.lookup_many([key])[0]
+
+    def lookup_many(self, keys: List[str]) -> List[Tuple[str, ...]]:
+        """The replica sets of a batch of keys, found with one ``searchsorted``."""
+        if not self._owners:
+            raise ValueError("The ring has no nodes.")
+        hashes = np.array([ring_hash(key) for key in keys], dtype=np.uint64)
+        starts = np.searchsorted(self._positions, hashes, side='left') % len(self._owners)
+        return [self._successors[start] for start in starts.tolist()]
+
+@dataclass
+class RebalanceReport:
+    change: str  # 'add' or 'remove'
+    node_id: str
+    files_moved: int = 0  # Files that gained at least one new replica
+    bytes_moved: int = 0  # Bytes copied to new replicas
+    total_bytes: int = 0  # Bytes stored over all replicas after the change
+    unplaced: List[str] = field(default_factory=list)  # Files a target node had no room for
+
+    @property
+    def fraction_moved(self) -> float:
+        return self.bytes_moved / self.total_bytes if self.total_bytes else 0.0
+
+class DataPlacement:
+    def __init__(self, cluster: Cluster, replication_factor: int = 1,
+                 mb_per_virtual_node: int = MB_PER_VIRTUAL_NODE):
+        """
+        Store files on a cluster by consistent hashing of their names.
+
+        Files are written with ``Node.add_file`` on every node of their
+        replica set. When a node joins or leaves, only files whose replica
+        set changed are copied or dropped, and a ``RebalanceReport`` records
+        how much data moved.
+
+        Args:
+            cluster (Cluster): The cluster to place files on. Its active
+                nodes form the initial ring.
+            replication_factor (int): Copies kept of every file.
+            mb_per_virtual_node (int): Storage represented by one ring position.
+        """
+        self.cluster = cluster
+        self.ring = ConsistentHashRing(replication_factor, mb_per_virtual_node)
+        self.ring.add_nodes([node for node in cluster.nodes.values() if node.is_active])
+        self.files: Dict[str, File] = {}
+        self.locations: Dict[str, Tuple[str, ...]] = {}  # Nodes holding each file, primary first
+        self.history: List[RebalanceReport] = []
+
+    def put(self, file: File) -> Tuple[str, ...]:
+        """
+        Store ``file`` on its replica set, replacing any earlier version.
+
+        Returns:
+            Tuple[str, ...]: The nodes now holding the file.
+
+        Raises:
+            ValueError: If a replica node does not have enough free storage.
+        """
+        if file.name in self.files:
+            self.delete(file.name)
+        replicas = self.ring.lookup(file.name)
+        stored = []
+        for node_id in replicas:
+            if not self.cluster.nodes[node_id].add_file(file):
+                for stored_id in stored:
+                    self.cluster.nodes[stored_id].remove_file(file.name)
+                raise ValueError(f"Node {node_id} has no room for file {file.name}.")
+            stored.append(node_id)
+        self.files[file.name] = file
+        self.locations[file.name] = replicas
+        return replicas
+
+    def get(self, name: str) -> Optional[File]:
+        return self.files.get(name)
+
+    def delete(self, name: str) -> None:
+        self.files.pop(name, None)
+        for node_id in self.locations.pop(name, ()):
+            if node_id in self.cluster.nodes:
+                self.cluster.nodes[node_id].remove_file(name)
+
+    def add_node(self, node: Node) -> RebalanceReport:
+        """Add ``node`` to the cluster and the ring, and move the files it now owns."""
+        self.cluster.add_node(node)
+        self.ring.add_node(node)
+        return self._rebalance('add', node.id)
+
+    def remove_node(self, node_id: str) -> RebalanceReport:
+        """Take ``node_id`` off the ring and the cluster, re-replicating the files it held."""
+        self.ring.remove_node(node_id)
+        report = self._rebalance('remove', node_id)
+        self.cluster.remove_node(node_id)
+        return report
+
+    def _rebalance(self, change: str, node_id: str) -> RebalanceReport:
+        report = RebalanceReport(change, node_id)
+        names = list(self.files)
+        targets = self.ring.lookup_many(names) if names else []
+        for name, new_replicas in zip(names, targets):
+            old_replicas = self.locations[name]
+            if new_replicas == old_replicas:
+                continue
+            file = self.files[name]
+            added = [target for target in new_replicas if target not in old_replicas]
+            placed = []
+            for target in added:
+                if self.cluster.nodes[target].add_file(file):
+                    placed.append(target)
+                else:
+                    report.unplaced.append(name)
+            for old in old_replicas:
+                if old not in new_replicas and old in self.cluster.nodes:
+                    self.cluster.nodes[old].remove_file(name)
+            self.locations[name] = tuple(target for target in new_replicas if target in old_replicas or target in placed)
+            if placed:
+                report.files_moved += 1
+                report.bytes_moved += file.size * len(placed)
+        report.total_bytes = sum(self.files[name].size * len(nodes) for name, nodes in self.locations.items())
+        self.history.append(report)
+        return report
+
+if __name__ == "__main__":
+    import random
+
+    cluster = Cluster("DataCenter1")
+    cluster.generate_random_cluster(20)
+    placement = DataPlacement(cluster, replication_factor=3)
+    for i in range(20000):
+        placement.put(File(name=f"file_{i}", size=random.randint(1, 100)))
+
+    def modulo_owner(name: str, node_ids: List[str]) -> str:
+        return node_ids[ring_hash(name) % len(node_ids)]
+
+    node_ids = list(cluster.nodes)
+    new_node = Node(node_id="20", compute=3.0, memory=8192, storage=500000)
+    report = placement.add_node(new_node)
+    modulo_moved = sum(modulo_owner(name, node_ids) != modulo_owner(name, node_ids + ["20"]) for name in placement.files)
+    print(f"Add node 20: {report.fraction_moved:.1%} of stored bytes moved "
+          f"(hash mod N would move {modulo_moved / len(placement.files):.1%} of the files)")
+
+    report = placement.remove_node("3")
+    print(f"Remove node 3: {report.fraction_moved:.1%} of stored bytes moved, {len(report.unplaced)} unplaced")
+    load = {node_id: sum(file.size for file in node.files) for node_id, node in cluster.nodes.items()}
+    storage = {node_id: node.storage for node_id, node in cluster.nodes.items()}
+    correlation = np.corrcoef(list(load.values()), list(storage.values()))[0, 1]
+    print(f"Correlation of stored bytes with node storage: {correlation:.2f}")
@@ -0,0 +1,116 @@
+from typing import Dict, List, Tuple
+from dataclasses import dataclass
+import random
+import time
+import numpy as np
+
+@dataclass
+class CSRTopology:
+    """
+    A read-only snapshot of a cluster's topology in compressed sparse row
+    form: the neighbors of node ``i`` are ``indices[indptr[i]:indptr[i + 1]]``,
+    and the link to each of them has the bandwidth and latency at the same
+    position. Every undirected link is stored once in each direction.
+    """
+    node_ids: List[str]
+    indptr: np.ndarray  # int64, len(node_ids) + 1 offsets into indices
+    indices: np.ndarray  # int32 or int64 neighbor positions
+    bandwidth: np.ndarray  # float64 MB/s per stored link
+    latency: np.ndarray  # float64 ms per stored link
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_links(self) -> int:
+        return len(self.indices) // 2
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def neighbors(self, position: int) -> np.ndarray:
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + self.bandwidth.nbytes + self.latency.nbytes
+
+def random_edges(num_nodes: int, min_connections: int, max_connections: int,
+                 rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw the links of a random cluster in one batch.
+
+    Every node draws a number of connections in ``[min_connections,
+    max_connections]`` and that many random peers other than itself.
+    Self-loops cannot occur and duplicate links are dropped, so a node can
+    end up with slightly fewer links than it drew, and more once other nodes
+    pick it.
+
+    Args:
+        num_nodes (int): The number of nodes, identified by position.
+        min_connections (int): The minimum number of links a node draws.
+        max_connections (int): The maximum number of links a node draws.
+        rng (np.random.Generator): The random source.
+
+    Returns:
+        np.ndarray: ``(num_links, 2)`` node positions, each link once with the
+        smaller position first.
+    """
+    if num_nodes < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    low = min(min_connections, num_nodes - 1)
+    high = min(max_connections, num_nodes - 1)
+    counts = rng.integers(low, high + 1, size=num_nodes)
+    sources = np.repeat(np.arange(num_nodes, dtype=np.int64), counts)
+    # An offset in [1, num_nodes) never lands back on the source
+    targets = (sources + rng.integers(1, num_nodes, size=len(sources))) % num_nodes
+    edges = np.stack([np.minimum(sources, targets), np.maximum(sources, targets)], axis=1)
+    return np.unique(edges, axis=0)
+
+def benchmark_cluster_build(sizes: Tuple[int, ...] = (1000, 10000, 100000),
+                            removal_fraction: float = 0.01) -> Dict[int, Dict[str, float]]:
+    """
+    Time building random clusters, removing a share of their nodes, and
+    exporting the topology to CSR.
+
+    Args:
+        sizes (Tuple[int, ...]): Cluster sizes to test.
+        removal_fraction (float): Share of the nodes removed after the build.
+
+    Returns:
+        Dict[int, Dict[str, float]]: Seconds per phase, and the link count, by cluster size.
+    """
+    from cluster_simulator.cluster import Cluster
+
+    results = {}
+    for num_nodes in sizes:
+        cluster = Cluster(f"Benchmark{num_nodes}")
+        start_time = time.time()
+        cluster.generate_random_cluster(num_nodes)
+        build_time = time.time() - start_time
+
+        start_time = time.time()
+        topology = cluster.to_csr()
+        csr_time = time.time() - start_time
+
+        victims = random.sample(list(cluster.nodes), int(num_nodes * removal_fraction))
+        start_time = time.time()
+        for node_id in victims:
+            cluster.remove_node(node_id)
+        removal_time = time.time() - start_time
+
+        results[num_nodes] = {
+            "build": build_time,
+            "to_csr": csr_time,
+            "remove": removal_time,
+            "remove_per_node": removal_time / max(1, len(victims)),
+            "links": topology.num_links,
+        }
+    return results
+
+if __name__ == "__main__":
+    for num_nodes, timings in benchmark_cluster_build().items():
+        print(f"{num_nodes:>7} nodes, {timings['links']:>7} links: build {timings['build']:.2f}s, "
+              f"to_csr {timings['to_csr']:.3f}s, remove 1% {timings['remove']:.3f}s "
+              f"({timings['remove_per_node'] * 1e6:.1f}us per node)")
@@ -1,47 +1,45 @@
 import threading
+import time
+from concurrency.locks import AtomicCell, TicketLock
 
-# Shared resource (simulated lock and process ID)
-lock = 0
-process_id = 1  # This will be used as the identifier in compare-and-swap
+# Shared resource (simulated lock): 0 when free, otherwise the ID of the holder
+lock = AtomicCell(0)
 
-# Compare-and-Swap function
-def compare_and_swap(memory, expected, new_value):
-    global lock
-    if memory == expected:
-        lock = new_value
-        return True
-    return False
+# Compare-and-Swap: atomically write new_value if the lock still holds expected
+def compare_and_swap(expected: int, new_value: int) -> bool:
+    return lock.compare_and_swap(expected, new_value)
 
 # Function that simulates a process trying to acquire the lock
-def process(name, id):
-    while True:
-        # Try to acquire the lock
-        if compare_and_swap(lock, 0, id):
-            print(f"{name} acquired the lock.")
-            # Critical section
-            break
-        else:
-            print(f"{name} failed to acquire the lock. Retrying...")
-    
-    # Simulate some work
-    import time
+def process(name: str, id: int) -> None:
+    attempts = 1
+    while not compare_and_swap(0, id):
+        # Back off instead of retrying (and printing) in a tight loop
+        attempts += 1
+        time.sleep(0.01)
+    print(f"{name} acquired the lock after {attempts} attempt(s).")
+
+    # Critical section: simulate some work
     time.sleep(1)
-    
-    # Release the lock
-    global lock
-    lock = 0
+
+    # Release the lock, only if this process still holds it
+    compare_and_swap(id, 0)
     print(f"{name} released the lock.")
 
-# Create two threads simulating two processes
-thread1 = threading.Thread(target=process, args=("Process 1", 1))
-thread2 = threading.Thread(target=process, args=("Process 2", 2))
+if __name__ == "__main__":
+    # Create two threads simulating two processes
+    thread1 = threading.Thread(target=process, args=("Process 1", 1))
+    thread2 = threading.Thread(target=process, args=("Process 2", 2))
 
-# Start the threads
-thread1.start()
-thread2.start()
+    # Start the threads
+    thread1.start()
+    thread2.start()
 
-# Wait for both threads to finish
-thread1.join()
-thread2.join()
+    # Wait for both threads to finish
+    thread1.join()
+    thread2.join()
+    print("Both processes have completed.")
 
-print("Both processes have completed.")
+    # A fair lock built from the same atomic cell: waiters enter in arrival order
+    ticket_lock = TicketLock()
+    with ticket_lock:
+        print(f"TicketLock held: {ticket_lock.locked()}")
@@ -0,0 +1,300 @@
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from collections import deque
+from dataclasses import dataclass, field
+import itertools
+import threading
+
+# Lock modes, weakest first
+IS, IX, S, SIX, X = "IS", "IX", "S", "SIX", "X"
+MODES = (IS, IX, S, SIX, X)
+
+# Which held modes (rows) a newly requested mode (columns) can be granted next to
+COMPATIBLE = {
+    IS: {IS: True, IX: True, S: True, SIX: True, X: False},
+    IX: {IS: True, IX: True, S: False, SIX: False, X: False},
+    S: {IS: True, IX: False, S: True, SIX: False, X: False},
+    SIX: {IS: True, IX: False, S: False, SIX: False, X: False},
+    X: {IS: False, IX: False, S: False, SIX: False, X: False},
+}
+
+# The weakest mode that covers both (the least upper bound), for lock upgrades
+SUPREMUM = {
+    (IS, IS): IS, (IS, IX): IX, (IS, S): S, (IS, SIX): SIX, (IS, X): X,
+    (IX, IX): IX, (IX, S): SIX, (IX, SIX): SIX, (IX, X): X,
+    (S, S): S, (S, SIX): SIX, (S, X): X,
+    (SIX, SIX): SIX, (SIX, X): X,
+    (X, X): X,
+}
+SUPREMUM.update({(b, a): mode for (a, b), mode in list(SUPREMUM.items())})
+
+# The mode a transaction needs on every ancestor of a resource it locks
+INTENTION = {IS: IS, S: IS, IX: IX, SIX: IX, X: IX}
+
+Resource = Tuple[Hashable, ...]  # A path from the root, e.g. ("shared_resource", "row_7")
+
+class LockError(Exception):
+    """A lock request that cannot be granted."""
+
+class DeadlockError(LockError):
+    """The transaction was chosen as the victim of a deadlock and must abort."""
+
+class LockTimeoutError(LockError):
+    """The transaction waited longer than its timeout."""
+
+@dataclass
+class LockRequest:
+    transaction_id: Hashable
+    mode: str
+
+@dataclass
+class ResourceLock:
+    granted: Dict[Hashable, str] = field(default_factory=dict)  # Mode held by each transaction
+    waiting: deque = field(default_factory=deque)  # LockRequests, in arrival order
+
+    def compatible(self, transaction_id: Hashable, mode: str) -> bool:
+        return all(COMPATIBLE[held][mode] for holder, held in self.granted.items() if holder != transaction_id)
+
+@dataclass
+class TransactionLocks:
+    start: int  # Start order; the youngest transaction in a cycle is the victim
+    held: Set[Resource] = field(default_factory=set)
+    waiting_for: Optional[Resource] = None
+    aborted: bool = False
+    wakeup: Optional[threading.Condition] = None
+
+@dataclass
+class LockStats:
+    granted: int = 0
+    waits: int = 0
+    deadlocks: int = 0
+    timeouts: int = 0
+
+class LockManager:
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Multi-granularity locking with strict two-phase locking and
+        deadlock detection.
+
+        Resources form a hierarchy of paths, e.g. ``("shared_resource",)``
+        for the whole table and ``("shared_resource", "row_7")`` for one
+        row. Locking a resource first takes the matching intention lock (IS
+        for reads, IX for writes) on each of its ancestors, so a transaction
+        that locks the whole table in S or X conflicts with row writers or
+        readers without any per-row check. Requests are queued per resource
+        and granted in arrival order; a transaction that already holds a
+        resource is upgraded to the least mode covering both.
+
+        Locks are only released all at once by ``release_all`` at commit or
+        abort (strict 2PL). Whenever a request has to wait, the waits-for
+        graph is searched for a cycle through the waiting transaction; if
+        one exists, its youngest member is aborted and raises
+        ``DeadlockError`` from its pending or next ``acquire``.
+
+        Args:
+            timeout (Optional[float]): Seconds a request may wait before
+                ``LockTimeoutError``; no limit by default.
+        """
+        self.timeout = timeout
+        self._mutex = threading.Lock()
+        self._locks: Dict[Resource, ResourceLock] = {}
+        self._transactions: Dict[Hashable, TransactionLocks] = {}
+        self._start_order = itertools.count()
+        self.stats = LockStats()
+
+    def begin(self, transaction_id: Hashable) -> None:
+        """Register a transaction. ``acquire`` does it implicitly on first use."""
+        with self._mutex:
+            self._transaction(transaction_id)
+
+    def _transaction(self, transaction_id: Hashable) -> TransactionLocks:
+        state = self._transactions.get(transaction_id)
+        if state is None:
+            state = self._transactions[transaction_id] = TransactionLocks(next(self._start_order))
+            state.wakeup = threading.Condition(self._mutex)
+        return state
+
+    def acquire(self, transaction_id: Hashable, resource: Resource, mode: str) -> None:
+        """
+        Lock ``resource`` in ``mode``, with intention locks on its ancestors,
+        blocking until granted.
+
+        Raises:
+            DeadlockError: If the transaction was chosen as a deadlock victim.
+            LockTimeoutError: If the wait exceeded the manager's timeout.
+        """
+        if mode not in COMPATIBLE:
+            raise ValueError(f"Invalid lock mode {mode!r}. Use one of {MODES}.")
+        resource = tuple(resource)
+        for depth in range(1, len(resource)):
+            self._acquire_one(transaction_id, resource[:depth], INTENTION[mode])
+        self._acquire_one(transaction_id, resource, mode)
+
+    def lock_shared(self, transaction_id: Hashable, *resource: Hashable) -> None:
+        self.acquire(transaction_id, resource, S)
+
+    def lock_exclusive(self, transaction_id: Hashable, *resource: Hashable) -> None:
+        self.acquire(transaction_id, resource, X)
+
+    def _acquire_one(self, transaction_id: Hashable, resource: Resource, mode: str) -> None:
+        with self._mutex:
+            state = self._transaction(transaction_id)
+            if state.aborted:
+                raise DeadlockError(f"Transaction {transaction_id} was aborted to break a deadlock.")
+            lock = self._locks.setdefault(resource, ResourceLock())
+            held = lock.granted.get(transaction_id)
+            if held is not None:
+                mode = SUPREMUM[held, mode]
+                if mode == held:
+                    return
+            # Upgrades jump the queue: the holder already blocks every waiter behind it
+            if lock.compatible(transaction_id, mode) and (held is not None or not lock.waiting):
+                self._grant(lock, state, transaction_id, resource, mode)
+                return
+
+            request = LockRequest(transaction_id, mode)
+            if held is not None:
+                lock.waiting.appendleft(request)
+            else:
+                lock.waiting.append(request)
+            state.waiting_for = resource
+            self.stats.waits += 1
+            try:
+                self._detect_deadlock(transaction_id)
+                while lock.granted.get(transaction_id) != mode:
+                    if state.aborted:
+                        raise DeadlockError(f"Transaction {transaction_id} was aborted to break a deadlock.")
+                    if not state.wakeup.wait(self.timeout):
+                        self.stats.timeouts += 1
+                        raise LockTimeoutError(f"Transaction {transaction_id} timed out waiting for {resource}.")
+            except BaseException:
+                if request in lock.waiting:
+                    lock.waiting.remove(request)
+                    self._grant_waiters(resource, lock)
+                    if not lock.granted and not lock.waiting:
+                        del self._locks[resource]
+                raise
+            finally:
+                state.waiting_for = None
+
+    def _grant(self, lock: ResourceLock, state: TransactionLocks, transaction_id: Hashable, resource: Resource,
+               mode: str) -> None:
+        lock.granted[transaction_id] = mode
+        state.held.add(resource)
+        self.stats.granted += 1
+
+    def _grant_waiters(self, resource: Resource, lock: ResourceLock) -> None:
+        """Grant queued requests in order until one conflicts."""
+        while lock.waiting:
+            request = lock.waiting[0]
+            if not lock.compatible(request.transaction_id, request.mode):
+                return
+            lock.waiting.popleft()
+            state = self._transactions[request.transaction_id]
+            self._grant(lock, state, request.transaction_id, resource, request.mode)
+            state.waiting_for = None
+            state.wakeup.notify()
+
+    def release_all(self, transaction_id: Hashable) -> None:
+        """Release every lock of ``transaction_id``, at commit or abort, and forget it."""
+        with self._mutex:
+            state = self._transactions.get(transaction_id)
+            if state is None:
+                return
+            # Children before parents, so no intention lock goes before the lock below it
+            for resource in sorted(state.held, key=len, reverse=True):
+                lock = self._locks[resource]
+                del lock.granted[transaction_id]
+                self._grant_waiters(resource, lock)
+                if not lock.granted and not lock.waiting:
+                    del self._locks[resource]
+            del self._transactions[transaction_id]
+
+    # Deadlock detection
+
+    def waits_for(self) -> Dict[Hashable, Set[Hashable]]:
+        """The waits-for graph: each waiting transaction and the transactions it waits on."""
+        with self._mutex:
+            return self._waits_for_graph()
+
+    def _blockers(self, transaction_id: Hashable) -> Set[Hashable]:
+        resource = self._transactions[transaction_id].waiting_for
+        if resource is None:
+            return set()
+        lock = self._locks[resource]
+        mode = next((request.mode for request in lock.waiting if request.transaction_id == transaction_id), None)
+        if mode is None:
+            return set()  # Granted, but not yet awake
+        blockers = {holder for holder, held in lock.granted.items()
+                    if holder != transaction_id and not COMPATIBLE[held][mode]}
+        # A waiter also waits on the incompatible requests queued ahead of it
+        for request in lock.waiting:
+            if request.transaction_id == transaction_id:
+                break
+            if not COMPATIBLE[request.mode][mode]:
+                blockers.add(request.transaction_id)
+        return blockers
+
+    def _waits_for_graph(self) -> Dict[Hashable, Set[Hashable]]:
+        return {transaction_id: self._blockers(transaction_id)
+                for transaction_id, state in self._transactions.items() if state.waiting_for is not None}
+
+    def _detect_deadlock(self, transaction_id: Hashable) -> None:
+        """
+        Break every cycle through ``transaction_id``: abort the youngest
+        member of one, and search again until none is left or the waiting
+        transaction itself was chosen.
+        """
+        while not self._transactions[transaction_id].aborted:
+            cycle = self._find_cycle(transaction_id)
+            if cycle is None:
+                return
+            victim = max(cycle, key=lambda member: self._transactions[member].start)
+            self._transactions[victim].aborted = True
+            self._transactions[victim].wakeup.notify()
+            self.stats.deadlocks += 1
+
+    def _find_cycle(self, transaction_id: Hashable) -> Optional[List[Hashable]]:
+        """A cycle of the waits-for graph through ``transaction_id``, ignoring aborted transactions."""
+        path: List[Hashable] = []
+        visited: Set[Hashable] = set()
+
+        def search(node: Hashable) -> Optional[List[Hashable]]:
+            path.append(node)
+            visited.add(node)
+            for blocker in self._blockers(node):
+                if blocker == transaction_id:
+                    return list(path)
+                if blocker not in visited and not self._transactions[blocker].aborted:
+                    cycle = search(blocker)
+                    if cycle is not None:
+                        return cycle
+            path.pop()
+            return None
+
+        return search(transaction_id)
+
+if __name__ == "__main__":
+    import time
+
+    manager = LockManager()
+
+    def transfer(transaction_id: str, first: str, second: str, log: List[str]) -> None:
+        try:
+            manager.lock_exclusive(transaction_id, "accounts", first)
+            time.sleep(0.05)
+            manager.lock_exclusive(transaction_id, "accounts", second)
+            log.append(f"{transaction_id} committed")
+        except DeadlockError as error:
+            log.append(f"{transaction_id} aborted: {error}")
+        finally:
+            manager.release_all(transaction_id)
+
+    log: List[str] = []
+    threads = [threading.Thread(target=transfer, args=("T1", "a", "b", log)),
+               threading.Thread(target=transfer, args=("T2", "b", "a", log))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print("\n".join(log))
+    print(f"Lock manager stats: {manager.stats}")
@@ -0,0 +1,304 @@
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+import random
+import threading
+import time
+import numpy as np
+
+MIN_BACKOFF = 1e-6  # First pause of a backed-off spinner, in seconds
+MAX_BACKOFF = 1e-3  # Longest pause between two attempts, in seconds
+TICKET_BACKOFF = 2e-6  # Pause per waiter ahead of a ticket lock spinner, in seconds
+
+class AtomicCell:
+    """
+    An integer with atomic read-modify-write operations.
+
+    Python exposes no hardware test-and-set or compare-and-swap, so every
+    operation runs under a private ``threading.Lock`` held for a handful of
+    bytecodes; the operations are what the lock classes below are built
+    from, in the way real ones are built from the CPU instructions.
+    """
+    __slots__ = ('_value', '_guard')
+
+    def __init__(self, value: int = 0):
+        self._value = value
+        self._guard = threading.Lock()
+
+    def load(self) -> int:
+        return self._value  # A single attribute read is atomic under the GIL
+
+    def store(self, value: int) -> None:
+        with self._guard:
+            self._value = value
+
+    def test_and_set(self, value: int = 1) -> int:
+        """Write ``value`` and return what the cell held before."""
+        with self._guard:
+            old_value = self._value
+            self._value = value
+            return old_value
+
+    def compare_and_swap(self, expected: int, new_value: int) -> bool:
+        """Write ``new_value`` if the cell holds ``expected``. Returns whether it did."""
+        with self._guard:
+            if self._value != expected:
+                return False
+            self._value = new_value
+            return True
+
+    def fetch_add(self, delta: int = 1) -> int:
+        """Add ``delta`` and return the value before the addition."""
+        with self._guard:
+            old_value = self._value
+            self._value += delta
+            return old_value
+
+class BaseLock(ABC):
+    """
+    A mutual-exclusion lock usable as a context manager.
+
+    Subclasses implement ``acquire``, ``release`` and ``locked``.
+    """
+
+    @abstractmethod
+    def acquire(self) -> None:
+        """Block until the calling thread holds the lock."""
+
+    @abstractmethod
+    def release(self) -> None:
+        """Release the lock, which the calling thread holds."""
+
+    @abstractmethod
+    def locked(self) -> bool:
+        """Whether some thread holds the lock."""
+
+    def __enter__(self) -> 'BaseLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+class BackoffSpinLock(BaseLock):
+    def __init__(self, min_backoff: float = MIN_BACKOFF, max_backoff: float = MAX_BACKOFF):
+        """
+        A test-and-test-and-set spinlock with randomised exponential backoff.
+
+        A waiter only attempts the atomic test-and-set when a plain read
+        shows the lock free, and after every failed attempt sleeps a random
+        time below a bound that doubles up to ``max_backoff``. Sleeping
+        releases the CPU (and the GIL) to the holder instead of burning it,
+        and the random pauses spread out retries after a release. Not fair:
+        a newcomer can overtake a thread that has waited longer.
+
+        Args:
+            min_backoff (float): Bound on the first pause, in seconds.
+            max_backoff (float): Largest bound on a pause, in seconds.
+        """
+        self.cell = AtomicCell(0)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+    def try_acquire(self) -> bool:
+        return self.cell.load() == 0 and self.cell.test_and_set(1) == 0
+
+    def acquire(self) -> None:
+        backoff = self.min_backoff
+        while not self.try_acquire():
+            time.sleep(random.uniform(0.0, backoff))
+            backoff = min(2 * backoff, self.max_backoff)
+
+    def release(self) -> None:
+        self.cell.store(0)
+
+    def locked(self) -> bool:
+        return self.cell.load() == 1
+
+class TicketLock(BaseLock):
+    def __init__(self, backoff_per_waiter: float = TICKET_BACKOFF):
+        """
+        A FIFO spinlock: every waiter draws a ticket with fetch-and-add and
+        enters when ``now_serving`` reaches it.
+
+        Waiters back off in proportion to the number of tickets ahead of
+        theirs, so the ones far back in line poll rarely, and the lock is
+        granted strictly in arrival order.
+
+        Args:
+            backoff_per_waiter (float): Pause per waiter ahead, in seconds.
+        """
+        self.next_ticket = AtomicCell(0)
+        self.now_serving = AtomicCell(0)
+        self.backoff_per_waiter = backoff_per_waiter
+
+    def acquire(self) -> None:
+        ticket = self.next_ticket.fetch_add(1)
+        while True:
+            ahead = ticket - self.now_serving.load()
+            if ahead == 0:
+                return
+            time.sleep(ahead * self.backoff_per_waiter)
+
+    def release(self) -> None:
+        self.now_serving.fetch_add(1)
+
+    def locked(self) -> bool:
+        return self.next_ticket.load() != self.now_serving.load()
+
+class QueueLock(BaseLock):
+    """
+    A FIFO lock that parks its waiters, in the spirit of the MCS queue lock.
+
+    A thread that finds the lock taken enqueues a private event and blocks
+    on it without polling; ``release`` hands the lock directly to the
+    oldest waiter by setting its event, so a waiter is woken exactly once
+    and never races newcomers for the lock.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()  # Protects the holder flag and the queue, never held while waiting
+        self._held = False
+        self._waiters: Deque[threading.Event] = deque()
+
+    def acquire(self) -> None:
+        with self._guard:
+            if not self._held:
+                self._held = True
+                return
+            parked = threading.Event()
+            self._waiters.append(parked)
+        parked.wait()  # Ownership is transferred by release before the event is set
+
+    def release(self) -> None:
+        with self._guard:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._held = False
+
+    def locked(self) -> bool:
+        return self._held
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._waiters)
+
+class ThreadingLock(BaseLock):
+    """``threading.Lock`` behind the same interface, as a baseline."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        self._lock.acquire()
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+LOCK_TYPES: Dict[str, Callable[[], BaseLock]] = {
+    "backoff_spin": BackoffSpinLock,
+    "ticket": TicketLock,
+    "queue": QueueLock,
+    "threading": ThreadingLock,
+}
+
+@dataclass
+class ContentionResult:
+    lock: str
+    threads: int
+    acquisitions: int
+    seconds: float
+    p50_wait: float  # Seconds from calling acquire to holding the lock
+    p99_wait: float
+    max_wait: float
+
+    @property
+    def throughput(self) -> float:
+        return self.acquisitions / self.seconds if self.seconds else 0.0
+
+def measure_contention(lock: BaseLock, num_threads: int, acquisitions_per_thread: int,
+                       hold_time: float = 0.0) -> ContentionResult:
+    """
+    Have ``num_threads`` threads repeatedly take ``lock`` to increment a
+    shared counter, and time every acquisition.
+
+    Args:
+        lock (BaseLock): The lock under test.
+        num_threads (int): Competing threads.
+        acquisitions_per_thread (int): Critical sections entered per thread.
+        hold_time (float): Seconds spent inside each critical section.
+
+    Returns:
+        ContentionResult: Throughput and acquisition latency percentiles.
+
+    Raises:
+        RuntimeError: If the lock let two threads in at once (the counter lost updates).
+    """
+    counter = [0]
+    waits: List[List[float]] = [[] for _ in range(num_threads)]
+    start_barrier = threading.Barrier(num_threads + 1)
+
+    def worker(thread_waits: List[float]) -> None:
+        start_barrier.wait()
+        for _ in range(acquisitions_per_thread):
+            requested = time.perf_counter()
+            lock.acquire()
+            thread_waits.append(time.perf_counter() - requested)
+            value = counter[0]
+            if hold_time:
+                time.sleep(hold_time)
+            counter[0] = value + 1
+            lock.release()
+
+    threads = [threading.Thread(target=worker, args=(waits[i],)) for i in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start_time
+
+    total = num_threads * acquisitions_per_thread
+    if counter[0] != total:
+        raise RuntimeError(f"Lost updates: counter is {counter[0]}, expected {total}.")
+    all_waits = np.concatenate([np.asarray(thread_waits) for thread_waits in waits])
+    p50, p99 = np.percentile(all_waits, [50, 99])
+    return ContentionResult(type(lock).__name__, num_threads, total, seconds, float(p50), float(p99),
+                            float(all_waits.max()))
+
+def benchmark_locks(thread_counts: Sequence[int] = (2, 4, 8, 16, 32, 64), acquisitions: int = 20000,
+                    lock_types: Optional[Sequence[str]] = None,
+                    hold_time: float = 0.0) -> Dict[str, List[ContentionResult]]:
+    """
+    Run ``measure_contention`` for every lock type and thread count.
+
+    Args:
+        thread_counts (Sequence[int]): Thread counts to test.
+        acquisitions (int): Total critical sections per run, split over the threads.
+        lock_types (Optional[Sequence[str]]): Keys of ``LOCK_TYPES``; all by default.
+        hold_time (float): Seconds spent inside each critical section.
+
+    Returns:
+        Dict[str, List[ContentionResult]]: Results per lock type, by thread count.
+    """
+    results = {}
+    for name in lock_types or LOCK_TYPES:
+        results[name] = [measure_contention(LOCK_TYPES[name](), num_threads, max(1, acquisitions // num_threads),
+                                            hold_time)
+                         for num_threads in thread_counts]
+    return results
+
+if __name__ == "__main__":
+    # Sleeping inside the critical section releases the GIL, so the threads really contend
+    for name, runs in benchmark_locks(acquisitions=2000, hold_time=1e-5).items():
+        print(f"{name}:")
+        for result in runs:
+            print(f"  {result.threads:>2} threads: {result.throughput:>9.0f} acquisitions/s, "
+                  f"wait p50 {result.p50_wait * 1e6:>7.1f}us, p99 {result.p99_wait * 1e6:>8.1f}us, "
+                  f"max {result.max_wait * 1e3:>6.1f}ms")
@@ -0,0 +1,210 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from dataclasses import dataclass, field
+import math
+import threading
+
+GC_INTERVAL = 0.05  # Seconds between background garbage collection passes
+
+class WriteConflictError(Exception):
+    """A key in the write set was changed by a transaction that committed after this one's snapshot."""
+
+@dataclass
+class Version:
+    value: Any
+    begin: int  # Commit timestamp of the transaction that wrote it
+    end: float = math.inf  # Commit timestamp of the transaction that replaced it
+
+@dataclass
+class Snapshot:
+    transaction_id: Hashable
+    start: int  # Sees every version committed at or before this timestamp
+    writes: Dict[Hashable, Any] = field(default_factory=dict)  # Buffered until commit
+    commit: Optional[int] = None
+
+@dataclass
+class MVCCStats:
+    commits: int = 0
+    conflicts: int = 0
+    versions_created: int = 0
+    versions_collected: int = 0
+
+class MVCCStore:
+    def __init__(self, initial: Optional[Dict[Hashable, Any]] = None):
+        """
+        A multi-version key-value store with snapshot isolation.
+
+        Every committed write adds a version stamped with the commit
+        timestamp and closes the previous one. A transaction reads the
+        versions that were current at its start timestamp, plus its own
+        buffered writes, so readers never wait for writers and writers never
+        wait at all: conflicts are checked at commit, where the first
+        committer of a key wins and a later one whose snapshot predates that
+        commit gets ``WriteConflictError``. Snapshot isolation still admits
+        write skew between transactions that write disjoint keys.
+
+        Versions that no active snapshot can see any more are dropped by
+        ``collect_garbage``, which ``start_gc`` runs on a background thread.
+
+        Args:
+            initial (Optional[Dict[Hashable, Any]]): Values committed at timestamp 0.
+        """
+        self._versions: Dict[Hashable, List[Version]] = {key: [Version(value, 0)]
+                                                         for key, value in (initial or {}).items()}
+        self._mutex = threading.Lock()  # Serialises timestamps, commits and garbage collection
+        self.last_commit = 0  # Timestamp of the newest commit; the next one gets last_commit + 1
+        self._active: Dict[Hashable, Snapshot] = {}
+        self._gc_thread: Optional[threading.Thread] = None
+        self._gc_stop = threading.Event()
+        self.stats = MVCCStats()
+
+    def begin(self, transaction_id: Hashable) -> Snapshot:
+        with self._mutex:
+            snapshot = Snapshot(transaction_id, self.last_commit)
+            self._active[transaction_id] = snapshot
+            return snapshot
+
+    def read(self, snapshot: Snapshot, key: Hashable) -> Any:
+        """
+        The value of ``key`` in ``snapshot``: the transaction's own write, or
+        the version current at its start.
+
+        Raises:
+            KeyError: If the key did not exist at the snapshot.
+        """
+        if key in snapshot.writes:
+            return snapshot.writes[key]
+        # Commits only append and garbage collection swaps in a new list, so no lock is needed
+        for version in reversed(self._versions.get(key, ())):
+            if version.begin <= snapshot.start < version.end:
+                return version.value
+        raise KeyError(key)
+
+    def write(self, snapshot: Snapshot, key: Hashable, value: Any) -> None:
+        snapshot.writes[key] = value
+
+    def commit(self, snapshot: Snapshot, on_install: Optional[Callable[[Snapshot], None]] = None) -> int:
+        """
+        Validate and install the buffered writes.
+
+        Args:
+            snapshot (Snapshot): The committing transaction.
+            on_install (Optional[Callable[[Snapshot], None]]): Called once
+                validation passed, before the writes become visible, under
+                the commit mutex; a write-ahead log appends its records here
+                so they follow commit order. If it raises, nothing is
+                installed.
+
+        Returns:
+            int: The commit timestamp.
+
+        Raises:
+            WriteConflictError: If another transaction committed a write to
+                one of the keys after this snapshot was taken. The snapshot
+                is aborted.
+        """
+        with self._mutex:
+            self._active.pop(snapshot.transaction_id, None)
+            for key in snapshot.writes:
+                versions = self._versions.get(key)
+                if versions and versions[-1].begin > snapshot.start:
+                    self.stats.conflicts += 1
+                    raise WriteConflictError(f"Transaction {snapshot.transaction_id} lost the write of {key!r} "
+                                             f"to a commit at {versions[-1].begin}.")
+            if on_install is not None:
+                on_install(snapshot)
+            if not snapshot.writes:
+                return snapshot.start
+            commit = self.last_commit + 1
+            for key, value in snapshot.writes.items():
+                versions = self._versions.setdefault(key, [])
+                if versions:
+                    versions[-1].end = commit
+                versions.append(Version(value, commit))
+            self.last_commit = commit
+            snapshot.commit = commit
+            self.stats.commits += 1
+            self.stats.versions_created += len(snapshot.writes)
+            return commit
+
+    def abort(self, snapshot: Snapshot) -> None:
+        with self._mutex:
+            self._active.pop(snapshot.transaction_id, None)
+        snapshot.writes.clear()
+
+    def latest(self) -> Dict[Hashable, Any]:
+        """The newest committed value of every key."""
+        with self._mutex:
+            return {key: versions[-1].value for key, versions in self._versions.items() if versions}
+
+    def version_count(self) -> int:
+        return sum(len(versions) for versions in self._versions.values())
+
+    # Garbage collection
+
+    def oldest_active(self) -> int:
+        """The start of the oldest active snapshot, or the last commit if there is none."""
+        with self._mutex:
+            return min((snapshot.start for snapshot in self._active.values()), default=self.last_commit)
+
+    def collect_garbage(self) -> int:
+        """
+        Drop the versions replaced at or before the oldest active snapshot:
+        no current or future transaction can read them.
+
+        Returns:
+            int: The versions removed.
+        """
+        horizon = self.oldest_active()
+        removed = 0
+        for key in list(self._versions):
+            with self._mutex:
+                versions = self._versions[key]
+                keep = [version for version in versions if version.end > horizon]
+                if len(keep) < len(versions):
+                    removed += len(versions) - len(keep)
+                    # A new list, so readers scanning the old one are unaffected
+                    self._versions[key] = keep
+        self.stats.versions_collected += removed
+        return removed
+
+    def start_gc(self, interval: float = GC_INTERVAL) -> None:
+        """Run ``collect_garbage`` every ``interval`` seconds on a daemon thread."""
+        if self._gc_thread is not None:
+            return
+        self._gc_stop.clear()
+
+        def loop() -> None:
+            while not self._gc_stop.wait(interval):
+                self.collect_garbage()
+
+        self._gc_thread = threading.Thread(target=loop, name="mvcc-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc(self) -> None:
+        if self._gc_thread is not None:
+            self._gc_stop.set()
+            self._gc_thread.join()
+            self._gc_thread = None
+
+if __name__ == "__main__":
+    store = MVCCStore({"x": 0, "y": 0})
+    reader = store.begin("reader")
+    writer = store.begin("writer")
+    store.write(writer, "x", 1)
+    store.commit(writer)
+    late = store.begin("late")
+    print(f"Reader still sees x={store.read(reader, 'x')}; a new snapshot sees x={store.read(late, 'x')}")
+
+    first, second = store.begin("first"), store.begin("second")
+    store.write(first, "y", 1)
+    store.write(second, "y", 2)
+    store.commit(first)
+    try:
+        store.commit(second)
+    except WriteConflictError as error:
+        print(f"First committer wins: {error}")
+
+    store.abort(reader)
+    store.abort(late)
+    print(f"Versions before GC: {store.version_count()}, removed: {store.collect_garbage()}, "
+          f"after: {store.version_count()}")
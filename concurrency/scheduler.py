@@ -0,0 +1,200 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Sequence, Set
+from collections import deque
+from dataclasses import dataclass
+import asyncio
+import numpy as np
+
+DEFAULT_MAX_CONCURRENCY = 1000  # Jobs running at once
+DEFAULT_MAX_QUEUED = 10000  # Admitted-but-waiting jobs beyond which submit blocks
+
+Job = Callable[[], Awaitable[Any]]
+
+@dataclass
+class JobTiming:
+    client: Hashable
+    queued: float  # Seconds from submission to start
+    running: float  # Seconds from start to completion
+
+    @property
+    def total(self) -> float:
+        return self.queued + self.running
+
+@dataclass
+class SchedulerStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0  # Jobs that raised
+    backpressure_waits: int = 0  # Submissions that had to wait for queue space
+    max_queued: int = 0
+    max_running: int = 0
+
+@dataclass
+class _QueuedJob:
+    job: Job
+    client: Hashable
+    future: asyncio.Future
+    submitted: float
+
+class TransactionScheduler:
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, max_queued: int = DEFAULT_MAX_QUEUED):
+        """
+        Admission control for coroutine jobs such as asynchronous transactions.
+
+        At most ``max_concurrency`` jobs run at once. The others wait in one
+        FIFO queue per client, and a free slot goes to the clients in turn
+        (round robin), so a client that submits a burst cannot starve the
+        rest. Once ``max_queued`` jobs are waiting, ``submit`` itself blocks
+        until a job starts: the backpressure reaches the producers instead
+        of letting the queue, and every job's latency, grow without bound.
+        Blocked submitters are let in in arrival order: a freed place is
+        reserved for the submitter it wakes, and new submitters queue
+        behind those already waiting.
+
+        The timing of every finished job (queueing and running time) is kept
+        in ``timings``. A scheduler belongs to the event loop it is first
+        used on.
+
+        Args:
+            max_concurrency (int): Jobs running at once.
+            max_queued (int): Waiting jobs beyond which ``submit`` blocks.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self._queues: Dict[Hashable, Deque[_QueuedJob]] = {}
+        self._turns: Deque[Hashable] = deque()  # Clients with waiting jobs, next to be served first
+        self._space_waiters: Deque[asyncio.Future] = deque()  # Submitters blocked by backpressure
+        self._reserved = 0  # Queue places handed to woken submitters that have not queued yet
+        self._tasks: Set[asyncio.Task] = set()
+        self._idle: Optional[asyncio.Event] = None
+        self.queued = 0
+        self.running = 0
+        self.timings: List[JobTiming] = []
+        self.stats = SchedulerStats()
+
+    async def submit(self, job: Job, client: Hashable = None) -> asyncio.Future:
+        """
+        Queue ``job`` for ``client``, waiting first while the queue is full.
+
+        Returns:
+            asyncio.Future: Resolves to the job's result, or its exception.
+        """
+        loop = asyncio.get_running_loop()
+        if self._space_waiters or self.queued + self._reserved >= self.max_queued:
+            self.stats.backpressure_waits += 1
+            waiter = loop.create_future()
+            self._space_waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.cancelled():
+                    self._space_waiters.remove(waiter)
+                else:
+                    # Woken, then cancelled before queueing: pass the place on
+                    self._reserved -= 1
+                    self._release_space()
+                raise
+            self._reserved -= 1
+        queued_job = _QueuedJob(job, client, loop.create_future(), loop.time())
+        queue = self._queues.get(client)
+        if queue is None:
+            queue = self._queues[client] = deque()
+            self._turns.append(client)
+        queue.append(queued_job)
+        self.queued += 1
+        self.stats.submitted += 1
+        self.stats.max_queued = max(self.stats.max_queued, self.queued)
+        self._idle_event().clear()
+        self._dispatch()
+        return queued_job.future
+
+    async def run(self, job: Job, client: Hashable = None) -> Any:
+        """Submit ``job`` and wait for its result."""
+        return await (await self.submit(job, client))
+
+    async def join(self) -> None:
+        """Wait until no job is queued or running."""
+        await self._idle_event().wait()
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    def _dispatch(self) -> None:
+        """Start waiting jobs, one client at a time, while there are free slots."""
+        while self.running < self.max_concurrency and self._turns:
+            client = self._turns.popleft()
+            queue = self._queues[client]
+            queued_job = queue.popleft()
+            if queue:
+                self._turns.append(client)
+            else:
+                del self._queues[client]
+            self.queued -= 1
+            self.running += 1
+            self.stats.max_running = max(self.stats.max_running, self.running)
+            self._release_space()
+            task = asyncio.ensure_future(self._execute(queued_job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _release_space(self) -> None:
+        """Wake the longest-waiting submitters, reserving a queue place for each."""
+        while self._space_waiters and self.queued + self._reserved < self.max_queued:
+            waiter = self._space_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._reserved += 1
+
+    async def _execute(self, queued_job: _QueuedJob) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            result = await queued_job.job()
+        except Exception as error:
+            self.stats.failed += 1
+            queued_job.future.set_exception(error)
+        else:
+            queued_job.future.set_result(result)
+        finally:
+            self.running -= 1
+            self.stats.completed += 1
+            self.timings.append(JobTiming(queued_job.client, started - queued_job.submitted, loop.time() - started))
+            self._dispatch()
+            if not self.running and not self.queued:
+                self._idle_event().set()
+
+    def latency_percentiles(self, percentiles: Sequence[float] = (50, 99), kind: str = 'total') -> List[float]:
+        """
+        Percentiles of the finished jobs' latencies, in seconds.
+
+        Args:
+            percentiles (Sequence[float]): Which percentiles.
+            kind (str): 'queued', 'running' or 'total'.
+        """
+        if not self.timings:
+            return [0.0 for _ in percentiles]
+        latencies = [getattr(timing, kind) for timing in self.timings]
+        return [float(value) for value in np.percentile(latencies, percentiles)]
+
+if __name__ == "__main__":
+    async def demo() -> None:
+        scheduler = TransactionScheduler(max_concurrency=4, max_queued=50)
+
+        async def job() -> None:
+            await asyncio.sleep(0.01)
+
+        async def client(name: str, jobs: int) -> None:
+            for _ in range(jobs):
+                await scheduler.submit(job, client=name)
+
+        # A bursty client and a light one share four slots
+        await asyncio.gather(client("bursty", 200), client("light", 10))
+        await scheduler.join()
+        for name in ("bursty", "light"):
+            finished = [timing.total for timing in scheduler.timings if timing.client == name]
+            print(f"{name}: {len(finished)} jobs, mean latency {sum(finished) / len(finished) * 1e3:.0f}ms")
+        print(f"Scheduler stats: {scheduler.stats}")
+
+    asyncio.run(demo())
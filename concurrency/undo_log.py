@@ -0,0 +1,109 @@
+from typing import Any, Callable, Dict, Hashable, List
+from dataclasses import dataclass
+
+@dataclass
+class UndoRecord:
+    key: Hashable
+    before: Any
+    after: Any
+    first: bool  # The transaction's first write of the key: before is the value it started from
+
+class UndoLog:
+    def __init__(self):
+        """
+        The changes of one transaction, newest last, with named savepoints.
+
+        Every write is recorded with its before image. A savepoint remembers
+        the length of the log; rolling back to it undoes, newest first, only
+        the changes made since, so the cost of a rollback is proportional
+        to the work it throws away. Rolling back to a savepoint keeps it,
+        and forgets the savepoints set after it, as in SQL.
+        """
+        self.records: List[UndoRecord] = []
+        self.savepoints: Dict[str, int] = {}  # Name to log length, in the order they were set
+        self._writes: Dict[Hashable, int] = {}  # Records still in the log, per key
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(self, key: Hashable, before: Any, after: Any) -> UndoRecord:
+        record = UndoRecord(key, before, after, first=not self._writes.get(key))
+        self.records.append(record)
+        self._writes[key] = self._writes.get(key, 0) + 1
+        return record
+
+    def savepoint(self, name: str) -> None:
+        """Set ``name`` at the current end of the log, moving it if it exists."""
+        self.savepoints.pop(name, None)
+        self.savepoints[name] = len(self.records)
+
+    def release(self, name: str) -> None:
+        """Forget ``name`` and the savepoints set after it. Their changes stay in the log."""
+        self._truncate_savepoints(name, keep=False)
+
+    def rollback_to(self, name: str, undo: Callable[[UndoRecord], None]) -> int:
+        """
+        Undo the changes made since savepoint ``name``.
+
+        Args:
+            name (str): The savepoint.
+            undo (Callable[[UndoRecord], None]): Restores one change; called newest first.
+
+        Returns:
+            int: The changes undone.
+
+        Raises:
+            KeyError: If there is no savepoint ``name``.
+        """
+        if name not in self.savepoints:
+            raise KeyError(f"No savepoint {name!r}.")
+        undone = self._undo_until(self.savepoints[name], undo)
+        self._truncate_savepoints(name, keep=True)
+        return undone
+
+    def rollback_all(self, undo: Callable[[UndoRecord], None]) -> int:
+        """Undo every change, newest first, and forget all savepoints. Returns the changes undone."""
+        undone = self._undo_until(0, undo)
+        self.savepoints.clear()
+        return undone
+
+    def first_before_images(self) -> Dict[Hashable, Any]:
+        """The value each written key had before the transaction first wrote it."""
+        return {record.key: record.before for record in self.records if record.first}
+
+    def _undo_until(self, length: int, undo: Callable[[UndoRecord], None]) -> int:
+        undone = 0
+        while len(self.records) > length:
+            record = self.records.pop()
+            undo(record)
+            self._writes[record.key] -= 1
+            if not self._writes[record.key]:
+                del self._writes[record.key]
+            undone += 1
+        return undone
+
+    def _truncate_savepoints(self, name: str, keep: bool) -> None:
+        names = list(self.savepoints)
+        if name not in self.savepoints:
+            raise KeyError(f"No savepoint {name!r}.")
+        for later in names[names.index(name) + (1 if keep else 0):]:
+            del self.savepoints[later]
+
+if __name__ == "__main__":
+    rows = {"a": 0, "b": 0}
+    log = UndoLog()
+
+    def write(key: str, value: int) -> None:
+        log.record(key, rows[key], value)
+        rows[key] = value
+
+    def undo(record: UndoRecord) -> None:
+        rows[record.key] = record.before
+
+    write("a", 1)
+    log.savepoint("second")
+    write("b", 1)
+    write("a", 2)
+    print(f"Before rollback: {rows}, {len(log)} changes")
+    print(f"Rolled back {log.rollback_to('second', undo)} changes to 'second': {rows}")
+    print(f"Rolled back {log.rollback_all(undo)} more: {rows}")
@@ -0,0 +1,467 @@
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import asyncio
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+import numpy as np
+
+RECORD_HEADER = struct.Struct("<IIQB")  # Payload length, CRC-32 of everything after it, LSN, record kind
+NAME_LENGTH = struct.Struct("<H")  # Prefix of the transaction id and of the key
+IMAGES = struct.Struct("<qq")  # Before and after image of an update
+BEGIN, UPDATE, COMMIT, ABORT = 1, 2, 3, 4
+KIND_NAMES = {BEGIN: "begin", UPDATE: "update", COMMIT: "commit", ABORT: "abort"}
+DEFAULT_MAX_WAIT = 0.002  # Seconds the flusher waits for more commits to join a batch
+DEFAULT_MAX_BATCH = 64  # Waiting commits that make the flusher write at once
+QUIET_SHARE = 0.125  # Share of max_wait without a new commit that closes a batch early
+
+class WALError(Exception):
+    """The log could not be written; transactions waiting on it cannot be acknowledged."""
+
+@dataclass
+class LogRecord:
+    lsn: int
+    kind: int
+    transaction_id: str
+    key: Optional[str] = None
+    before: Optional[int] = None
+    after: Optional[int] = None
+
+    def __str__(self) -> str:
+        text = f"{self.lsn}: {KIND_NAMES[self.kind]} {self.transaction_id}"
+        if self.kind == UPDATE:
+            text += f" {self.key} {self.before} -> {self.after}"
+        return text
+
+@dataclass
+class WALStats:
+    records: int = 0
+    bytes: int = 0
+    fsyncs: int = 0
+    commits: int = 0
+    commit_latencies: List[float] = field(default_factory=list)  # Seconds from commit record to durable
+
+    @property
+    def commits_per_fsync(self) -> float:
+        return self.commits / self.fsyncs if self.fsyncs else 0.0
+
+    def latency_percentiles(self, percentiles: Sequence[float] = (50, 99)) -> List[float]:
+        if not self.commit_latencies:
+            return [0.0 for _ in percentiles]
+        return [float(value) for value in np.percentile(self.commit_latencies, percentiles)]
+
+def encode_record(record: LogRecord) -> bytes:
+    transaction_id = record.transaction_id.encode()
+    payload = NAME_LENGTH.pack(len(transaction_id)) + transaction_id
+    if record.kind == UPDATE:
+        key = record.key.encode()
+        payload += NAME_LENGTH.pack(len(key)) + key + IMAGES.pack(record.before, record.after)
+    tail = RECORD_HEADER.pack(len(payload), 0, record.lsn, record.kind)[8:] + payload
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(tail), record.lsn, record.kind)[:8] + tail
+
+def scan_log(path: str) -> Tuple[List[LogRecord], int]:
+    """
+    Decode the records of the log at ``path``.
+
+    Decoding stops at the first record that is cut short or fails its
+    checksum: that is the torn tail of a write the crash interrupted, and
+    nothing after it was acknowledged.
+
+    Returns:
+        Tuple[List[LogRecord], int]: The valid records, and the byte length they span.
+    """
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, "rb") as log_file:
+        data = log_file.read()
+    records = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum, lsn, kind = RECORD_HEADER.unpack_from(data, offset)
+        end = offset + RECORD_HEADER.size + length
+        if end > len(data) or zlib.crc32(data[offset + 8:end]) != checksum or kind not in KIND_NAMES:
+            break
+        position = offset + RECORD_HEADER.size
+        (id_length,) = NAME_LENGTH.unpack_from(data, position)
+        position += NAME_LENGTH.size
+        record = LogRecord(lsn, kind, data[position:position + id_length].decode())
+        position += id_length
+        if kind == UPDATE:
+            (key_length,) = NAME_LENGTH.unpack_from(data, position)
+            position += NAME_LENGTH.size
+            record.key = data[position:position + key_length].decode()
+            record.before, record.after = IMAGES.unpack_from(data, position + key_length)
+        records.append(record)
+        offset = end
+    return records, offset
+
+def read_log(path: str) -> Iterator[LogRecord]:
+    return iter(scan_log(path)[0])
+
+def recover(path: str, initial: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """
+    Rebuild the state the log at ``path`` describes.
+
+    Starting from ``initial``, the after images of the committed
+    transactions are redone in log order. Updates of aborted transactions,
+    and of those the crash caught before their commit record was durable,
+    are skipped: their transactions were never acknowledged.
+
+    Args:
+        path (str): The log file.
+        initial (Optional[Dict[str, int]]): The state before the first record.
+
+    Returns:
+        Dict[str, int]: The recovered state.
+    """
+    records = scan_log(path)[0]
+    committed = {record.transaction_id for record in records if record.kind == COMMIT}
+    state = dict(initial or {})
+    for record in records:
+        if record.kind == UPDATE and record.transaction_id in committed:
+            state[record.key] = record.after
+    return state
+
+def _settle(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    if future.done():
+        return  # The waiting coroutine was cancelled
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+class WriteAheadLog:
+    def __init__(self, path: str, max_wait: float = DEFAULT_MAX_WAIT, max_batch: int = DEFAULT_MAX_BATCH,
+                 group_commit: bool = True):
+        """
+        An append-only log of binary transaction records, with group commit.
+
+        Records are appended to an in-memory buffer and stamped with
+        increasing log sequence numbers (LSNs). A transaction is durable
+        once the buffer up to its commit record has been written and
+        ``fsync``-ed. With ``group_commit``, committers do not flush
+        themselves: they wake a flusher thread and sleep until it reports
+        their LSN durable. The flusher waits up to ``max_wait`` for more
+        commits to arrive (or until ``max_batch`` are waiting, or none has
+        arrived for an eighth of ``max_wait``) and then
+        writes the whole buffer with one ``fsync``, so the cost of a flush
+        is shared by every transaction in the batch instead of capping
+        commits at the disk's flush rate. Like PostgreSQL's
+        ``commit_delay``, the wait only applies when the previous batch held
+        more than one commit; commits that arrive while a flush is running
+        form the next batch either way. Without ``group_commit``, every
+        commit writes and flushes the log itself.
+
+        Coroutines wait with ``durable_future`` instead of ``wait_durable``:
+        the flusher resolves their futures on their event loop, so a batch
+        is not capped by the threads available to block in ``wait_durable``.
+
+        An existing log is reopened for appending; a torn tail left by a
+        crash is cut off first.
+
+        Args:
+            path (str): The log file.
+            max_wait (float): Seconds a batch stays open for more commits.
+            max_batch (int): Waiting commits that close a batch early.
+            group_commit (bool): Flush on a shared background thread.
+        """
+        self.path = path
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.group_commit = group_commit
+        records, valid_length = scan_log(path)
+        self._file = open(path, "ab")
+        self._file.truncate(valid_length)
+        self._mutex = threading.Lock()
+        self._durable = threading.Condition(self._mutex)  # Notified when durable_lsn advances
+        self._pending = threading.Condition(self._mutex)  # Notified when a commit waits for the flusher
+        self._buffer = bytearray()
+        self.next_lsn = records[-1].lsn + 1 if records else 1
+        self.durable_lsn = self.next_lsn - 1
+        self._waiting_commits = 0
+        self._commit_times: Dict[int, float] = {}  # Append time of each commit record not yet acknowledged
+        self._async_waiters: List[Tuple[int, asyncio.AbstractEventLoop, asyncio.Future]] = []  # By durable_future
+        self._failure: Optional[BaseException] = None
+        self._closing = False
+        self.stats = WALStats()
+        self._flusher: Optional[threading.Thread] = None
+        if group_commit:
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    # Appending records
+
+    def _append(self, kind: int, transaction_id: Hashable, key: Optional[str] = None, before: Optional[int] = None,
+                after: Optional[int] = None) -> int:
+        if self._closing:
+            raise WALError("The log is closed.")
+        lsn = self.next_lsn
+        self.next_lsn += 1
+        encoded = encode_record(LogRecord(lsn, kind, str(transaction_id), key, before, after))
+        self._buffer += encoded
+        self.stats.records += 1
+        self.stats.bytes += len(encoded)
+        return lsn
+
+    def log_begin(self, transaction_id: Hashable) -> int:
+        with self._mutex:
+            return self._append(BEGIN, transaction_id)
+
+    def log_update(self, transaction_id: Hashable, key: str, before: int, after: int) -> int:
+        with self._mutex:
+            return self._append(UPDATE, transaction_id, key, before, after)
+
+    def log_abort(self, transaction_id: Hashable) -> int:
+        """Append an abort record. It needs no flush: recovery ignores the transaction either way."""
+        with self._mutex:
+            return self._append(ABORT, transaction_id)
+
+    def append_commit(self, transaction_id: Hashable) -> int:
+        """Append a commit record without waiting for it. Returns its LSN, for ``wait_durable``."""
+        with self._mutex:
+            lsn = self._append(COMMIT, transaction_id)
+            self._commit_times[lsn] = time.perf_counter()
+            return lsn
+
+    def log_commit(self, transaction_id: Hashable) -> int:
+        """Append a commit record and return its LSN once it is durable."""
+        lsn = self.append_commit(transaction_id)
+        self.wait_durable(lsn)
+        return lsn
+
+    def wait_durable(self, lsn: int) -> None:
+        """
+        Block until every record up to ``lsn`` is on disk.
+
+        Raises:
+            WALError: If writing the log failed.
+        """
+        with self._mutex:
+            if self.group_commit:
+                if self.durable_lsn < lsn:
+                    self._waiting_commits += 1
+                    self._pending.notify()
+                    while self.durable_lsn < lsn and self._failure is None:
+                        self._durable.wait()
+            elif self.durable_lsn < lsn and self._failure is None:
+                # One flush per commit, serialised with every other append
+                self._write(bytes(self._buffer), self.next_lsn - 1, 1)
+                self._buffer.clear()
+            if self.durable_lsn < lsn:
+                raise WALError(f"The log could not be written: {self._failure}")
+            self._acknowledge(lsn)
+
+    def durable_future(self, lsn: int) -> asyncio.Future:
+        """
+        A future of the running event loop that resolves once every record up
+        to ``lsn`` is on disk, for coroutines that must not block the loop.
+        It fails with ``WALError`` if writing the log failed.
+
+        Returns:
+            asyncio.Future: Resolved from the flusher thread.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._mutex:
+            if self.group_commit and self.durable_lsn < lsn and self._failure is None:
+                self._async_waiters.append((lsn, loop, future))
+                self._waiting_commits += 1
+                self._pending.notify()
+                return future
+            if self.durable_lsn < lsn and self._failure is None:
+                self._write(bytes(self._buffer), self.next_lsn - 1, 1)
+                self._buffer.clear()
+            if self.durable_lsn < lsn:
+                future.set_exception(WALError(f"The log could not be written: {self._failure}"))
+            else:
+                self._acknowledge(lsn)
+                future.set_result(None)
+        return future
+
+    def _acknowledge(self, lsn: int) -> None:
+        started = self._commit_times.pop(lsn, None)
+        if started is not None:
+            self.stats.commit_latencies.append(time.perf_counter() - started)
+
+    def _wake_async_waiters(self) -> None:
+        """Resolve, on their loops, the futures whose LSN is durable, or all of them after a failure."""
+        waiting = []
+        for lsn, loop, future in self._async_waiters:
+            if self.durable_lsn >= lsn:
+                self._acknowledge(lsn)
+                error = None
+            elif self._failure is not None:
+                error = WALError(f"The log could not be written: {self._failure}")
+            else:
+                waiting.append((lsn, loop, future))
+                continue
+            try:
+                loop.call_soon_threadsafe(_settle, future, error)
+            except RuntimeError:
+                pass  # The loop is closed: nobody is waiting any more
+        self._async_waiters = waiting
+
+    # Flushing
+
+    def _sync(self, data: bytes) -> None:
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _write(self, data: bytes, last_lsn: int, commits: int) -> None:
+        """Write and flush ``data`` while holding the mutex, and mark it durable."""
+        try:
+            self._sync(data)
+        except OSError as error:
+            self._failure = error
+            self._wake_async_waiters()
+            raise WALError(f"The log could not be written: {error}") from error
+        self._flushed(last_lsn, commits)
+
+    def _flushed(self, last_lsn: int, commits: int) -> None:
+        self.durable_lsn = last_lsn
+        self.stats.fsyncs += 1
+        self.stats.commits += commits
+        self._wake_async_waiters()
+
+    def _flush_loop(self) -> None:
+        last_batch = 0  # Commits acknowledged by the previous flush
+        with self._mutex:
+            while True:
+                while not self._waiting_commits and not self._closing:
+                    self._pending.wait()
+                if self._closing and not self._buffer:
+                    return
+                # Keep the batch open for the commits that arrive within max_wait, but only when the
+                # last batch showed concurrent committers: a lone one would just wait for nothing
+                deadline = time.monotonic() + self.max_wait
+                while last_batch > 1 and self._waiting_commits < self.max_batch and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    joined = self._waiting_commits
+                    self._pending.wait(min(remaining, self.max_wait * QUIET_SHARE))
+                    if self._waiting_commits == joined:
+                        break  # Nobody joined for a while: the other committers are busy elsewhere
+                data, last_lsn, commits = bytes(self._buffer), self.next_lsn - 1, self._waiting_commits
+                self._buffer.clear()
+                self._waiting_commits = 0
+                # Appends continue into the emptied buffer while the batch is written
+                self._mutex.release()
+                try:
+                    self._sync(data)
+                except OSError as error:
+                    failure = error
+                else:
+                    failure = None
+                finally:
+                    self._mutex.acquire()
+                if failure is not None:
+                    self._failure = failure
+                    self._durable.notify_all()
+                    self._wake_async_waiters()
+                    return
+                self._flushed(last_lsn, commits)
+                last_batch = commits
+                self._durable.notify_all()
+
+    def close(self) -> None:
+        """Flush what is left, stop the flusher and close the file."""
+        with self._mutex:
+            if self._closing:
+                return
+            self._closing = True
+            self._pending.notify()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._mutex:
+            if self._buffer and self._failure is None:
+                self._write(bytes(self._buffer), self.next_lsn - 1, 0)
+                self._buffer.clear()
+            self._file.close()
+
+    def __enter__(self) -> 'WriteAheadLog':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+@dataclass
+class CommitBenchmarkResult:
+    threads: int
+    commits: int
+    seconds: float
+    fsyncs: int
+    p50_latency: float  # Seconds from commit record to durable
+    p99_latency: float
+
+    @property
+    def throughput(self) -> float:
+        return self.commits / self.seconds if self.seconds else 0.0
+
+def benchmark_commits(thread_counts: Sequence[int] = (1, 2, 4, 8, 16, 32, 64), commits_per_thread: int = 50,
+                      group_commit: bool = True, max_wait: float = DEFAULT_MAX_WAIT,
+                      max_batch: int = DEFAULT_MAX_BATCH) -> List[CommitBenchmarkResult]:
+    """
+    Have each of ``thread_counts`` threads log ``commits_per_thread``
+    one-update transactions to a fresh log, and measure commit throughput
+    and latency.
+
+    Args:
+        thread_counts (Sequence[int]): Thread counts to test.
+        commits_per_thread (int): Transactions each thread commits in turn.
+        group_commit (bool): Flush on the shared flusher, or once per commit.
+        max_wait (float): Seconds a batch stays open for more commits.
+        max_batch (int): Waiting commits that close a batch early.
+
+    Returns:
+        List[CommitBenchmarkResult]: One result per thread count.
+    """
+    results = []
+    for num_threads in thread_counts:
+        with tempfile.TemporaryDirectory(prefix="wal_") as directory:
+            log = WriteAheadLog(os.path.join(directory, "wal.log"), max_wait, max_batch, group_commit)
+
+            def worker(thread_index: int) -> None:
+                for i in range(commits_per_thread):
+                    transaction_id = (thread_index, i)
+                    log.log_begin(transaction_id)
+                    log.log_update(transaction_id, f"row_{thread_index}", i, i + 1)
+                    log.log_commit(transaction_id)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+            start_time = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - start_time
+            log.close()
+            p50, p99 = log.stats.latency_percentiles()
+            results.append(CommitBenchmarkResult(num_threads, num_threads * commits_per_thread, seconds,
+                                                 log.stats.fsyncs, p50, p99))
+    return results
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory(prefix="wal_") as directory:
+        path = os.path.join(directory, "wal.log")
+        with WriteAheadLog(path) as log:
+            log.log_begin("T1")
+            log.log_update("T1", "x", 0, 1)
+            log.log_commit("T1")
+            log.log_begin("T2")
+            log.log_update("T2", "x", 1, 2)  # The crash comes before T2 commits
+        with open(path, "ab") as log_file:
+            log_file.write(b"\x17\x00")  # A torn record
+        print("\n".join(str(record) for record in read_log(path)))
+        print(f"Recovered state: {recover(path, {'x': 0})}")
+
+    for group_commit in (False, True):
+        print("Group commit:" if group_commit else "One fsync per commit:")
+        for result in benchmark_commits(group_commit=group_commit):
+            print(f"  {result.threads:>2} threads: {result.throughput:>7.0f} commits/s, "
+                  f"{result.commits / result.fsyncs:>5.1f} commits/fsync, "
+                  f"latency p50 {result.p50_latency * 1e3:>6.2f}ms, p99 {result.p99_latency * 1e3:>6.2f}ms")
@@ -1,44 +1,45 @@
 import threading
+import time
+from concurrency.locks import AtomicCell, BackoffSpinLock
 
-# Shared resource (simulated lock)
-lock = 0
+# Shared resource (simulated lock), updated only through the atomic cell
+lock = AtomicCell(0)
 
-# Test-and-Set function
-def test_and_set():
-    global lock
-    old_value = lock
-    lock = 1
-    return old_value
+# Test-and-Set: atomically write 1 and return the previous value
+def test_and_set() -> int:
+    return lock.test_and_set(1)
 
 # Function that simulates a process trying to acquire the lock
-def process(name):
-    while True:
-        if test_and_set() == 0:
-            print(f"{name} acquired the lock.")
-            # Critical section
-            break
-        else:
-            print(f"{name} failed to acquire the lock. Retrying...")
-    
-    # Simulate some work
-    import time
+def process(name: str) -> None:
+    attempts = 1
+    while test_and_set() != 0:
+        # Back off instead of retrying (and printing) in a tight loop
+        attempts += 1
+        time.sleep(0.01)
+    print(f"{name} acquired the lock after {attempts} attempt(s).")
+
+    # Critical section: simulate some work
     time.sleep(1)
-    
+
     # Release the lock
-    global lock
-    lock = 0
+    lock.store(0)
     print(f"{name} released the lock.")
 
-# Create two threads simulating two processes
-thread1 = threading.Thread(target=process, args=("Process 1",))
-thread2 = threading.Thread(target=process, args=("Process 2",))
+if __name__ == "__main__":
+    # Create two threads simulating two processes
+    thread1 = threading.Thread(target=process, args=("Process 1",))
+    thread2 = threading.Thread(target=process, args=("Process 2",))
 
-# Start the threads
-thread1.start()
-thread2.start()
+    # Start the threads
+    thread1.start()
+    thread2.start()
 
-# Wait for both threads to finish
-thread1.join()
-thread2.join()
+    # Wait for both threads to finish
+    thread1.join()
+    thread2.join()
+    print("Both processes have completed.")
 
-print("Both processes have completed.")
+    # The same protocol, packaged with exponential backoff in concurrency.locks
+    spinlock = BackoffSpinLock()
+    with spinlock:
+        print(f"BackoffSpinLock held: {spinlock.locked()}")
@@ -0,0 +1,118 @@
+import os
+import pytest
+from cluster_simulator.file_store import MIN_COMPACTION_BYTES, RECORD_HEADER, FileStore
+from cluster_simulator.node import File, Node
+
+def make_node(storage=1000):
+    return Node(node_id="0", compute=3.0, memory=8192, storage=storage)
+
+@pytest.fixture
+def store(tmp_path):
+    store = FileStore(make_node(), str(tmp_path))
+    yield store
+    store.close()
+
+def reopen(store, storage=1000):
+    store.close()
+    return FileStore(make_node(storage), store.directory)
+
+def test_reads_listings_and_reopen(store):
+    store.write("a/x", b"one", size=1)
+    store.write("a/b/y", "two", size=2)
+    store.write("c", b"three", size=3)
+    assert bytes(store.read("a/x")) == b"one"
+    assert list(store.list_prefix("a/")) == ["a/b/y", "a/x"]
+    assert store.listdir("a") == ["b/", "x"]
+    reopened = reopen(store)
+    assert bytes(reopened.read("a/b/y")) == b"two"
+    assert reopened.node.available_storage == 1000 - 6
+    reopened.close()
+
+def test_recovery_cuts_torn_tail(store):
+    store.write("kept", b"k" * 100, size=1)
+    intact = store.segment_bytes
+    store.write("torn", b"t" * 100, size=1)
+    store.close()
+    with open(store.segment_path, "r+b") as segment:
+        segment.truncate(intact + RECORD_HEADER.size + 10)
+    reopened = FileStore(make_node(), store.directory)
+    assert list(reopened.paths) == ["kept"]
+    assert os.path.getsize(reopened.segment_path) == intact == reopened.segment_bytes
+    # Appends continue after the cut, and survive another reopen
+    reopened.write("after", b"a", size=1)
+    again = reopen(reopened)
+    assert list(again.paths) == ["after", "kept"]
+    again.close()
+
+def test_recovery_stops_at_corrupt_record(store):
+    store.write("first", b"1" * 50, size=1)
+    intact = store.segment_bytes
+    store.write("second", b"2" * 50, size=1)
+    store.write("third", b"3" * 50, size=1)
+    store.close()
+    with open(store.segment_path, "r+b") as segment:
+        segment.seek(intact + RECORD_HEADER.size + 3)
+        segment.write(b"!")
+    reopened = FileStore(make_node(), store.directory)
+    assert list(reopened.paths) == ["first"]
+    assert os.path.getsize(reopened.segment_path) == intact
+    reopened.close()
+
+def test_recovery_replays_overwrites_and_deletes(store):
+    store.write("f", b"old", size=5)
+    store.write("f", b"new", size=2)
+    store.write("g", b"gone", size=3)
+    store.delete("g")
+    reopened = reopen(store)
+    assert list(reopened.paths) == ["f"]
+    assert bytes(reopened.read("f")) == b"new"
+    assert reopened.node.available_storage == 1000 - 2
+    reopened.close()
+
+def test_storage_accounting(store):
+    node = store.node
+    assert store.write("f", b"x", size=400)
+    assert node.available_storage == 600
+    # An overwrite is charged the difference, and refused if even that does not fit
+    assert store.write("f", b"y", size=900)
+    assert node.available_storage == 100
+    assert not store.write("g", b"z", size=101)
+    assert "g" not in store
+    assert store.remove_file("f").size == 900
+    assert node.available_storage == 1000
+    assert store.remove_file("f") is None
+
+def test_compaction_keeps_live_files(store):
+    for i in range(10):
+        store.write(f"f{i}", bytes([i]) * 1000, size=1)
+    for i in range(0, 10, 2):
+        store.delete(f"f{i}")
+    store.write("f1", b"rewritten", size=1)
+    reclaimed = store.compact()
+    assert reclaimed > 0
+    assert store.dead_bytes == 0
+    assert store.segment_bytes == os.path.getsize(store.segment_path)
+    assert bytes(store.read("f1")) == b"rewritten"
+    assert bytes(store.read("f3")) == bytes([3]) * 1000
+    reopened = reopen(store)
+    assert list(reopened.paths) == ["f1", "f3", "f5", "f7", "f9"]
+    assert reopened.node.available_storage == 1000 - 5
+    reopened.close()
+
+def test_overwrites_trigger_compaction(store):
+    payload = b"p" * 64 * 1024
+    for _ in range(100):
+        store.write("hot", payload, size=1)
+    assert store.segment_bytes < 2 * MIN_COMPACTION_BYTES
+    assert bytes(store.read("hot")) == payload
+
+def test_non_utf8_content_round_trips(store):
+    content = b"\xff\xfe binary \x80"
+    store.write("blob", content, size=1)
+    file = store.get_file("blob")
+    assert [f.name for f in store.files()] == ["blob"]
+    # The decoded content writes back as the same bytes
+    store.add_file(File(name="copy", size=1, content=file.content))
+    assert bytes(store.read("copy")) == content
+    assert store.remove_file("blob").content == file.content
+    assert "blob" not in store
@@ -0,0 +1,96 @@
+import threading
+import pytest
+from concurrency.lock_manager import IS, IX, MODES, S, SIX, X, DeadlockError, LockManager, LockTimeoutError
+
+TIMEOUT = 0.05  # Seconds a request that must wait is given before it counts as blocked
+
+# The standard multi-granularity compatibility matrix: EXPECTED[held] lists the modes grantable next to it
+EXPECTED = {
+    IS: {IS, IX, S, SIX},
+    IX: {IS, IX},
+    S: {IS, S},
+    SIX: {IS},
+    X: set(),
+}
+
+def granted(manager, transaction_id, resource, mode):
+    try:
+        manager.acquire(transaction_id, resource, mode)
+    except LockTimeoutError:
+        return False
+    return True
+
+@pytest.mark.parametrize("held", MODES)
+@pytest.mark.parametrize("requested", MODES)
+def test_compatibility_matrix(held, requested):
+    manager = LockManager(timeout=TIMEOUT)
+    manager.acquire("T1", ("table",), held)
+    assert granted(manager, "T2", ("table",), requested) == (requested in EXPECTED[held])
+
+def test_row_locks_take_intention_locks_on_the_table():
+    manager = LockManager(timeout=TIMEOUT)
+    manager.lock_exclusive("T1", "table", "row_1")
+    assert granted(manager, "T2", ("table", "row_2"), X)  # IX next to IX
+    assert not granted(manager, "T3", ("table",), S)  # S conflicts with the writers' IX
+    manager.release_all("T1")
+    manager.release_all("T2")
+    assert granted(manager, "T3", ("table",), S)
+
+def test_upgrade_to_the_supremum():
+    manager = LockManager(timeout=TIMEOUT)
+    manager.acquire("T1", ("table",), IX)
+    manager.acquire("T1", ("table",), S)  # IX and S make SIX
+    assert not granted(manager, "T2", ("table",), IX)
+    assert granted(manager, "T2", ("table",), IS)
+
+def test_upgrade_waits_for_other_readers():
+    manager = LockManager(timeout=TIMEOUT)
+    manager.lock_shared("T1", "table")
+    manager.lock_shared("T2", "table")
+    assert not granted(manager, "T1", ("table",), X)
+    manager.release_all("T2")
+    assert granted(manager, "T1", ("table",), X)
+
+def test_release_grants_waiters():
+    manager = LockManager()
+    manager.lock_exclusive("T1", "table", "row")
+    acquired = threading.Event()
+
+    def waiter():
+        manager.lock_shared("T2", "table", "row")
+        acquired.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    assert not acquired.wait(TIMEOUT)
+    manager.release_all("T1")
+    assert acquired.wait(1.0)
+    thread.join()
+
+@pytest.mark.parametrize("closer", ["T1", "T2"])
+def test_deadlock_aborts_the_youngest(closer):
+    manager = LockManager(timeout=5.0)
+    manager.begin("T1")  # The older transaction
+    manager.begin("T2")
+    manager.lock_exclusive("T1", "accounts", "a")
+    manager.lock_exclusive("T2", "accounts", "b")
+    outcome = {}
+
+    def request(transaction_id, row):
+        try:
+            manager.lock_exclusive(transaction_id, "accounts", row)
+            outcome[transaction_id] = "granted"
+        except DeadlockError:
+            outcome[transaction_id] = "aborted"
+            manager.release_all(transaction_id)
+
+    # The other transaction waits first; the closer's request completes the cycle
+    waiter, waiter_row, closer_row = ("T2", "a", "b") if closer == "T1" else ("T1", "b", "a")
+    thread = threading.Thread(target=request, args=(waiter, waiter_row))
+    thread.start()
+    while waiter not in manager.waits_for():
+        thread.join(0.001)
+    request(closer, closer_row)
+    thread.join()
+    assert outcome == {"T1": "granted", "T2": "aborted"}
+    assert manager.stats.deadlocks == 1
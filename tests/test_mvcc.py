@@ -0,0 +1,94 @@
+import pytest
+from concurrency.mvcc import MVCCStore, WriteConflictError
+
+def committed_write(store, transaction_id, key, value):
+    snapshot = store.begin(transaction_id)
+    store.write(snapshot, key, value)
+    return store.commit(snapshot)
+
+def test_snapshot_reads_ignore_later_commits():
+    store = MVCCStore({"x": 0})
+    reader = store.begin("reader")
+    committed_write(store, "writer", "x", 1)
+    assert store.read(reader, "x") == 0
+    assert store.read(store.begin("late"), "x") == 1
+
+def test_reads_see_own_buffered_writes_only():
+    store = MVCCStore({"x": 0})
+    writer = store.begin("writer")
+    other = store.begin("other")
+    store.write(writer, "x", 5)
+    assert store.read(writer, "x") == 5
+    assert store.read(other, "x") == 0
+    assert store.latest() == {"x": 0}
+
+def test_missing_key_raises_key_error():
+    store = MVCCStore({})
+    with pytest.raises(KeyError):
+        store.read(store.begin("reader"), "x")
+
+def test_first_committer_wins():
+    store = MVCCStore({"y": 0})
+    first, second = store.begin("first"), store.begin("second")
+    store.write(first, "y", 1)
+    store.write(second, "y", 2)
+    store.commit(first)
+    with pytest.raises(WriteConflictError):
+        store.commit(second)
+    assert store.latest() == {"y": 1}
+    assert store.stats.conflicts == 1
+    # A transaction that starts after the winner committed may write the key
+    assert committed_write(store, "third", "y", 3) > 0
+    assert store.latest() == {"y": 3}
+
+def test_disjoint_writes_both_commit():
+    store = MVCCStore({"a": 0, "b": 0})
+    first, second = store.begin("first"), store.begin("second")
+    store.write(first, "a", 1)
+    store.write(second, "b", 1)
+    assert store.commit(first) < store.commit(second)
+    assert store.latest() == {"a": 1, "b": 1}
+
+def test_failing_install_hook_installs_nothing():
+    store = MVCCStore({"x": 0})
+    writer = store.begin("writer")
+    store.write(writer, "x", 1)
+
+    def fail(snapshot):
+        raise OSError("log unavailable")
+
+    with pytest.raises(OSError):
+        store.commit(writer, on_install=fail)
+    assert store.latest() == {"x": 0}
+    assert store.last_commit == 0
+
+def test_gc_keeps_versions_visible_to_active_snapshots():
+    store = MVCCStore({"x": 0})
+    old_reader = store.begin("old_reader")
+    committed_write(store, "w1", "x", 1)
+    middle_reader = store.begin("middle_reader")
+    committed_write(store, "w2", "x", 2)
+    assert store.version_count() == 3
+
+    assert store.collect_garbage() == 0  # The oldest snapshot still reads version 0
+    assert store.read(old_reader, "x") == 0
+
+    store.abort(old_reader)
+    assert store.oldest_active() == middle_reader.start
+    assert store.collect_garbage() == 1
+    assert store.read(middle_reader, "x") == 1
+
+    store.abort(middle_reader)
+    assert store.collect_garbage() == 1
+    assert store.version_count() == 1
+    assert store.latest() == {"x": 2}
+
+def test_background_gc_stops():
+    store = MVCCStore({"x": 0})
+    store.start_gc(interval=0.001)
+    for i in range(1, 20):
+        committed_write(store, i, "x", i)
+    store.stop_gc()
+    store.collect_garbage()
+    assert store.version_count() == 1
+    assert store.latest() == {"x": 19}
@@ -0,0 +1,38 @@
+import random
+import time
+from collections import Counter
+from cluster_simulator.cluster import Cluster
+from cluster_simulator.network import BYTES_PER_MB, ShuffleSimulator
+
+def skewed_sizes(num_partitions, seed):
+    rng = random.Random(seed)
+    return {i: rng.choice([1, 1, 1, 20]) * 50 * BYTES_PER_MB for i in range(num_partitions)}
+
+def random_cluster(num_nodes, seed):
+    random.seed(seed)
+    cluster = Cluster(f"Cluster_{num_nodes}")
+    cluster.generate_random_cluster(num_nodes)
+    return cluster
+
+def test_optimized_assignment_is_a_permutation_and_no_slower():
+    cluster = random_cluster(12, seed=3)
+    # A hub with fast links is where the large partitions should go
+    for neighbor_id in list(cluster.network_topology["0"]):
+        cluster.connect_nodes("0", neighbor_id, bandwidth=10000.0)
+    phases = {"build": skewed_sizes(12, seed=1), "probe": skewed_sizes(12, seed=2)}
+    simulator = ShuffleSimulator(cluster)
+    before = simulator.simulate_sizes(phases)
+    placement, cost = simulator.optimize_assignment(phases)
+    assert Counter(placement.values()) == Counter(cluster.partition_node_ids())
+    assert cost.total_time <= before.total_time
+    # The incremental search reports the cost the full simulation gives
+    assert cost.total_time == simulator.simulate_sizes(phases, placement).total_time
+
+def test_optimize_assignment_scales_to_64_nodes():
+    cluster = random_cluster(64, seed=7)
+    phases = {"shuffle": skewed_sizes(64, seed=7)}
+    simulator = ShuffleSimulator(cluster)
+    started = time.perf_counter()
+    _, cost = simulator.optimize_assignment(phases)
+    assert time.perf_counter() - started < 10.0
+    assert cost.total_time <= simulator.simulate_sizes(phases).total_time
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from concurrency.scheduler import TransactionScheduler
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_blocked_submitters_are_admitted_in_arrival_order():
+    async def scenario():
+        scheduler = TransactionScheduler(max_concurrency=1, max_queued=1)
+        gate = asyncio.Event()
+        started = []
+
+        def job(name):
+            async def body():
+                started.append(name)
+                await gate.wait()
+            return body
+
+        await scheduler.submit(job("running"))
+        await scheduler.submit(job("queued"))
+        blocked = [asyncio.ensure_future(scheduler.submit(job(f"blocked{i}"))) for i in range(3)]
+        await asyncio.sleep(0)
+        # A submitter arriving while others wait goes to the back, even once a place frees up
+        late = asyncio.ensure_future(scheduler.submit(job("late")))
+        await asyncio.sleep(0)
+        assert not any(submission.done() for submission in blocked + [late])
+        gate.set()
+        await asyncio.gather(*blocked, late)
+        await scheduler.join()
+        return started, scheduler
+
+    started, scheduler = run(scenario())
+    assert started == ["running", "queued", "blocked0", "blocked1", "blocked2", "late"]
+    assert scheduler.stats.backpressure_waits == 4
+    assert scheduler.stats.max_queued == 1
+
+def test_cancelled_waiter_passes_its_place_on():
+    async def scenario():
+        scheduler = TransactionScheduler(max_concurrency=1, max_queued=1)
+        gate = asyncio.Event()
+
+        async def job():
+            await gate.wait()
+
+        await scheduler.submit(job)
+        await scheduler.submit(job)
+        first = asyncio.ensure_future(scheduler.submit(job))
+        second = asyncio.ensure_future(scheduler.submit(job))
+        await asyncio.sleep(0)
+        gate.set()
+        # Let the running job finish: the queued one starts and wakes ``first``
+        while not scheduler._reserved:
+            await asyncio.sleep(0)
+        # Cancelled after its wakeup, before it could queue its job
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1)
+        await scheduler.join()
+        return first, scheduler
+
+    first, scheduler = run(scenario())
+    assert first.cancelled()
+    assert scheduler.stats.submitted == 3
+    assert scheduler._reserved == 0 and not scheduler._space_waiters
+
+def test_cancelled_waiter_leaves_the_line():
+    async def scenario():
+        scheduler = TransactionScheduler(max_concurrency=1, max_queued=1)
+        gate = asyncio.Event()
+
+        async def job():
+            await gate.wait()
+
+        await scheduler.submit(job)
+        await scheduler.submit(job)
+        blocked = asyncio.ensure_future(scheduler.submit(job))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await blocked
+        assert not scheduler._space_waiters
+        # With nobody waiting, a new submission is admitted as soon as there is room
+        gate.set()
+        await scheduler.join()
+        await asyncio.wait_for(scheduler.submit(job), timeout=1)
+        await scheduler.join()
+        return scheduler
+
+    scheduler = run(scenario())
+    assert scheduler.stats.submitted == 3
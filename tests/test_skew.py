@@ -0,0 +1,33 @@
+import random
+from cluster_simulator.cluster import Cluster
+from algorithms.parallell_join.partitioned_parallel_join import PartitionedParallelJoin
+from algorithms.parallell_join.skew import assign_heavy_hitters, split_rows
+
+def test_heavy_key_fills_least_loaded_partitions_to_one_level():
+    node_loads = [10, 20, 30, 40]
+    assignment = assign_heavy_hitters({"hot": 300}, node_loads, {"hot": 2})
+    assert sum(assignment["hot"].values()) == 1.0
+    assert max(node_loads) - min(node_loads) < 1e-9
+
+def test_heavy_key_skips_partitions_above_the_level():
+    node_loads = [0, 100, 100]
+    assignment = assign_heavy_hitters({"hot": 10}, node_loads, {"hot": 1})
+    assert assignment == {"hot": {0: 1.0}}
+    assert node_loads == [11, 100, 100]
+
+def test_split_rows_adds_up():
+    assert split_rows(10, [0.5, 0.3, 0.2]) == [5, 3, 2]
+    assert sum(split_rows(7, [1, 1, 1])) == 7
+
+def test_single_hot_key_is_balanced():
+    random.seed(11)
+    cluster = Cluster("SkewCluster")
+    cluster.generate_random_cluster(8)
+    table_r = [(key, f"r{key}") for key in range(1000)]
+    table_s = [(0 if i % 3 == 0 else random.randint(1, 999), f"s{i}") for i in range(30000)]
+    join = PartitionedParallelJoin(cluster)
+    plain = sorted(join.join(table_r, table_s, partition_type='hash'))
+    skewed = sorted(join.join(table_r, table_s, partition_type='hash', skew_handling=True))
+    assert skewed == plain
+    assert join.skew_stats.imbalance_before > 2
+    assert join.skew_stats.imbalance_after < 1.05
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import pytest
+from concurrency.wal import ABORT, BEGIN, COMMIT, UPDATE, WALError, WriteAheadLog, recover, scan_log
+
+@pytest.fixture
+def log_path(tmp_path):
+    return os.path.join(tmp_path, "wal.log")
+
+def write_log(path, group_commit=True):
+    with WriteAheadLog(path, group_commit=group_commit) as log:
+        log.log_begin("T1")
+        log.log_update("T1", "x", 0, 1)
+        log.log_commit("T1")
+    return os.path.getsize(path)
+
+def test_records_round_trip(log_path):
+    write_log(log_path)
+    records, length = scan_log(log_path)
+    assert [record.kind for record in records] == [BEGIN, UPDATE, COMMIT]
+    assert [record.lsn for record in records] == [1, 2, 3]
+    assert (records[1].key, records[1].before, records[1].after) == ("x", 0, 1)
+    assert length == os.path.getsize(log_path)
+
+def test_scan_stops_at_torn_tail(log_path):
+    valid_length = write_log(log_path)
+    with open(log_path, "ab") as log_file:
+        log_file.write(b"\x30\x00\x00")  # A header cut short
+    records, length = scan_log(log_path)
+    assert len(records) == 3
+    assert length == valid_length
+
+def test_scan_stops_at_corrupt_record(log_path):
+    write_log(log_path)
+    records, _ = scan_log(log_path)
+    with open(log_path, "r+b") as log_file:
+        log_file.seek(-1, os.SEEK_END)
+        last = log_file.read(1)
+        log_file.seek(-1, os.SEEK_END)
+        log_file.write(bytes([last[0] ^ 0xFF]))  # Flip the last byte of the commit record
+    corrupted, length = scan_log(log_path)
+    assert [record.kind for record in corrupted] == [BEGIN, UPDATE]
+    assert length < os.path.getsize(log_path)
+
+def test_recover_redoes_only_committed_transactions(log_path):
+    with WriteAheadLog(log_path) as log:
+        log.log_begin("committed")
+        log.log_update("committed", "x", 0, 1)
+        log.log_commit("committed")
+        log.log_begin("aborted")
+        log.log_update("aborted", "x", 1, 2)
+        log.log_abort("aborted")
+        log.log_begin("in_flight")
+        log.log_update("in_flight", "y", 0, 5)  # No commit record before the crash
+    assert recover(log_path, {"x": 0, "y": 0}) == {"x": 1, "y": 0}
+
+def test_recover_replays_compensation_records(log_path):
+    with WriteAheadLog(log_path) as log:
+        log.log_begin("T1")
+        log.log_update("T1", "z", 0, 1)
+        log.log_update("T1", "z", 1, 0)  # Compensation of a rollback to a savepoint
+        log.log_update("T1", "z", 0, 3)  # The retried query
+        log.log_update("T1", "w", 0, 1)
+        log.log_update("T1", "w", 1, 0)  # Compensation with nothing after it
+        log.log_commit("T1")
+    assert recover(log_path, {"z": 0, "w": 7}) == {"z": 3, "w": 0}
+
+def test_reopen_truncates_torn_tail_and_continues_lsns(log_path):
+    valid_length = write_log(log_path)
+    with open(log_path, "ab") as log_file:
+        log_file.write(b"garbage after the crash")
+    with WriteAheadLog(log_path) as log:
+        assert os.path.getsize(log_path) == valid_length
+        assert log.next_lsn == 4
+        log.log_begin("T2")
+        log.log_update("T2", "x", 1, 2)
+        log.log_commit("T2")
+    records, length = scan_log(log_path)
+    assert [record.lsn for record in records] == [1, 2, 3, 4, 5, 6]
+    assert length == os.path.getsize(log_path)
+    assert recover(log_path, {"x": 0}) == {"x": 2}
+
+@pytest.mark.parametrize("group_commit", [True, False])
+def test_commit_is_durable_on_return(log_path, group_commit):
+    log = WriteAheadLog(log_path, group_commit=group_commit)
+    log.log_begin("T1")
+    lsn = log.log_commit("T1")
+    assert log.durable_lsn >= lsn
+    assert [record.kind for record in scan_log(log_path)[0]] == [BEGIN, COMMIT]
+    log.close()
+
+def test_flusher_failure_raises_in_waiters(log_path):
+    log = WriteAheadLog(log_path)
+
+    def fail(data):
+        raise OSError("disk full")
+
+    log._sync = fail
+    log.log_begin("T1")
+    with pytest.raises(WALError, match="disk full"):
+        log.log_commit("T1")
+    # Later commits fail too instead of waiting for a flusher that is gone
+    with pytest.raises(WALError):
+        log.log_commit("T2")
+    log.close()
+
+@pytest.mark.parametrize("group_commit", [True, False])
+def test_durable_future_resolves_every_waiting_coroutine(log_path, group_commit):
+    async def commit_all(log, count):
+        lsns = [log.append_commit(f"T{i}") for i in range(count)]
+        await asyncio.gather(*(log.durable_future(lsn) for lsn in lsns))
+        return lsns
+
+    with WriteAheadLog(log_path, group_commit=group_commit) as log:
+        # More waiters than the default executor has threads
+        lsns = asyncio.run(commit_all(log, 200))
+        assert log.durable_lsn == lsns[-1]
+        assert len(log.stats.commit_latencies) == 200
+        if group_commit:
+            assert log.stats.fsyncs < 200
+    assert len(scan_log(log_path)[0]) == 200
+
+def test_flusher_failure_fails_durable_futures(log_path):
+    log = WriteAheadLog(log_path)
+
+    def fail(data):
+        raise OSError("disk full")
+
+    async def commit(transaction_id):
+        await log.durable_future(log.append_commit(transaction_id))
+
+    log._sync = fail
+    with pytest.raises(WALError, match="disk full"):
+        asyncio.run(commit("T1"))
+    with pytest.raises(WALError):
+        asyncio.run(commit("T2"))
+    log.close()
+
+def test_abort_records_need_no_flush(log_path):
+    with WriteAheadLog(log_path) as log:
+        log.log_begin("T1")
+        log.log_abort("T1")
+        assert log.stats.fsyncs == 0
+    assert [record.kind for record in scan_log(log_path)[0]] == [BEGIN, ABORT]
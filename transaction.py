@@ -1,10 +1,51 @@
+import asyncio
 import threading
 import time
 import random
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from concurrency.lock_manager import LockManager, S, X
+from concurrency.mvcc import MVCCStore, Snapshot
+from concurrency.scheduler import DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_QUEUED, TransactionScheduler
+from concurrency.undo_log import UndoLog, UndoRecord
+from concurrency.wal import WriteAheadLog, recover
 
-# Shared resource for simulation
-shared_resource = {"data": 0}
-lock = threading.Lock()
+NUM_ROWS = 100  # Rows of the shared resource
+QUERIES_PER_TRANSACTION = 2
+MAX_RETRIES = 3  # Failed queries a transaction recovers from before it gives up
+UNDO_TIME = 0.05  # Simulated seconds to undo one change
+
+# Shared resource for simulation: one counter per row, guarded row by row by the lock manager
+shared_resource = {f"row_{i}": 0 for i in range(NUM_ROWS)}
+lock_manager = LockManager()
+mvcc_store = MVCCStore(shared_resource)  # Versioned copy of the rows, used by concurrency_control='mvcc'
+lock = threading.Lock()  # The old global lock, only used by concurrency_control='global'
+wal: Optional[WriteAheadLog] = None  # When set, commits are made durable through it instead of simulated
+
+Query = Tuple[str, str]  # ('read' or 'write', row key)
+
+class QueryFailure(Exception):
+    """A simulated failure of one query; the transaction can roll back and retry it."""
+
+@dataclass
+class RollbackStats:
+    queries_executed: int = 0  # Including retries
+    queries_retried: int = 0  # Executions repeated after a rollback
+    queries_kept: int = 0  # Completed queries a rollback to a savepoint did not have to repeat
+    savepoint_rollbacks: int = 0
+    restarts: int = 0  # Rollbacks to the start, with every query executed again
+    full_rollbacks: int = 0  # Aborts
+    changes_undone: int = 0
+    rollback_seconds: float = 0.0
+
+    def add(self, other: 'RollbackStats') -> None:
+        for name in self.__dataclass_fields__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+rollback_stats = RollbackStats()  # Totals of every finished transaction
+stats_lock = threading.Lock()
 
 class TransactionState:
     def __init__(self):
@@ -12,65 +53,325 @@ class TransactionState:
         self.rollback_needed = False
 
 class Transaction:
-    def __init__(self, transaction_id):
+    def __init__(self, transaction_id, queries: Optional[List[Query]] = None, concurrency_control: str = '2pl',
+                 failure_rate: float = 0.3, time_scale: float = 1.0, verbose: bool = True,
+                 recovery: str = 'savepoint', max_retries: int = MAX_RETRIES):
+        """
+        A transaction of read and write queries on rows of ``shared_resource``.
+
+        Args:
+            transaction_id: The ID of the transaction.
+            queries (Optional[List[Query]]): ('read' or 'write', row key) pairs.
+                Defaults to ``QUERIES_PER_TRANSACTION`` random queries.
+            concurrency_control (str): '2pl' locks each row through
+                ``lock_manager`` (strict two-phase locking, so transactions on
+                different rows run concurrently); 'global' holds the single
+                global ``lock`` until commit or rollback is complete; 'mvcc' reads a
+                snapshot of ``mvcc_store`` and buffers its writes, so readers
+                never wait, and a write conflict aborts it at commit.
+            failure_rate (float): Chance that a query fails.
+            time_scale (float): Factor on every simulated delay.
+            verbose (bool): Print every step.
+            recovery (str): What a failed query costs. 'savepoint' rolls
+                back to the savepoint set before the query and retries only
+                that query; 'restart' rolls back every change and executes
+                all queries again.
+            max_retries (int): Failed queries recovered from before the
+                transaction aborts.
+        """
+        if concurrency_control not in ('2pl', 'global', 'mvcc'):
+            raise ValueError("Invalid concurrency_control. Use '2pl', 'global' or 'mvcc'.")
+        if recovery not in ('savepoint', 'restart'):
+            raise ValueError("Invalid recovery. Use 'savepoint' or 'restart'.")
         self.transaction_id = transaction_id
         self.state = TransactionState()
+        self.queries = queries if queries is not None else random_queries(QUERIES_PER_TRANSACTION)
+        self.concurrency_control = concurrency_control
+        self.failure_rate = failure_rate
+        self.time_scale = time_scale
+        self.verbose = verbose
+        self.recovery = recovery
+        self.max_retries = max_retries
+        self.undo_log = UndoLog()  # Every write with its before image, and a savepoint before each query
+        self.stats = RollbackStats()
+        self.snapshot = None  # The MVCC snapshot, from the start of run
+        self.commit_lsn = None  # Log position of the commit record
+        self.committed = False
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
 
     def execute_query(self, query_number):
-        print(f"Transaction {self.transaction_id} executing query {query_number}.")
+        operation, key = self.queries[query_number - 1]
+        self.log(f"Transaction {self.transaction_id} executing query {query_number} ({operation} {key}).")
+        if self.concurrency_control == '2pl':
+            lock_manager.acquire(self.transaction_id, ("shared_resource", key), X if operation == 'write' else S)
+
         # Simulate query execution
-        time.sleep(random.uniform(0.1, 0.5))  # Simulate some execution time
+        time.sleep(random.uniform(0.1, 0.5) * self.time_scale)  # Simulate some execution time
+        self.apply_query(query_number)
+
+    def apply_query(self, query_number):
+        """Read or write the row of query ``query_number``, then maybe fail."""
+        operation, key = self.queries[query_number - 1]
+        self.stats.queries_executed += 1
+        if self.concurrency_control == 'mvcc':
+            value = mvcc_store.read(self.snapshot, key)
+            if operation == 'write':
+                self.undo_log.record(key, value, value + 1)
+                mvcc_store.write(self.snapshot, key, value + 1)
+        elif operation == 'write':
+            value = shared_resource[key]
+            self.undo_log.record(key, value, value + 1)
+            shared_resource[key] = value + 1
+            if wal is not None:
+                wal.log_update(self.transaction_id, key, value, value + 1)
 
         # Randomly simulate a failure in the query execution
-        if random.random() < 0.3:  # 30% chance of query failure
-            print(f"Transaction {self.transaction_id} encountered failure in query {query_number}.")
+        if random.random() < self.failure_rate:
+            self.log(f"Transaction {self.transaction_id} encountered failure in query {query_number}.")
             self.state.rollback_needed = True
-            raise Exception(f"Failure in query {query_number}.")
+            raise QueryFailure(f"Failure in query {query_number}.")
+
+    def undo(self, record: UndoRecord):
+        if self.snapshot is not None:
+            # MVCC writes are still buffered in the snapshot
+            if record.first:
+                self.snapshot.writes.pop(record.key, None)
+            else:
+                self.snapshot.writes[record.key] = record.before
+            return
+        shared_resource[record.key] = record.before
+        if wal is not None:
+            # A compensation record, so redoing this transaction's updates in log order ends at the before image
+            wal.log_update(self.transaction_id, record.key, record.after, record.before)
+
+    def undo_to(self, savepoint: Optional[str] = None) -> int:
+        """Undo the changes since ``savepoint``, or since the start of the transaction. Returns how many."""
+        self.log(f"Transaction {self.transaction_id} performing partial rollback to {savepoint or 'the start'}.")
+        if savepoint is None:
+            changes = self.undo_log.rollback_all(self.undo)
+        else:
+            changes = self.undo_log.rollback_to(savepoint, self.undo)
+        self.state.rollback_needed = False
+        return changes
+
+    def undo_all(self) -> int:
+        """Undo every change and abort. Returns the changes undone."""
+        self.log(f"Transaction {self.transaction_id} rolling back.")
+        changes = self.undo_log.rollback_all(self.undo)
+        if self.snapshot is not None:
+            mvcc_store.abort(self.snapshot)
+        if wal is not None:
+            wal.log_abort(self.transaction_id)
+        self.stats.full_rollbacks += 1
+        return changes
+
+    def undo_time(self, changes: int) -> float:
+        return changes * UNDO_TIME * self.time_scale  # Undo time grows with the changes undone
 
-    def partial_rollback(self):
-        print(f"Transaction {self.transaction_id} performing partial rollback.")
-        time.sleep(1)  # Simulate partial rollback time
-        print(f"Transaction {self.transaction_id} partial rollback completed.")
+    def record_undo(self, changes: int, started: float, message: str):
+        self.stats.changes_undone += changes
+        self.stats.rollback_seconds += time.perf_counter() - started
+        self.log(f"Transaction {self.transaction_id} {message} ({changes} changes undone).")
+
+    def partial_rollback(self, savepoint: Optional[str] = None):
+        """Undo the changes since ``savepoint``, or since the start of the transaction, and keep going."""
+        started = time.perf_counter()
+        changes = self.undo_to(savepoint)
+        time.sleep(self.undo_time(changes))
+        self.record_undo(changes, started, "partial rollback completed")
 
     def full_rollback(self):
-        print(f"Transaction {self.transaction_id} rolling back.")
-        time.sleep(1)  # Simulate rollback time
-        print(f"Transaction {self.transaction_id} rolled back.")
+        started = time.perf_counter()
+        changes = self.undo_all()
+        time.sleep(self.undo_time(changes))
+        self.record_undo(changes, started, "rolled back")
+
+    def log_commit_record(self, snapshot: Optional[Snapshot] = None):
+        # MVCC writes reach the log only now, in commit order, under the store's commit mutex
+        if snapshot is not None:
+            before_images = self.undo_log.first_before_images()
+            for key, value in snapshot.writes.items():
+                wal.log_update(self.transaction_id, key, before_images[key], value)
+        self.commit_lsn = wal.append_commit(self.transaction_id)
+
+    def install(self):
+        """Make the writes visible and append the commit record, if there is a log; durability comes after."""
+        self.log(f"Transaction {self.transaction_id} committing.")
+        if self.snapshot is not None:
+            # First committer wins: raises WriteConflictError
+            mvcc_store.commit(self.snapshot, on_install=self.log_commit_record if wal is not None else None)
+        elif wal is not None:
+            self.log_commit_record()
 
     def commit(self):
-        print(f"Transaction {self.transaction_id} committing.")
-        time.sleep(1)  # Simulate commit time
-        print(f"Transaction {self.transaction_id} committed successfully.")
+        self.install()
+        if wal is not None:
+            wal.wait_durable(self.commit_lsn)  # Group commit: shares an fsync with concurrent committers
+        else:
+            time.sleep(1 * self.time_scale)  # Simulate commit time
+        self.committed = True
+        self.log(f"Transaction {self.transaction_id} committed successfully.")
+
+    def plan_retry(self, query_number) -> Tuple[Optional[str], int]:
+        """
+        After query ``query_number`` failed: the savepoint to roll back to
+        (None for the start of the transaction) and the query to continue with.
+        """
+        if self.recovery == 'savepoint':
+            self.stats.savepoint_rollbacks += 1
+            self.stats.queries_retried += 1
+            self.stats.queries_kept += query_number - 1
+            return f"query_{query_number}", query_number
+        self.stats.restarts += 1
+        self.stats.queries_retried += query_number
+        return None, 1
+
+    def execute_queries(self):
+        """
+        Execute the queries in order. A failed query is rolled back and
+        retried, up to ``max_retries`` failures in all; the next failure is
+        raised.
+        """
+        query_number = 1
+        failures = 0
+        while query_number <= len(self.queries):
+            self.undo_log.savepoint(f"query_{query_number}")
+            try:
+                self.execute_query(query_number)
+            except QueryFailure:
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+                savepoint, query_number = self.plan_retry(query_number)
+                self.partial_rollback(savepoint)
+                continue
+            query_number += 1
+
+    def begin(self):
+        self.log(f"Transaction {self.transaction_id} started.")
+        if wal is not None:
+            wal.log_begin(self.transaction_id)
+        if self.concurrency_control == 'mvcc':
+            self.snapshot = mvcc_store.begin(self.transaction_id)
+
+    def finish(self):
+        # Strict two-phase locking: every lock is held until commit or rollback is complete
+        lock_manager.release_all(self.transaction_id)
+        with stats_lock:
+            rollback_stats.add(self.stats)
 
     def run(self):
-        print(f"Transaction {self.transaction_id} started.")
-        
+        self.begin()
         try:
-            # Execute queries
-            with lock:
-                self.execute_query(1)
-                self.execute_query(2)
-
-                # Simulate timeout or deadlock scenario
-                if random.random() < 0.2:  # 20% chance of timeout or deadlock
-                    print(f"Transaction {self.transaction_id} encountered a timeout or deadlock.")
-                    self.state.active = False
-                    raise Exception("Timeout or deadlock occurred.")
-
-            # Check if all queries were successful
-            if not self.state.rollback_needed:
-                self.commit()
+            if self.concurrency_control == 'global':
+                # Held through commit or rollback: nobody reads a row this transaction may still undo,
+                # and the undo cannot overwrite another transaction's update
+                with lock:
+                    self.complete()
             else:
-                # Handle partial rollback if needed
-                if random.random() < 0.5:  # 50% chance of partial rollback if needed
-                    self.partial_rollback()
-                self.full_rollback()
+                self.complete()
+        finally:
+            self.finish()
+
+    def complete(self):
+        """Execute the queries and commit, or roll back everything."""
+        try:
+            self.execute_queries()
+            # Every query succeeded, possibly after rollbacks to its savepoint
+            self.commit()
         except Exception as e:
-            # Handle exceptions, including partial rollback
-            if self.state.rollback_needed:
-                self.full_rollback()
-            else:
-                print(f"Transaction {self.transaction_id} aborted: {str(e)}")
+            # Chosen as a deadlock victim, lost a write conflict, or failed more often than max_retries allows
+            self.state.active = False
+            self.log(f"Transaction {self.transaction_id} aborted: {str(e)}")
+            self.full_rollback()
+
+class AsyncTransaction(Transaction):
+    def __init__(self, transaction_id, queries: Optional[List[Query]] = None, concurrency_control: str = 'mvcc',
+                 **options):
+        """
+        A ``Transaction`` whose ``run`` is a coroutine: every simulated delay
+        is an ``asyncio.sleep``, so thousands of transactions share one
+        event loop thread instead of needing a thread each.
+
+        Only 'mvcc' is supported: its reads and writes never wait for other
+        transactions, whereas '2pl' and 'global' would block the event
+        loop's thread while waiting for a lock. With a write-ahead log
+        attached, the commit awaits ``WriteAheadLog.durable_future``, which
+        the log's flusher resolves, so any number of transactions can share
+        a group commit.
+
+        Args:
+            transaction_id: The ID of the transaction.
+            queries (Optional[List[Query]]): As for ``Transaction``.
+            concurrency_control (str): Must be 'mvcc'.
+            **options: The other arguments of ``Transaction``.
+        """
+        if concurrency_control != 'mvcc':
+            raise ValueError("AsyncTransaction only supports concurrency_control='mvcc'.")
+        super().__init__(transaction_id, queries, concurrency_control, **options)
+
+    async def execute_query(self, query_number):
+        operation, key = self.queries[query_number - 1]
+        self.log(f"Transaction {self.transaction_id} executing query {query_number} ({operation} {key}).")
+        await asyncio.sleep(random.uniform(0.1, 0.5) * self.time_scale)  # Simulate some execution time
+        self.apply_query(query_number)
+
+    async def partial_rollback(self, savepoint: Optional[str] = None):
+        started = time.perf_counter()
+        changes = self.undo_to(savepoint)
+        await asyncio.sleep(self.undo_time(changes))
+        self.record_undo(changes, started, "partial rollback completed")
+
+    async def full_rollback(self):
+        started = time.perf_counter()
+        changes = self.undo_all()
+        await asyncio.sleep(self.undo_time(changes))
+        self.record_undo(changes, started, "rolled back")
+
+    async def commit(self):
+        self.install()
+        if wal is not None:
+            await wal.durable_future(self.commit_lsn)  # Group commit without a thread per waiting committer
+        else:
+            await asyncio.sleep(1 * self.time_scale)  # Simulate commit time
+        self.committed = True
+        self.log(f"Transaction {self.transaction_id} committed successfully.")
+
+    async def execute_queries(self):
+        query_number = 1
+        failures = 0
+        while query_number <= len(self.queries):
+            self.undo_log.savepoint(f"query_{query_number}")
+            try:
+                await self.execute_query(query_number)
+            except QueryFailure:
+                failures += 1
+                if failures > self.max_retries:
+                    raise
+                savepoint, query_number = self.plan_retry(query_number)
+                await self.partial_rollback(savepoint)
+                continue
+            query_number += 1
+
+    async def run(self):
+        self.begin()
+        try:
+            await self.execute_queries()
+            await self.commit()
+        except Exception as e:
+            # Lost a write conflict, or failed more often than max_retries allows
+            self.state.active = False
+            self.log(f"Transaction {self.transaction_id} aborted: {str(e)}")
+            await self.full_rollback()
+        finally:
+            self.finish()
+
+def random_queries(num_queries: int, num_rows: int = NUM_ROWS, write_fraction: float = 0.5) -> List[Query]:
+    return [('write' if random.random() < write_fraction else 'read', f"row_{random.randrange(num_rows)}")
+            for _ in range(num_queries)]
 
 def start_transactions():
     threads = []
@@ -79,12 +380,179 @@ def start_transactions():
         thread = threading.Thread(target=transaction.run)
         threads.append(thread)
         thread.start()
-    
+
     # Wait for all transactions to complete
     for thread in threads:
         thread.join()
 
     print("All transactions have completed.")
 
-# Run the simulation
-start_transactions()
+async def run_transactions_async(num_transactions: int = 10000, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                                 max_queued: int = DEFAULT_MAX_QUEUED, num_clients: int = 10,
+                                 **transaction_options) -> Tuple[List[AsyncTransaction], TransactionScheduler]:
+    """
+    Run ``num_transactions`` asynchronous transactions through a
+    ``TransactionScheduler`` on the current event loop, submitted by
+    ``num_clients`` clients in turn.
+
+    Args:
+        num_transactions (int): Transactions to run.
+        max_concurrency (int): Transactions running at once.
+        max_queued (int): Waiting transactions beyond which the clients are held back.
+        num_clients (int): Clients sharing the scheduler fairly.
+        **transaction_options: Arguments for every ``AsyncTransaction``.
+
+    Returns:
+        Tuple[List[AsyncTransaction], TransactionScheduler]: The transactions,
+        finished, and the scheduler with their timings.
+    """
+    scheduler = TransactionScheduler(max_concurrency, max_queued)
+    transactions = []
+
+    async def client(client_index):
+        for transaction_id in range(client_index, num_transactions, num_clients):
+            transaction = AsyncTransaction(transaction_id, **transaction_options)
+            transactions.append(transaction)
+            await scheduler.submit(transaction.run, client=client_index)  # Waits while the queue is full
+
+    await asyncio.gather(*(client(i) for i in range(num_clients)))
+    await scheduler.join()
+    return transactions, scheduler
+
+def benchmark_throughput(thread_counts=(1, 2, 4, 8, 16, 32), transactions_per_thread: int = 20,
+                         concurrency_control: str = '2pl', time_scale: float = 0.01, write_fraction: float = 0.5,
+                         num_rows: int = NUM_ROWS, queries_per_transaction: int = QUERIES_PER_TRANSACTION,
+                         durable: bool = False, failure_rate: float = 0.0, recovery: str = 'savepoint'):
+    """
+    Run ``transactions_per_thread`` transactions of random queries on each of
+    ``thread_counts`` threads, without failures by default, and measure
+    commits per second.
+
+    With ``durable``, every run logs to a fresh write-ahead log with group
+    commit, and the rows recovered from the log are checked against the
+    committed ones afterwards.
+
+    Args:
+        thread_counts: Numbers of concurrent threads to test.
+        transactions_per_thread (int): Transactions each thread runs one after another.
+        concurrency_control (str): '2pl', 'global' or 'mvcc'.
+        time_scale (float): Factor on every simulated delay.
+        write_fraction (float): Share of the queries that write.
+        num_rows (int): Rows the queries pick from; fewer rows mean more conflicts.
+        queries_per_transaction (int): Queries per transaction.
+        durable (bool): Commit through a write-ahead log instead of the simulated commit delay.
+        failure_rate (float): Chance that a query fails.
+        recovery (str): 'savepoint' or 'restart', see ``Transaction``.
+
+    Returns:
+        Dict[int, float]: Committed transactions per second, by thread count.
+    """
+    global mvcc_store, wal
+    results = {}
+    log_directory = tempfile.TemporaryDirectory(prefix="wal_") if durable else None
+    for num_threads in thread_counts:
+        for key in shared_resource:
+            shared_resource[key] = 0
+        mvcc_store = MVCCStore(shared_resource)
+        mvcc_store.start_gc()
+        if durable:
+            wal = WriteAheadLog(os.path.join(log_directory.name, f"{concurrency_control}_{num_threads}.log"))
+        committed = []
+
+        def worker(thread_index):
+            for i in range(transactions_per_thread):
+                queries = random_queries(queries_per_transaction, num_rows, write_fraction)
+                transaction = Transaction((thread_index, i), queries, concurrency_control=concurrency_control,
+                                          failure_rate=failure_rate, time_scale=time_scale, verbose=False,
+                                          recovery=recovery)
+                transaction.run()
+                if transaction.committed:
+                    committed.append(transaction)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+        start_time = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start_time
+        mvcc_store.stop_gc()
+        if durable:
+            wal.close()
+
+        # Only committed writes may remain, once each: aborted transactions and rolled back queries left no trace
+        expected = sum(operation == 'write' for transaction in committed for operation, _ in transaction.queries)
+        rows = mvcc_store.latest() if concurrency_control == 'mvcc' else shared_resource
+        if sum(rows.values()) != expected:
+            raise RuntimeError("Rows do not match the committed writes.")
+        if durable:
+            if recover(wal.path, dict.fromkeys(shared_resource, 0)) != rows:
+                raise RuntimeError("Rows recovered from the log do not match the committed rows.")
+            wal = None
+        results[num_threads] = len(committed) / elapsed
+    if log_directory is not None:
+        log_directory.cleanup()
+    return results
+
+def benchmark_rollback(failure_rate: float = 0.1, num_threads: int = 8, transactions_per_thread: int = 10,
+                       queries_per_transaction: int = 8, concurrency_control: str = '2pl',
+                       time_scale: float = 0.01):
+    """
+    Run the same workload with failing queries recovered by rolling back to
+    their savepoint and by restarting the transaction, and compare the work.
+
+    Returns:
+        Dict[str, Tuple[float, RollbackStats]]: Commits per second and the
+        rollback totals, by recovery strategy.
+    """
+    global rollback_stats
+    results = {}
+    for recovery in ('savepoint', 'restart'):
+        rollback_stats = RollbackStats()
+        throughput = benchmark_throughput((num_threads,), transactions_per_thread, concurrency_control, time_scale,
+                                          write_fraction=0.5, queries_per_transaction=queries_per_transaction,
+                                          failure_rate=failure_rate, recovery=recovery)
+        results[recovery] = (throughput[num_threads], rollback_stats)
+    return results
+
+if __name__ == "__main__":
+    # Run the simulation
+    start_transactions()
+
+    for concurrency_control in ('global', '2pl'):
+        throughput = benchmark_throughput(concurrency_control=concurrency_control)
+        print(f"{concurrency_control}: " + ", ".join(f"{threads} threads {rate:.0f} commits/s"
+                                                     for threads, rate in throughput.items()))
+    print(f"Lock manager: {lock_manager.stats}")
+
+    # Locking against multi-versioning on 20 hot rows, for a read-mostly and a write-heavy mix
+    for mix, write_fraction in (("read-mostly", 0.1), ("write-heavy", 0.8)):
+        for concurrency_control in ('2pl', 'mvcc'):
+            throughput = benchmark_throughput((4, 16), concurrency_control=concurrency_control,
+                                              write_fraction=write_fraction, num_rows=20, queries_per_transaction=4)
+            print(f"{mix} {concurrency_control}: " + ", ".join(f"{threads} threads {rate:.0f} commits/s"
+                                                                for threads, rate in throughput.items()))
+    print(f"MVCC store of the last run: {mvcc_store.stats}")
+
+    # Commits made durable by a write-ahead log with group commit, each run checked by recovering from its log
+    for concurrency_control in ('2pl', 'mvcc'):
+        throughput = benchmark_throughput((1, 4, 16, 64), concurrency_control=concurrency_control, durable=True)
+        print(f"durable {concurrency_control}: " + ", ".join(f"{threads} threads {rate:.0f} commits/s"
+                                                             for threads, rate in throughput.items()))
+
+    # Failed queries rolled back to their savepoint, against restarting the whole transaction
+    for recovery, (rate, stats) in benchmark_rollback().items():
+        print(f"{recovery}: {rate:.0f} commits/s, {stats.queries_executed} queries executed "
+              f"({stats.queries_retried} retried), {stats.changes_undone} changes undone "
+              f"in {stats.rollback_seconds:.2f}s, {stats.full_rollbacks} aborts")
+
+    # 10,000 concurrent transactions as coroutines on one thread, admitted by the scheduler
+    start_time = time.time()
+    transactions, scheduler = asyncio.run(run_transactions_async(10000, max_concurrency=10000, time_scale=0.1,
+                                                                 failure_rate=0.1, verbose=False))
+    elapsed = time.time() - start_time
+    committed = sum(transaction.committed for transaction in transactions)
+    p50, p99 = scheduler.latency_percentiles()
+    print(f"asyncio: {len(transactions)} transactions in {elapsed:.1f}s, {committed / elapsed:.0f} commits/s, "
+          f"{len(transactions) - committed} aborted, latency p50 {p50 * 1e3:.0f}ms, p99 {p99 * 1e3:.0f}ms, "
+          f"{scheduler.stats.max_running} running at once")